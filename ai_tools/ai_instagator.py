@@ -1,37 +1,193 @@
 import os
 import requests
 import json
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
+from openai import OpenAI, OpenAIError
+from pydantic import ValidationError
 import pandas as pd
 from ai_tools.ai_enum_classes import AICryptoAnalystPrompts, OpenAIModels
+from ai_tools.ai_schemas import RECOMMENDATION_COLUMNS, CryptoRecommendation, RecommendationSet
+from ai_tools.prompt_cache import PromptCache
+from ai_tools.stream_parser import JSONArrayStreamParser
 from exchange_tools.exchange_tool import KrakenAPIClient, AssetPair, TradeExecutor
 from exchange_tools.kraken_tools import get_kraken_api, get_trading_pair_symbol
 
 
 class AIInstagator:
-    def __init__(self, api_key):
+    def __init__(self, api_key, base_url=None, client: OpenAI = None, max_workers=4, cache: PromptCache = None):
+        """
+        Args:
+            api_key (str): OpenAI API key; falls back to OPENAI_API_KEY.
+            base_url (str): OpenAI-compatible API root, e.g. a local stub for tests.
+            client (OpenAI): Pre-built client to share instead of creating one.
+            max_workers (int): Maximum completions requested at the same time.
+            cache (PromptCache): Optional persistent cache; answers to the same model,
+                messages and market state are reused until they expire.
+        """
         self.api_key = api_key
-        self.openai = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        self.openai = client or OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), base_url=base_url)
         self.investment_budget = 100
+        self.max_workers = max_workers
+        self.cache = cache
         
         
-    def prompt_ai(self, messages, model):
-        ai_response = self.openai.chat.completions.create(
-            model=model,
-            messages=messages,
-            stream=False,
-            response_format={"type": "json_object"}
-        )
-        return json.loads(ai_response.to_json())
+    def prompt_ai(self, messages, model, market_state=None):
+        def fetch():
+            ai_response = self.openai.chat.completions.create(
+                model=model,
+                messages=messages,
+                stream=False,
+                response_format={"type": "json_object"}
+            )
+            return ai_response.to_json()
+        if self.cache is None:
+            return json.loads(fetch())
+        key = self.cache.key(model, messages, market_state, namespace='response')
+        return json.loads(self.cache.get_or_fetch(key, fetch, model))
     
     
     def convert_response_to_dataframe(self, ai_response):
         json_string = ai_response['choices'][0]['message']['content']
         json_obj = json.loads(json_string)
         return pd.json_normalize(json_obj['cryptos'])
+
+    def recommend(self, messages, model, market_state=None):
+        """
+        Prompt one model and validate its answer.
+
+        The SDK's typed completion is parsed straight into pydantic records, once,
+        instead of round-tripping it through JSON.
+
+        Args:
+            messages (list): Chat messages, e.g. AICryptoAnalystPrompts.MESSAGES.value.
+            model (str): Model name, e.g. OpenAIModels.GPT_Mini.value.
+            market_state: Market inputs behind the prompt (prices, tickers...), part of
+                the cache key so a moved market is never answered from the cache.
+
+        Returns:
+            RecommendationSet: The validated recommendations.
+
+        Raises:
+            pydantic.ValidationError: If the content does not match the schema.
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(model, messages, market_state)
+            content = self.cache.get(key)
+            if content is not None:
+                return RecommendationSet.model_validate_json(content)
+        completion = self.openai.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=False,
+            response_format={"type": "json_object"}
+        )
+        content = completion.choices[0].message.content
+        recommendations = RecommendationSet.model_validate_json(content)
+        # only answers that validated are worth reusing
+        if key is not None:
+            self.cache.set(key, content, model)
+        return recommendations
+
+    def recommend_ensemble(self, models, messages=None, model_weights=None, market_state=None):
+        """
+        Prompt several models (or prompts) concurrently and merge their recommendations.
+
+        Each source's weights are normalized to sum to 1 and scaled by the source's
+        weight, then summed per coin. Prices and expected gains are averaged with the
+        same weights. Sources that fail or return invalid JSON are left out.
+
+        Args:
+            models (list): Model names, or (messages, model) tuples to vary the prompt too.
+            messages (list): Messages used for plain model names. Defaults to
+                AICryptoAnalystPrompts.MESSAGES.
+            model_weights (list): Weight per source. Defaults to equal weights.
+            market_state: Market inputs behind the prompts, see `recommend`.
+
+        Returns:
+            pd.DataFrame: One row per coin with RECOMMENDATION_COLUMNS plus `votes` (the
+                number of sources recommending it), sorted by weight; weights sum to 1.
+
+        Raises:
+            ValueError: If every source failed.
+        """
+        messages = messages or AICryptoAnalystPrompts.MESSAGES.value
+        sources = [source if isinstance(source, tuple) else (messages, source) for source in models]
+        model_weights = model_weights or [1.0] * len(sources)
+
+        def run(source):
+            source_messages, model = source
+            try:
+                return self.recommend(source_messages, model, market_state)
+            except (OpenAIError, ValidationError) as e:
+                print(f"Recommendation from {model} failed: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(sources)))) as pool:
+            results = list(pool.map(run, sources))
+        return merge_recommendations(results, model_weights)
     
     
     
+    def stream_recommendations(self, messages, model):
+        """
+        Stream a completion and yield each recommendation as soon as it is complete.
+
+        Token deltas are fed to an incremental JSON parser, so the first coin is
+        available while the model is still generating the rest of the list.
+        Entries that fail validation are skipped.
+
+        Args:
+            messages (list): Chat messages, e.g. AICryptoAnalystPrompts.MESSAGES.value.
+            model (str): Model name, e.g. OpenAIModels.GPT_Mini.value.
+
+        Yields:
+            CryptoRecommendation: One validated entry of `cryptos` at a time.
+        """
+        stream = self.openai.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            response_format={"type": "json_object"}
+        )
+        parser = JSONArrayStreamParser('cryptos')
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            for item in parser.feed(chunk.choices[0].delta.content):
+                try:
+                    yield CryptoRecommendation.model_validate(item)
+                except ValidationError as e:
+                    print(f"Skipping invalid recommendation {item}: {e}")
+
+    def quote_streamed_recommendations(self, messages, model, trade_executor: TradeExecutor, quote='USD'):
+        """
+        Resolve and price each streamed recommendation while the model keeps generating.
+
+        Every entry is handed to a worker pool for symbol resolution and a ticker
+        lookup the moment it is parsed, so those round trips overlap with generation.
+
+        Args:
+            messages (list): Chat messages.
+            model (str): Model name.
+            trade_executor (TradeExecutor): Executor whose registry and client price the legs.
+            quote (str): Quote currency of the pairs.
+
+        Returns:
+            list: (CryptoRecommendation, pair_symbol, TickerQuote) in stream order; pair and
+                quote are None for coins that cannot be resolved or priced.
+        """
+        def price(record):
+            leg = trade_executor.quote_basket([(record.coin_symbol, quote)])[0]
+            if leg.error is not None:
+                print(f"Could not price {record.coin_symbol}: {leg.error}")
+                return None, None
+            return leg.pair, leg.quote
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [(record, pool.submit(price, record)) for record in self.stream_recommendations(messages, model)]
+            return [(record, *future.result()) for record, future in futures]
+
     def buy_crypto(self, crypto_symbol, weight, trade_executor:TradeExecutor):
         # Placeholder for buying crypto
         dollar_amount = self.investment_budget * weight
@@ -40,15 +196,37 @@ class AIInstagator:
     def buy_list_cryptos(self, crypto_list):
         for crypto in crypto_list:
             self.buy_crypto(crypto['coin_symbol'], crypto['weight'])
-            
 
-        
-            
 
+def merge_recommendations(results, source_weights):
+    """
+    Merge RecommendationSets into one weighted DataFrame (see recommend_ensemble).
 
-    
-    
-    
-    
-    
-    
\ No newline at end of file
+    Args:
+        results (list): RecommendationSet per source, or None for failed sources.
+        source_weights (list): Weight per source.
+
+    Returns:
+        pd.DataFrame: The merged recommendations.
+    """
+    frames = []
+    for result, source_weight in zip(results, source_weights):
+        if result is None or not result.cryptos:
+            continue
+        df = pd.DataFrame([record.model_dump() for record in result.cryptos], columns=RECOMMENDATION_COLUMNS)
+        total = df['weight'].sum()
+        df['weight'] = (df['weight'] / total if total > 0 else 1.0 / len(df)) * source_weight
+        frames.append(df)
+    if not frames:
+        raise ValueError("No model returned usable recommendations")
+    combined = pd.concat(frames, ignore_index=True)
+    weighted = combined[['coin_current_price', 'expected_gain_percentage']].mul(combined['weight'], axis=0)
+    weighted['coin_symbol'] = combined['coin_symbol']
+    weighted['weight'] = combined['weight']
+    merged = weighted.groupby('coin_symbol', sort=False).sum()
+    for column in ('coin_current_price', 'expected_gain_percentage'):
+        merged[column] = merged[column] / merged['weight']
+    merged['votes'] = combined.groupby('coin_symbol', sort=False).size()
+    merged['weight'] = merged['weight'] / merged['weight'].sum()
+    merged = merged.reset_index()[RECOMMENDATION_COLUMNS + ['votes']]
+    return merged.sort_values('weight', ascending=False, kind='stable').reset_index(drop=True)
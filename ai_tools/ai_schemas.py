@@ -0,0 +1,32 @@
+from pydantic import BaseModel, field_validator
+
+RECOMMENDATION_COLUMNS = ['coin_symbol', 'coin_current_price', 'expected_gain_percentage', 'weight']
+
+
+def _to_float(value):
+    '''accept the '$1,234.5' / '12%' strings models return in place of numbers'''
+    if isinstance(value, str):
+        value = value.strip().replace('$', '').replace(',', '').replace('%', '').replace('USD', '').strip()
+    return value
+
+
+class CryptoRecommendation(BaseModel):
+    coin_symbol: str
+    coin_current_price: float
+    expected_gain_percentage: float
+    weight: float
+
+    @field_validator('coin_symbol')
+    @classmethod
+    def _upper_symbol(cls, value):
+        return value.strip().upper()
+
+    @field_validator('coin_current_price', 'expected_gain_percentage', 'weight', mode='before')
+    @classmethod
+    def _numeric(cls, value):
+        return _to_float(value)
+
+
+class RecommendationSet(BaseModel):
+    """The `{"cryptos": [...]}` document the analyst prompt asks for."""
+    cryptos: list[CryptoRecommendation]
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+
+DEFAULT_PROMPT_TTL = 900
+DEFAULT_MAX_ENTRIES = 500
+
+
+def canonicalize_messages(messages: list):
+    '''messages with whitespace collapsed, so reformatting a prompt does not change its key'''
+    return [
+        {key: ' '.join(value.split()) if key == 'content' and isinstance(value, str) else value
+         for key, value in sorted(message.items())}
+        for message in messages
+    ]
+
+
+def market_fingerprint(market_state, significant_digits: int = 3):
+    """
+    Stable hash of the market inputs a prompt was answered under.
+
+    Numbers are rounded to `significant_digits`, so tick-level noise maps to the same
+    fingerprint while real moves produce a new one.
+
+    Args:
+        market_state: dict, list, DataFrame, Series or scalar; None for no market input.
+        significant_digits (int): Precision numbers are compared at.
+
+    Returns:
+        str: Hex digest, or '' when `market_state` is None.
+    """
+    if market_state is None:
+        return ''
+
+    def normalize(value):
+        if isinstance(value, pd.DataFrame):
+            return normalize(value.to_dict(orient='list'))
+        if isinstance(value, pd.Series):
+            return normalize(value.to_dict())
+        if isinstance(value, dict):
+            return {str(key): normalize(item) for key, item in sorted(value.items(), key=lambda kv: str(kv[0]))}
+        if isinstance(value, (list, tuple)):
+            return [normalize(item) for item in value]
+        if isinstance(value, bool) or value is None:
+            return value
+        if isinstance(value, (int, float)):
+            return f'{float(value):.{significant_digits}g}'
+        return str(value)
+
+    payload = json.dumps(normalize(market_state), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class PromptCache:
+    def __init__(self, path: str, ttl: float = DEFAULT_PROMPT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 significant_digits: int = 3):
+        """
+        Persistent SQLite cache of LLM answers.
+
+        Entries are keyed by model + canonicalized messages + a market-state
+        fingerprint, expire after `ttl` seconds, and the least recently used entries
+        are evicted beyond `max_entries`. Hit, miss, expiry and eviction counts are
+        stored in the same database, so they accumulate across scheduled runs.
+
+        Args:
+            path (str): SQLite database file, or ':memory:'.
+            ttl (float): Seconds an answer may be reused.
+            max_entries (int): Maximum answers kept.
+            significant_digits (int): Precision of numbers in the market fingerprint.
+        """
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.significant_digits = significant_digits
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS prompt_cache '
+                '(key TEXT PRIMARY KEY, model TEXT, value TEXT, created REAL, accessed REAL)')
+            self.connection.execute('CREATE INDEX IF NOT EXISTS prompt_cache_accessed ON prompt_cache (accessed)')
+            self.connection.execute('CREATE TABLE IF NOT EXISTS prompt_cache_metrics (name TEXT PRIMARY KEY, value INTEGER)')
+
+    def key(self, model: str, messages: list, market_state=None, namespace: str = 'content'):
+        '''cache key for a prompt; `namespace` separates different shapes of stored value'''
+        payload = json.dumps({
+            'namespace': namespace,
+            'model': model,
+            'messages': canonicalize_messages(messages),
+            'market': market_fingerprint(market_state, self.significant_digits),
+        }, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str):
+        '''stored value for `key`, or None when missing or expired'''
+        now = time.time()
+        with self._lock, self.connection:
+            row = self.connection.execute('SELECT value, created FROM prompt_cache WHERE key = ?', (key,)).fetchone()
+            if row is not None and now - row[1] < self.ttl:
+                self.connection.execute('UPDATE prompt_cache SET accessed = ? WHERE key = ?', (now, key))
+                self._count('hits')
+                return row[0]
+            if row is not None:
+                self.connection.execute('DELETE FROM prompt_cache WHERE key = ?', (key,))
+                self._count('expired')
+            self._count('misses')
+            return None
+
+    def set(self, key: str, value: str, model: str = None):
+        '''store `value` under `key` and evict the least recently used entries past max_entries'''
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute('INSERT OR REPLACE INTO prompt_cache VALUES (?, ?, ?, ?, ?)',
+                                    (key, model, value, now, now))
+            self.connection.execute('DELETE FROM prompt_cache WHERE created <= ?', (now - self.ttl,))
+            evicted = self.connection.execute(
+                'DELETE FROM prompt_cache WHERE key IN '
+                '(SELECT key FROM prompt_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)',
+                (self.max_entries,)).rowcount
+            if evicted:
+                self._count('evictions', evicted)
+
+    def get_or_fetch(self, key: str, fetch, model: str = None):
+        '''cached value for `key`, or the result of `fetch()` which is then stored'''
+        value = self.get(key)
+        if value is None:
+            value = fetch()
+            self.set(key, value, model)
+        return value
+
+    def stats(self):
+        '''hits, misses, expired, evictions and the current number of entries'''
+        with self._lock:
+            metrics = dict(self.connection.execute('SELECT name, value FROM prompt_cache_metrics').fetchall())
+            entries = self.connection.execute('SELECT COUNT(*) FROM prompt_cache').fetchone()[0]
+        stats = {name: metrics.get(name, 0) for name in ('hits', 'misses', 'expired', 'evictions')}
+        stats['entries'] = entries
+        return stats
+
+    def close(self):
+        self.connection.close()
+
+    def _count(self, name: str, amount: int = 1):
+        self.connection.execute(
+            'INSERT INTO prompt_cache_metrics VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value', (name, amount))
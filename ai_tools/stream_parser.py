@@ -0,0 +1,89 @@
+import json
+
+
+class JSONArrayStreamParser:
+    def __init__(self, key: str = 'cryptos'):
+        """
+        Incremental parser that yields the objects of one array in a streamed JSON document.
+
+        Text is fed as it arrives (e.g. LLM token deltas). Every object directly inside
+        the top-level `key` array is decoded and returned as soon as its closing brace
+        is seen, without waiting for the rest of the document. Only the text of the
+        item being read is kept in memory.
+
+        Args:
+            key (str): Top-level key of the array whose items are emitted.
+        """
+        self.key = key
+        self._buffer = ''
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._array_depth = None
+        self._item_start = None
+        self._done = False
+
+    def feed(self, text: str):
+        """
+        Consume more of the document.
+
+        Args:
+            text (str): The next chunk of the streamed JSON.
+
+        Returns:
+            list: Array items (decoded dicts) completed by this chunk.
+
+        Raises:
+            json.JSONDecodeError: If a completed item is not valid JSON.
+        """
+        items = []
+        start = len(self._buffer)
+        self._buffer += text
+        buffer = self._buffer
+        for index in range(start, len(buffer)):
+            char = buffer[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = buffer[self._string_start + 1:index]
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+            elif char in '{[':
+                if char == '{' and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = index
+                self._depth += 1
+                if char == '[' and self._depth == 2 and self._last_key == self.key and not self._done:
+                    self._array_depth = self._depth
+            elif char in '}]':
+                self._depth -= 1
+                if self._array_depth is not None and self._depth == self._array_depth and self._item_start is not None:
+                    items.append(json.loads(buffer[self._item_start:index + 1]))
+                    self._item_start = None
+                elif char == ']' and self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self._array_depth = None
+                    self._done = True
+        self._trim()
+        return items
+
+    def _trim(self):
+        # keep only what may still be needed: the open item, or the open string (a key)
+        keep = len(self._buffer)
+        if self._item_start is not None:
+            keep = self._item_start
+        elif self._in_string:
+            keep = self._string_start
+        if keep:
+            self._buffer = self._buffer[keep:]
+            if self._item_start is not None:
+                self._item_start -= keep
+            if self._string_start is not None:
+                self._string_start -= keep
@@ -0,0 +1,50 @@
+import argparse
+import os
+import sys
+from benchmarks import hot_paths  # noqa: F401  registers the benchmarks
+from benchmarks.harness import (DEFAULT_SIZES, DEFAULT_TOLERANCE, compare, load_results, registered, run_benchmarks,
+                                save_results)
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def _print(key, result):
+    print(f"{key:<60} {result['wall_time'] * 1e3:>11.3f} ms {result['peak_bytes'] / 2 ** 20:>10.2f} MiB peak "
+          f"{result['allocated_blocks']:>10} blocks")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Benchmark the exchange, ingestion and AI hot paths.')
+    parser.add_argument('names', nargs='*', help='benchmarks to run (default: all)')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated fixture sizes, up to 10000000')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per benchmark and size')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='allowed growth, e.g. 0.25')
+    parser.add_argument('--save', metavar='PATH', help='write the results, e.g. to refresh the baseline')
+    parser.add_argument('--list', action='store_true', help='list benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, bench in sorted(registered().items()):
+            print(f'{name} (up to {bench.max_size} rows)')
+        return 0
+    unknown = set(args.names) - registered().keys()
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    sizes = tuple(int(size) for size in args.sizes.split(','))
+    results = run_benchmarks(args.names or None, sizes, args.repeat, report=_print)
+    if args.save:
+        save_results(args.save, results)
+    if not os.path.exists(args.baseline):
+        return 0
+    regressions = compare(results, load_results(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f'REGRESSION {regression.key} {regression.metric}: {regression.baseline:.6g} -> '
+              f'{regression.current:.6g} ({regression.ratio:.2f}x)')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
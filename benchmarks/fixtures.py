@@ -0,0 +1,88 @@
+import json
+import numpy as np
+from exchange_tools.simulated_exchange import kraken_asset_id, kraken_pair_id
+
+# Synthetic inputs shaped like the Kraken and OpenAI payloads the hot paths receive.
+# Everything is generated with NumPy first so even 10M-row fixtures build in seconds.
+
+START_TIME = 1_700_000_000
+QUOTES = ('USD', 'EUR', 'XBT')
+
+
+def _rng(seed: int = 0):
+    return np.random.default_rng(seed)
+
+
+def asset_payloads(count: int = 1_000):
+    """
+    Kraken Assets and AssetPairs results with `count` base assets quoted in QUOTES.
+
+    Returns:
+        tuple: (assets, asset_pairs, altnames of the base assets).
+    """
+    altnames = ['XBT', 'ETH', 'XRP', 'SOL'] + [f'C{index:05d}' for index in range(max(count - 4, 0))]
+    assets, asset_pairs = {}, {}
+    for altname in set(altnames) | set(QUOTES):
+        assets[kraken_asset_id(altname)] = {'aclass': 'currency', 'altname': altname, 'decimals': 10,
+                                            'display_decimals': 5, 'status': 'enabled'}
+    for altname in altnames:
+        for quote in QUOTES:
+            if altname == quote:
+                continue
+            asset_pairs[kraken_pair_id(altname, quote)] = {'altname': f'{altname}{quote}', 'wsname': f'{altname}/{quote}',
+                                                           'base': kraken_asset_id(altname),
+                                                           'quote': kraken_asset_id(quote)}
+    return assets, asset_pairs, altnames
+
+
+def symbol_lookups(size: int, altnames: list, seed: int = 0):
+    '''`size` (crypto_a, crypto_b) altname pairs drawn from `altnames` x QUOTES'''
+    rng = _rng(seed)
+    bases = np.asarray(altnames)[rng.integers(0, len(altnames), size)]
+    quotes = np.asarray(QUOTES[:2])[rng.integers(0, 2, size)]
+    return list(zip(bases.tolist(), quotes.tolist()))
+
+
+def trade_pages(size: int, page_size: int = 1_000, seed: int = 0):
+    """
+    `size` Kraken trade rows [price, volume, time, side, type, misc, trade_id] split into
+    pages of `page_size`, as returned by successive Trades calls.
+    """
+    rng = _rng(seed)
+    prices = np.char.mod('%.5f', 60_000 * np.exp(np.cumsum(rng.normal(0, 1e-4, size))))
+    volumes = np.char.mod('%.8f', rng.gamma(1.0, 0.05, size))
+    times = (START_TIME + np.cumsum(rng.exponential(0.5, size))).round(4).tolist()
+    sides = np.where(rng.random(size) < 0.5, 'b', 's').tolist()
+    kinds = np.where(rng.random(size) < 0.7, 'm', 'l').tolist()
+    rows = [list(row) for row in zip(prices.tolist(), volumes.tolist(), times, sides, kinds, [''] * size,
+                                     range(1, size + 1))]
+    return [rows[start:start + page_size] for start in range(0, size, page_size)]
+
+
+def ohlc_candles(size: int, interval: int = 60, seed: int = 0):
+    '''`size` Kraken OHLC rows [time, open, high, low, close, vwap, volume, count] with string prices'''
+    rng = _rng(seed)
+    close = 60_000 * np.exp(np.cumsum(rng.normal(0, 1e-3, size)))
+    open_ = np.r_[60_000, close[:-1]]
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 1e-3, size))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 1e-3, size))
+    columns = [np.char.mod('%.1f', values).tolist() for values in (open_, high, low, close, (high + low + close) / 3)]
+    volume = np.char.mod('%.8f', rng.gamma(2.0, 5.0, size)).tolist()
+    times = (START_TIME + interval * np.arange(size)).tolist()
+    counts = rng.integers(1, 500, size).tolist()
+    return [list(row) for row in zip(times, *columns, volume, counts)]
+
+
+def ai_response(size: int, seed: int = 0):
+    '''an OpenAI chat completion dict whose content lists `size` recommendations'''
+    rng = _rng(seed)
+    symbols = [f'C{index:05d}' for index in range(size)]
+    prices = rng.lognormal(3, 2, size).round(4).tolist()
+    gains = rng.normal(5, 10, size).round(2).tolist()
+    weights = (rng.dirichlet(np.ones(size)) if size else np.empty(0)).round(6).tolist()
+    content = json.dumps({'cryptos': [
+        {'coin_symbol': symbol, 'coin_current_price': price, 'expected_gain_percentage': gain, 'weight': weight}
+        for symbol, price, gain, weight in zip(symbols, prices, gains, weights)
+    ]})
+    return {'id': 'chatcmpl-bench', 'object': 'chat.completion', 'model': 'bench',
+            'choices': [{'index': 0, 'finish_reason': 'stop', 'message': {'role': 'assistant', 'content': content}}]}
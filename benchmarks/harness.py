@@ -0,0 +1,159 @@
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from typing import NamedTuple
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+# a result slower or larger than baseline * (1 + tolerance) is a regression
+DEFAULT_TOLERANCE = 0.25
+METRICS = ('wall_time', 'peak_bytes', 'allocated_blocks')
+
+
+class Benchmark(NamedTuple):
+    name: str
+    setup: callable
+    run: callable
+    max_size: int
+
+
+class Regression(NamedTuple):
+    key: str
+    metric: str
+    baseline: float
+    current: float
+    ratio: float
+
+
+_registry = {}
+
+
+def benchmark(name: str, setup: callable, max_size: int = SIZES[-1]):
+    """
+    Register `run(fixture)` as a benchmark, asv style.
+
+    Args:
+        name (str): Unique benchmark name.
+        setup (callable): `size -> fixture`; builds the synthetic input outside the timing.
+        max_size (int): Largest size the benchmark is run at.
+    """
+    def register(run):
+        if name in _registry:
+            raise ValueError(f"Benchmark {name} is already registered")
+        _registry[name] = Benchmark(name, setup, run, max_size)
+        return run
+    return register
+
+
+def registered():
+    '''every registered benchmark by name'''
+    return dict(_registry)
+
+
+def measure(func: callable, *args, repeat: int = 5):
+    """
+    Time `func(*args)` and trace its memory.
+
+    Wall time is the best of `repeat` untraced runs. One more run under tracemalloc
+    records the peak traced memory during the call and the memory blocks allocated
+    and still held when it returns (its result included).
+
+    Returns:
+        dict: wall_time (s), wall_time_median (s), peak_bytes, allocated_bytes, allocated_blocks.
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        baseline_bytes = tracemalloc.get_traced_memory()[0]
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1] - baseline_bytes
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    del result
+    return {
+        'wall_time': min(timings),
+        'wall_time_median': statistics.median(timings),
+        'peak_bytes': peak,
+        'allocated_bytes': sum(max(stat.size_diff, 0) for stat in stats),
+        'allocated_blocks': sum(max(stat.count_diff, 0) for stat in stats),
+    }
+
+
+def run_benchmarks(names: list = None, sizes: tuple = DEFAULT_SIZES, repeat: int = 5, report: callable = None):
+    """
+    Run benchmarks at every size up to their `max_size`.
+
+    Args:
+        names (list): Benchmarks to run; all registered ones by default.
+        sizes (tuple): Fixture sizes (rows).
+        repeat (int): Timed runs per benchmark and size.
+        report (callable): Called with (key, measurement) after each one, e.g. print.
+
+    Returns:
+        dict: '<name>[<size>]' -> measurement.
+    """
+    results = {}
+    for name in names or sorted(_registry):
+        bench = _registry[name]
+        for size in sizes:
+            if size > bench.max_size:
+                continue
+            fixture = bench.setup(size)
+            key = f'{name}[{size}]'
+            # big fixtures take long enough that the minimum of a few runs is stable
+            results[key] = measure(bench.run, fixture, repeat=repeat if size < 1_000_000 else min(repeat, 2))
+            del fixture
+            if report is not None:
+                report(key, results[key])
+    return results
+
+
+def machine_info():
+    return {'python': platform.python_version(), 'machine': platform.machine(), 'processor': platform.processor(),
+            'system': platform.system()}
+
+
+def save_results(path: str, results: dict):
+    '''write results with the machine they were measured on'''
+    with open(path, 'w') as f:
+        json.dump({'machine': machine_info(), 'results': results}, f, indent=2, sort_keys=True)
+
+
+def load_results(path: str):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE, metrics: tuple = METRICS):
+    """
+    Regressions of `results` against `baseline`.
+
+    Only benchmarks present in both are compared. Tiny baselines (under a
+    millisecond, kilobyte or 100 blocks) are compared against that floor instead, so
+    timer and allocator noise do not count as regressions.
+
+    Returns:
+        list: Regression per metric that grew by more than `tolerance`.
+    """
+    floors = {'wall_time': 1e-3, 'peak_bytes': 1024, 'allocated_blocks': 100}
+    regressions = []
+    for key in sorted(results.keys() & baseline.keys()):
+        for metric in metrics:
+            before, after = baseline[key][metric], results[key][metric]
+            ratio = after / max(before, floors.get(metric, 0), 1e-12)
+            if ratio > 1 + tolerance:
+                regressions.append(Regression(key, metric, before, after, ratio))
+    return regressions
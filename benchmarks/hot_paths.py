@@ -0,0 +1,79 @@
+import importlib.util
+import os
+from ai_tools.ai_instagator import AIInstagator
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+from exchange_tools.asset_registry import AssetRegistry
+from exchange_tools.exchange_tool import AssetPair
+from exchange_tools.trade_frames import trades_to_dataframe
+
+
+def load_step_functions():
+    '''gcp_tools/step-functions.py (not importable by name because of the dash)'''
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gcp_tools', 'step-functions.py')
+    spec = importlib.util.spec_from_file_location('step_functions', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ---- AssetPair symbol resolution ------------------------------------------------------
+
+def _registry_lookups(size):
+    assets, asset_pairs, altnames = fixtures.asset_payloads()
+    return AssetRegistry.from_assets(assets, asset_pairs), fixtures.symbol_lookups(size, altnames)
+
+
+@benchmark('asset_pair.registry', _registry_lookups)
+def resolve_with_registry(fixture):
+    registry, lookups = fixture
+    return [AssetPair(crypto_a, crypto_b, registry).get_pair_symbol() for crypto_a, crypto_b in lookups]
+
+
+def _dict_lookups(size):
+    assets, _, altnames = fixtures.asset_payloads()
+    return assets, fixtures.symbol_lookups(size, altnames)
+
+
+# every AssetPair built from a raw Assets dict indexes the whole payload again
+@benchmark('asset_pair.assets_dict', _dict_lookups, max_size=10_000)
+def resolve_with_assets_dict(fixture):
+    assets, lookups = fixture
+    return [AssetPair(crypto_a, crypto_b, assets).get_pair_symbol() for crypto_a, crypto_b in lookups]
+
+
+# ---- main_script.main DataFrame construction -------------------------------------------
+
+@benchmark('main_script.trades_to_dataframe', fixtures.trade_pages)
+def build_trade_frame(pages):
+    # main() hands iter_trade_history's 1000-row pages straight to trades_to_dataframe
+    return trades_to_dataframe(iter(pages))
+
+
+# ---- kraken_to_bigquery row building ---------------------------------------------------
+
+_step_functions = None
+
+
+def _candles(size):
+    global _step_functions
+    if _step_functions is None:
+        _step_functions = load_step_functions()
+    return fixtures.ohlc_candles(size)
+
+
+@benchmark('kraken_to_bigquery.candles_to_rows', _candles, max_size=1_000_000)
+def build_bigquery_rows(candles):
+    return _step_functions.candles_to_rows('XBTUSD', 60, candles)
+
+
+# ---- AIInstagator.convert_response_to_dataframe ----------------------------------------
+
+def _ai_response(size):
+    return AIInstagator('bench-key'), fixtures.ai_response(size)
+
+
+@benchmark('ai_instagator.convert_response_to_dataframe', _ai_response, max_size=1_000_000)
+def convert_ai_response(fixture):
+    instagator, response = fixture
+    return instagator.convert_response_to_dataframe(response)
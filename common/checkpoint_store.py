@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import threading
+
+
+class CheckpointStore:
+    def __init__(self, path: str):
+        """
+        Small JSON-file key/value store for resumable jobs.
+
+        Every write replaces the file atomically, so a crash mid-write never leaves a
+        corrupt checkpoint behind.
+
+        Args:
+            path (str): Location of the JSON file. It is created on first write.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        '''value stored under `key`, or `default`'''
+        return self._read().get(key, default)
+
+    def set(self, key: str, value):
+        '''store `value` under `key`'''
+        with self._lock:
+            data = self._read()
+            data[key] = value
+            self._write(data)
+
+    def get_many(self, keys: list):
+        '''values for every key that is present'''
+        data = self._read()
+        return {key: data[key] for key in keys if key in data}
+
+    def set_many(self, values: dict):
+        '''store several key/value pairs in one write'''
+        with self._lock:
+            data = self._read()
+            data.update(values)
+            self._write(data)
+
+    def delete(self, key: str):
+        '''remove `key` if present'''
+        with self._lock:
+            data = self._read()
+            if data.pop(key, None) is not None:
+                self._write(data)
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write(self, data: dict):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
@@ -1,6 +1,114 @@
 from datetime import datetime as dt
 import time
+import numpy as np
+import pandas as pd
 import pytz
+from dateutil import tz
+
+DEFAULT_FORMAT = "%Y-%m-%d %H:%M:%S"
+# built once; looking a timezone up on every call dominated the per-row cost
+CENTRAL_TZ = pytz.timezone('US/Central')
+LOCAL_TZ = tz.tzlocal()
+
+
+# character positions of '%Y-%m-%d %H:%M:%S' that must be digits and the separators between them
+_DEFAULT_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]
+_DEFAULT_SEPARATORS = {4: '-', 7: '-', 10: ' ', 13: ':', 16: ':'}
+
+
+def _has_default_shape(strings: np.ndarray):
+    '''True when every string is laid out exactly like DEFAULT_FORMAT, as strptime would require'''
+    if not len(strings) or not np.all(np.char.str_len(strings) == 19):
+        return False
+    chars = strings.astype('U19').view('U1').reshape(-1, 19)
+    return bool(np.char.isdigit(chars[:, _DEFAULT_DIGITS]).all()
+                and all((chars[:, index] == separator).all() for index, separator in _DEFAULT_SEPARATORS.items()))
+
+
+def _like_input(values, result):
+    '''wrap `result` as a Series with the input's index when `values` was a Series'''
+    if isinstance(values, pd.Series):
+        return pd.Series(result, index=values.index, name=values.name)
+    return result
+
+
+def utc_to_central_array(utc_timestamps):
+    """
+    Converts UTC timestamps to US Central Time in one vectorized pass.
+
+    Args:
+        utc_timestamps (array-like or pd.Series): UTC timestamps in seconds.
+
+    Returns:
+        pd.DatetimeIndex or pd.Series: tz-aware US/Central datetimes.
+
+    Raises:
+        ValueError: If any value is not a valid timestamp.
+    """
+    values = np.asarray(utc_timestamps, dtype=np.float64)
+    central = pd.to_datetime(values, unit='s', utc=True).tz_convert(CENTRAL_TZ)
+    return _like_input(utc_timestamps, central)
+
+
+def unix_to_datetime_str_array(unix_timestamps, format_str=DEFAULT_FORMAT):
+    """
+    Converts Unix timestamps to local-time datetime strings in one vectorized pass.
+
+    The default format skips strftime and formats through NumPy's ISO conversion.
+
+    Args:
+        unix_timestamps (array-like or pd.Series): Unix timestamps in seconds.
+        format_str (str): The desired datetime string format.
+
+    Returns:
+        np.ndarray or pd.Series: The datetime strings.
+
+    Raises:
+        ValueError: If any value is not a valid timestamp.
+    """
+    values = np.asarray(unix_timestamps, dtype=np.float64)
+    local = pd.to_datetime(values, unit='s', utc=True).tz_convert(LOCAL_TZ).tz_localize(None)
+    if local.isna().any():
+        raise ValueError("timestamps must not be None or NaN")
+    if format_str == DEFAULT_FORMAT:
+        strings = np.char.replace(np.datetime_as_string(local.values, unit='s'), 'T', ' ')
+    else:
+        strings = local.strftime(format_str).to_numpy()
+    return _like_input(unix_timestamps, strings)
+
+
+def datetime_str_to_unix_array(datetime_strs, format_str=DEFAULT_FORMAT):
+    """
+    Converts local-time datetime strings to Unix timestamps in one vectorized pass.
+
+    Matches datetime.timestamp() on naive datetimes: a repeated wall time resolves to its
+    first occurrence, and a wall time skipped by a DST change is read with the offset in
+    effect before the change.
+
+    Args:
+        datetime_strs (array-like or pd.Series): The datetime strings.
+        format_str (str): The format of the datetime strings.
+
+    Returns:
+        np.ndarray or pd.Series: int64 Unix timestamps.
+
+    Raises:
+        ValueError: If any string does not match the format.
+    """
+    strings = np.asarray(datetime_strs, dtype=str)
+    # NumPy's ISO parser also takes dates without a time and other shapes strptime rejects
+    if format_str == DEFAULT_FORMAT and _has_default_shape(strings):
+        naive = pd.DatetimeIndex(np.char.replace(strings, ' ', 'T').astype('datetime64[s]'))
+    else:
+        naive = pd.DatetimeIndex(pd.to_datetime(strings, format=format_str))
+    # the first occurrence of a repeated wall time is the one still on daylight saving time
+    first = np.ones(len(naive), dtype=bool)
+    # shifting a skipped wall time back to the gap keeps the offset from before the change
+    local = naive.tz_localize(LOCAL_TZ, ambiguous=first, nonexistent='shift_backward')
+    offsets = local.tz_localize(None) - local.tz_convert('UTC').tz_localize(None)
+    unix = (naive - offsets).as_unit('s').asi8
+    return _like_input(datetime_strs, unix)
+
 
 def utc_to_central(utc_timestamp):
     """
@@ -14,15 +122,14 @@ def utc_to_central(utc_timestamp):
     """
     try:
         utc_dt = dt.fromtimestamp(utc_timestamp, tz=pytz.utc)
-        central_tz = pytz.timezone('US/Central')
-        central_dt = utc_dt.astimezone(central_tz)
+        central_dt = utc_dt.astimezone(CENTRAL_TZ)
         return central_dt
     except (TypeError, ValueError) as e:
         return f"Error: Invalid timestamp - {e}"
     except pytz.exceptions.UnknownTimeZoneError:
         return "Error: Could not find timezone US/Central"
 
-def unix_to_datetime_str(unix_timestamp, format_str="%Y-%m-%d %H:%M:%S"):
+def unix_to_datetime_str(unix_timestamp, format_str=DEFAULT_FORMAT):
     """
     Converts a Unix timestamp to a datetime string.
 
@@ -34,12 +141,12 @@ def unix_to_datetime_str(unix_timestamp, format_str="%Y-%m-%d %H:%M:%S"):
         str: The datetime string.
     """
     try:
-        dt_object = dt.fromtimestamp(unix_timestamp)
-        return dt_object.strftime(format_str)
+        # one value does not amortize the array setup; naive local time is the LOCAL_TZ zone
+        return dt.fromtimestamp(unix_timestamp).strftime(format_str)
     except (TypeError, ValueError) as e:
         return f"Error: Invalid timestamp or format - {e}"
 
-def datetime_str_to_unix(datetime_str, format_str="%Y-%m-%d %H:%M:%S"):
+def datetime_str_to_unix(datetime_str, format_str=DEFAULT_FORMAT):
     """
     Converts a datetime string to a Unix timestamp.
 
@@ -51,12 +158,12 @@ def datetime_str_to_unix(datetime_str, format_str="%Y-%m-%d %H:%M:%S"):
         int: The Unix timestamp.
     """
     try:
-        dt_object = dt.strptime(datetime_str, format_str)
-        return int(dt_object.timestamp())
+        # naive timestamp() resolves DST gaps and repeats like datetime_str_to_unix_array
+        return int(dt.strptime(datetime_str, format_str).timestamp())
     except (TypeError, ValueError) as e:
         return f"Error: Invalid datetime string or format - {e}"
     
-def datetime_to_str(dt_object, format_str="%Y-%m-%d %H:%M:%S"):
+def datetime_to_str(dt_object, format_str=DEFAULT_FORMAT):
     """
     Converts a datetime object to a string.
 
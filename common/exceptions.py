@@ -43,3 +43,7 @@ class KrakenAPIInternalServerError(KrakenAPIError):
     pass
 
 
+
+class KrakenOrderBookChecksumError(KrakenAPIResponseError):
+    """Raised when a locally maintained order book no longer matches Kraken's checksum"""
+    pass
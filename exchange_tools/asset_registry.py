@@ -0,0 +1,146 @@
+import threading
+import time
+
+# the v2 WebSocket API names some assets by their ISO codes instead of Kraken's altnames
+WEBSOCKET_ASSET_NAMES = {'XBT': 'BTC', 'XDG': 'DOGE'}
+
+
+class AssetRegistry:
+    def __init__(self, api_client=None, ttl: float = 3600):
+        """
+        Hash indexes over Kraken's Assets and AssetPairs payloads.
+
+        The indexes are built once from the API client and rebuilt lazily when they
+        are older than `ttl` seconds, so symbol resolution is a dict lookup instead of
+        a scan of the full payload.
+
+        Args:
+            api_client (KrakenAPIClient): Client used to download Assets and AssetPairs.
+                May be None for a registry built with `from_assets`.
+            ttl (float): Seconds before the indexes are refreshed. None disables refresh.
+
+        Attributes:
+            api_client (KrakenAPIClient): The client the indexes are loaded from.
+            ttl (float): Seconds before the indexes are refreshed.
+        """
+        self.api_client = api_client
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._asset_ids = {}
+        self._pairs_by_altname = {}
+        self._pairs_by_wsname = {}
+        self._wsnames_by_pair = {}
+        self._pairs_by_assets = {}
+
+    @classmethod
+    def from_assets(cls, assets: dict, asset_pairs: dict = None):
+        """
+        Build a static registry from already downloaded payloads.
+
+        Args:
+            assets (dict): The `result` of Kraken's Assets endpoint.
+            asset_pairs (dict): The `result` of Kraken's AssetPairs endpoint, if available.
+
+        Returns:
+            AssetRegistry: A registry that never refreshes.
+        """
+        registry = cls(api_client=None, ttl=None)
+        registry._build(assets, asset_pairs or {})
+        return registry
+
+    def refresh(self):
+        '''download Assets and AssetPairs and rebuild every index'''
+        assets = self.api_client.fetch_assets()
+        asset_pairs = self.api_client.fetch_asset_pairs()
+        self._build(assets, asset_pairs)
+
+    def get_asset_id(self, altname: str):
+        """
+        Retrieve the asset ID for a given asset alternative name.
+
+        Args:
+            altname (str): The alternative name of the asset (e.g., 'XBT').
+
+        Returns:
+            str or None: The asset ID (e.g., 'XXBT') if found, otherwise None.
+        """
+        self._ensure_fresh()
+        return self._asset_ids.get(altname.upper())
+
+    def get_pair(self, base: str, quote: str):
+        """
+        Retrieve the trading pair for a base and quote asset.
+
+        Both asset IDs ('XXBT', 'ZUSD') and altnames ('XBT', 'USD') are accepted.
+
+        Args:
+            base (str): The base asset.
+            quote (str): The quote asset.
+
+        Returns:
+            str or None: The trading pair (e.g., 'XXBTZUSD') if found, otherwise None.
+        """
+        self._ensure_fresh()
+        base = base.upper()
+        quote = quote.upper()
+        base_id = self._asset_ids.get(base, base)
+        quote_id = self._asset_ids.get(quote, quote)
+        pair = self._pairs_by_assets.get((base_id, quote_id))
+        if pair is None:
+            pair = self._pairs_by_altname.get(f'{base}{quote}')
+        return pair
+
+    def get_pair_by_altname(self, altname: str):
+        '''trading pair for a pair altname such as XBTUSD, or None'''
+        self._ensure_fresh()
+        return self._pairs_by_altname.get(altname.upper())
+
+    def get_pair_by_wsname(self, wsname: str):
+        '''trading pair for a websocket name such as XBT/USD, or None'''
+        self._ensure_fresh()
+        return self._pairs_by_wsname.get(wsname.upper())
+
+    def get_websocket_symbol(self, pair: str):
+        '''v2 WebSocket symbol of a trading pair, e.g. XXBTZUSD -> BTC/USD, or None'''
+        self._ensure_fresh()
+        wsname = self._wsnames_by_pair.get(pair)
+        if wsname is None:
+            return None
+        return '/'.join(WEBSOCKET_ASSET_NAMES.get(asset, asset) for asset in wsname.split('/'))
+
+    def _ensure_fresh(self):
+        if self.api_client is None:
+            return
+        if self._loaded_at is not None and (self.ttl is None or time.monotonic() - self._loaded_at < self.ttl):
+            return
+        with self._lock:
+            # another thread may have refreshed while we waited on the lock
+            if self._loaded_at is not None and (self.ttl is None or time.monotonic() - self._loaded_at < self.ttl):
+                return
+            self.refresh()
+
+    def _build(self, assets: dict, asset_pairs: dict):
+        asset_ids = {info['altname']: asset_id for asset_id, info in assets.items()}
+        pairs_by_altname = {}
+        pairs_by_wsname = {}
+        wsnames_by_pair = {}
+        pairs_by_assets = {}
+        for pair, details in asset_pairs.items():
+            if details.get('altname'):
+                pairs_by_altname[details['altname']] = pair
+            if details.get('wsname'):
+                pairs_by_wsname[details['wsname']] = pair
+                wsnames_by_pair[pair] = details['wsname']
+            if details.get('base') and details.get('quote'):
+                key = (details['base'], details['quote'])
+                # prefer the plain pair over suffixed variants such as XXBTZUSD.d
+                if key not in pairs_by_assets or len(pair) < len(pairs_by_assets[key]):
+                    pairs_by_assets[key] = pair
+        # swap whole dicts so readers never see a half-built index
+        self._asset_ids = asset_ids
+        self._pairs_by_altname = pairs_by_altname
+        self._pairs_by_wsname = pairs_by_wsname
+        self._wsnames_by_pair = wsnames_by_pair
+        self._pairs_by_assets = pairs_by_assets
+        self._loaded_at = time.monotonic()
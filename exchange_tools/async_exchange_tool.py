@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+import httpx
+from common.exceptions import KrakenAPIConnectionError, KrakenAPIError
+from exchange_tools.kraken_errors import RetryPolicy, error_for_status, is_retryable, raise_for_kraken_errors
+from exchange_tools.kraken_tools import get_kraken_signature
+from exchange_tools.rate_governor import KrakenRateGovernor
+from exchange_tools.url_enums import KrakenAPIUrls
+
+
+class AsyncKrakenAPIClient:
+    def __init__(self, api_key: str = None, api_secret: str = None, base_url: str = KrakenAPIUrls.BASE_URL.value,
+                 max_concurrency: int = 10, timeout: float = 10.0, client: httpx.AsyncClient = None,
+                 rate_governor: KrakenRateGovernor = None, retry_policy: RetryPolicy = None):
+        """
+        Asyncio counterpart of KrakenAPIClient built on a pooled, keep-alive httpx client.
+
+        Every request shares the same connection pool, and at most `max_concurrency`
+        requests are in flight at once, so many pairs can be polled concurrently with
+        `asyncio.gather` without opening a new TCP+TLS connection per call.
+
+        Args:
+            api_key (str): Kraken API key, required for private endpoints.
+            api_secret (str): Kraken API secret (base64), required for private endpoints.
+            base_url (str): Kraken REST root, overridable for local test servers.
+            max_concurrency (int): Maximum number of requests in flight at once.
+            timeout (float): Per-request timeout in seconds.
+            client (httpx.AsyncClient): Pre-built client to share; one is created if omitted.
+            rate_governor (KrakenRateGovernor): Optional rate limit model; calls await its
+                delay instead of blocking the event loop.
+            retry_policy (RetryPolicy): Backoff applied to transient failures of idempotent
+                public calls. Defaults to RetryPolicy().
+        """
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.max_concurrency = max_concurrency
+        self.client = client or httpx.AsyncClient(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+        )
+        self.rate_governor = rate_governor
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._nonce_lock = threading.Lock()
+        self._last_nonce = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
+    async def aclose(self):
+        '''close the underlying connection pool'''
+        await self.client.aclose()
+
+    async def _query_public(self, method: str, data: dict = None):
+        return await self._send(method, data, private=False)
+
+    async def _query_private(self, method: str, data: dict = None):
+        return await self._send(method, data, private=True)
+
+    async def _send(self, method: str, data: dict, private: bool):
+        attempt = 1
+        while True:
+            try:
+                return await self._send_once(method, data, private)
+            except KrakenAPIError as e:
+                # only idempotent public calls are retried, so an AddOrder is never sent twice
+                if attempt >= self.retry_policy.max_attempts or not is_retryable(method, private, e):
+                    raise
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+                attempt += 1
+
+    async def _send_once(self, method: str, data: dict, private: bool):
+        await self._throttle(method, private)
+        try:
+            if private:
+                url_path = f'/0/private/{method}'
+                data = dict(data or {}, nonce=self._next_nonce())
+                headers = {
+                    'API-Key': self.api_key,
+                    'API-Sign': get_kraken_signature(url_path, data, self.api_secret),
+                }
+                async with self._semaphore:
+                    response = await self.client.post(url_path, headers=headers, data=data)
+            else:
+                async with self._semaphore:
+                    response = await self.client.get(f'/0/public/{method}', params=data)
+        except httpx.TransportError as e:
+            raise KrakenAPIConnectionError(f"Error calling {method}: {e}") from e
+        if response.is_error:
+            raise error_for_status(method, response.status_code)
+        return self._observe(method, response.json(), private)
+
+    async def _throttle(self, method: str, private: bool):
+        if self.rate_governor is not None:
+            delay = self.rate_governor.reserve(method, private)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _observe(self, method: str, response: dict, private: bool):
+        if self.rate_governor is not None and KrakenRateGovernor.is_rate_limit_error(response.get('error')):
+            self.rate_governor.penalize(method, private)
+        raise_for_kraken_errors(method, response.get('error'))
+        return response
+
+    def _next_nonce(self):
+        # concurrent private calls must still send strictly increasing nonces
+        with self._nonce_lock:
+            self._last_nonce = max(self._last_nonce + 1, time.time_ns() // 1000)
+            return self._last_nonce
+
+    async def get_ohlc(self, pair: str, interval: str, since: int = None, until: int = None):
+        '''fetch OHLC from Kraken'''
+        params = {'pair': pair, 'interval': interval, 'since': since, 'until': until}
+        response = await self._query_public('OHLC', {key: value for key, value in params.items() if value is not None})
+        return response['result']
+
+    async def get_balance(self):
+        '''fetch balance from Kraken'''
+        response = await self._query_private('Balance')
+        return response['result']
+
+    async def fetch_assets(self):
+        '''fetch all assets from Kraken'''
+        response = await self._query_public('Assets')
+        return response['result']
+
+    async def fetch_ticker(self, pair: str):
+        '''fetch ticker for a given pair from Kraken'''
+        response = await self._query_public('Ticker', {'pair': pair})
+        return response['result'][pair]
+
+    async def place_order(self, pair: str, order_type: str, volume: float):
+        '''place an order on Kraken with params
+        pair: trading pair (e.g., 'XXBTZUSD')
+        order_type: 'buy' or 'sell'
+        volume: amount to buy/sell
+        '''
+        response = await self._query_private('AddOrder', {
+            'pair': pair,
+            'type': order_type,
+            'ordertype': 'market',
+            'volume': volume
+        })
+        return response['result']
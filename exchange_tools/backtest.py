@@ -0,0 +1,230 @@
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import os
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+from exchange_tools.asset_registry import AssetRegistry
+from exchange_tools.exchange_tool import KrakenAPIClient, TradeExecutor
+from exchange_tools.indicators import IndicatorEngine, stack_ohlc
+from exchange_tools.kraken_errors import RetryPolicy
+from exchange_tools.simulated_exchange import SimulatedKrakenAPI
+
+SECONDS_PER_YEAR = 365 * 24 * 3600
+
+
+class BarContext(NamedTuple):
+    index: int
+    time: pd.Timestamp
+    pairs: list
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    exchange: SimulatedKrakenAPI
+    api_client: KrakenAPIClient
+    executor: TradeExecutor
+
+    def balance(self, altname: str):
+        '''current balance of an asset by altname, e.g. 'XBT' or 'USD\''''
+        asset_id = self.executor.registry.get_asset_id(altname)
+        return self.exchange.balances.get(asset_id, 0.0)
+
+
+class BacktestResult(NamedTuple):
+    equity: pd.Series
+    fills: pd.DataFrame
+    metrics: dict
+
+
+class Strategy:
+    """
+    Base class for strategies replayed by Backtest.
+
+    `on_bar` is called once per candle after it closed, with a BarContext exposing the
+    latest candle of every pair and the same KrakenAPIClient and TradeExecutor used
+    live. Orders sent from `on_bar` fill on the next candle.
+    """
+
+    def on_start(self, pairs: list):
+        pass
+
+    def on_bar(self, context: BarContext):
+        raise NotImplementedError
+
+
+class EMACrossStrategy(Strategy):
+    def __init__(self, fast: int = 12, slow: int = 26, allocation: float = 0.95):
+        """
+        Long-only trend following: hold a pair while its fast EMA is above its slow EMA.
+
+        Entries are bought together as one basket through TradeExecutor.execute_basket,
+        splitting `allocation` of the free quote balance evenly; exits sell the whole
+        position at market.
+
+        Args:
+            fast (int): Fast EMA span in candles.
+            slow (int): Slow EMA span in candles.
+            allocation (float): Share of the free quote balance spent on each round of entries.
+        """
+        self.fast = fast
+        self.slow = slow
+        self.allocation = allocation
+
+    def on_start(self, pairs: list):
+        self.engine = IndicatorEngine(pairs, ema_spans=(self.fast, self.slow))
+        self.holding = np.zeros(len(pairs), dtype=bool)
+
+    def on_bar(self, context: BarContext):
+        values = self.engine.update(context.high, context.low, context.close, context.volume)
+        if self.engine.candles < self.slow:
+            return
+        bullish = values[f'ema_{self.fast}'] > values[f'ema_{self.slow}']
+        bases = [pair.split('/') for pair in context.pairs]
+        for index in np.flatnonzero(self.holding & ~bullish):
+            base, quote = bases[index]
+            volume = context.balance(base)
+            if volume > 0:
+                pair = context.executor.registry.get_pair_by_wsname(context.pairs[index])
+                context.api_client.place_order(pair, 'sell', volume)
+            self.holding[index] = False
+        entries = np.flatnonzero(bullish & ~self.holding)
+        if len(entries):
+            quote = bases[entries[0]][1]
+            dollar_amount = context.balance(quote) * self.allocation / len(entries)
+            legs = [(bases[index][0], dollar_amount) for index in entries]
+            fills = context.executor.execute_basket(legs, quote=quote)
+            for index, fill in zip(entries, fills):
+                self.holding[index] = fill.error is None
+
+
+class Backtest:
+    def __init__(self, data: dict, initial_cash: float = 10_000, quote: str = 'USD', **exchange_kwargs):
+        """
+        Event-driven replay of historical candles through a simulated Kraken account.
+
+        Every candle is fed to a SimulatedKrakenAPI behind a real KrakenAPIClient and
+        TradeExecutor, so strategies exercise the same order path as live trading while
+        fills, fees and slippage come from the simulator's matching model.
+
+        Args:
+            data (dict): wsname (e.g. 'XBT/USD') -> OHLC DataFrame from
+                trade_frames.ohlc_to_dataframe. Pairs are aligned with stack_ohlc.
+            initial_cash (float): Starting balance in `quote`.
+            quote (str): Currency the account is funded and valued in.
+            **exchange_kwargs: Passed to SimulatedKrakenAPI (fees, spread, slippage, impact).
+        """
+        self.pairs, self.times, self.arrays = stack_ohlc(data)
+        self.initial_cash = initial_cash
+        self.quote = quote
+        self.exchange_kwargs = exchange_kwargs
+
+    def run(self, strategy: Strategy):
+        """
+        Replay every candle through `strategy`.
+
+        Returns:
+            BacktestResult: Equity curve (valued at each close), fills and metrics.
+        """
+        exchange = SimulatedKrakenAPI(self.pairs, {self.quote: self.initial_cash}, **self.exchange_kwargs)
+        # simulated calls never fail transiently, so there is nothing to retry
+        api_client = KrakenAPIClient(exchange, retry_policy=RetryPolicy(max_attempts=1))
+        executor = TradeExecutor(api_client, AssetRegistry(api_client, ttl=None))
+        arrays = self.arrays
+        opens, highs, lows, closes, volumes = (arrays[column].T for column in ('open', 'high', 'low', 'close', 'volume'))
+        seconds = self.times.asi8 // 10 ** 9
+        equity = np.empty(len(self.times))
+        strategy.on_start(self.pairs)
+        for index, time in enumerate(seconds):
+            exchange.advance(time, {
+                pair: (opens[index, column], highs[index, column], lows[index, column], closes[index, column],
+                       (highs[index, column] + lows[index, column] + closes[index, column]) / 3,
+                       volumes[index, column], 1)
+                for column, pair in enumerate(self.pairs)
+            })
+            strategy.on_bar(BarContext(index, self.times[index], self.pairs, opens[index], highs[index], lows[index],
+                                       closes[index], volumes[index], exchange, api_client, executor))
+            equity[index] = exchange.equity(self.quote)
+        equity = pd.Series(equity, index=self.times, name='equity')
+        fills = pd.DataFrame(exchange.fills, columns=['time', 'txid', 'pair', 'side', 'volume', 'price', 'cost', 'fee',
+                                                      'slippage_bps'])
+        return BacktestResult(equity, fills, performance_metrics(equity, fills, self.initial_cash))
+
+
+def performance_metrics(equity: pd.Series, fills: pd.DataFrame, initial_cash: float):
+    """
+    Summary statistics of a backtest.
+
+    Returns:
+        dict: total_return, max_drawdown (negative), sharpe (annualized from the candle
+            interval), fills, fees and mean slippage_bps.
+    """
+    values = equity.to_numpy()
+    returns = np.diff(values, prepend=initial_cash) / np.r_[initial_cash, values[:-1]]
+    drawdown = values / np.maximum.accumulate(np.r_[initial_cash, values])[1:] - 1
+    if len(equity) > 1:
+        interval = np.median(np.diff(equity.index.asi8)) / 1e9
+        periods_per_year = SECONDS_PER_YEAR / interval
+    else:
+        periods_per_year = 1.0
+    deviation = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    return {
+        'total_return': values[-1] / initial_cash - 1 if len(values) else 0.0,
+        'max_drawdown': float(drawdown.min()) if len(drawdown) else 0.0,
+        'sharpe': float(returns.mean() / deviation * np.sqrt(periods_per_year)) if deviation > 0 else 0.0,
+        'fills': len(fills),
+        'fees': float(fills['fee'].sum()),
+        'slippage_bps': float(fills['slippage_bps'].mean()) if len(fills) else 0.0,
+    }
+
+
+def expand_grid(grid: dict):
+    '''{'fast': [5, 10], 'slow': [20]} -> [{'fast': 5, 'slow': 20}, {'fast': 10, 'slow': 20}]'''
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+# Per-process state for run_grid: the candles are aligned once per worker, not once per config
+_worker_backtest = None
+_worker_strategy = None
+
+
+def _init_worker(data: dict, strategy_cls: type, backtest_kwargs: dict):
+    global _worker_backtest, _worker_strategy
+    _worker_backtest = Backtest(data, **backtest_kwargs)
+    _worker_strategy = strategy_cls
+
+
+def _run_config(params: dict):
+    return {**params, **_worker_backtest.run(_worker_strategy(**params)).metrics}
+
+
+def run_grid(data: dict, strategy_cls: type, grid: dict, max_workers: int = None, chunksize: int = None,
+             **backtest_kwargs):
+    """
+    Backtest every combination of strategy parameters in a process pool.
+
+    Each worker aligns the candles once in its initializer and then runs configs in
+    chunks, so the data is pickled once per worker instead of once per config.
+
+    Args:
+        data (dict): wsname -> OHLC DataFrame, as for Backtest.
+        strategy_cls (type): Strategy subclass defined at module level (it is pickled).
+        grid (dict): Parameter name -> list of values passed to `strategy_cls`.
+        max_workers (int): Worker processes; defaults to the CPU count, 1 runs inline.
+        chunksize (int): Configs handed to a worker at a time; defaults to an even split.
+        **backtest_kwargs: Passed to Backtest (initial_cash, quote, exchange settings).
+
+    Returns:
+        pd.DataFrame: One row per config with its parameters and metrics.
+    """
+    configs = expand_grid(grid)
+    max_workers = min(max_workers or os.cpu_count() or 1, len(configs)) or 1
+    if max_workers == 1:
+        _init_worker(data, strategy_cls, backtest_kwargs)
+        return pd.DataFrame([_run_config(params) for params in configs])
+    chunksize = chunksize or max(1, len(configs) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(data, strategy_cls, backtest_kwargs)) as pool:
+        return pd.DataFrame(list(pool.map(_run_config, configs, chunksize=chunksize)))
@@ -0,0 +1,257 @@
+import numpy as np
+import pandas as pd
+from exchange_tools.trade_frames import trades_to_columns
+
+BAR_COLUMNS = ['time', 'close_time', 'open', 'high', 'low', 'close', 'volume', 'vwap', 'count']
+_FIELDS = ('time', 'close_time', 'open', 'high', 'low', 'close', 'volume', 'notional', 'count')
+
+
+def _empty_bars():
+    return {field: np.empty(0, dtype=np.int64 if field in ('time', 'close_time', 'count') else np.float64)
+            for field in _FIELDS}
+
+
+def _aggregate(ids: np.ndarray, price: np.ndarray, volume: np.ndarray, time_ns: np.ndarray):
+    '''one bar per run of equal ids (ids must be non-decreasing)'''
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(ids)] - 1
+    return ids[starts], {
+        'time': time_ns[starts],
+        'close_time': time_ns[ends],
+        'open': price[starts],
+        'high': np.maximum.reduceat(price, starts),
+        'low': np.minimum.reduceat(price, starts),
+        'close': price[ends],
+        'volume': np.add.reduceat(volume, starts),
+        'notional': np.add.reduceat(price * volume, starts),
+        'count': np.diff(np.r_[starts, len(ids)]),
+    }
+
+
+class BarBuilder:
+    """
+    Incremental bar construction for one bar type.
+
+    Only the bar still being built is kept between calls. `append` takes a batch of
+    time-ordered trades and returns the bars it completed; `flush` closes the partial
+    bar. Subclasses decide which trades share a bar through `_assign`.
+    """
+
+    def __init__(self):
+        self._partial = None
+        self._partial_key = None
+
+    @property
+    def partial(self):
+        '''the bar being built, as a one-row dict of arrays, or None'''
+        return self._partial
+
+    def append(self, price: np.ndarray, volume: np.ndarray, time_ns: np.ndarray):
+        """
+        Fold a batch of trades into bars.
+
+        Args:
+            price (np.ndarray): Trade prices.
+            volume (np.ndarray): Trade volumes.
+            time_ns (np.ndarray): Trade times as int64 nanoseconds, non-decreasing.
+
+        Returns:
+            dict: Field -> array for every bar completed by this batch.
+        """
+        if len(price) == 0:
+            return _empty_bars()
+        ids, last_closed = self._assign(price, volume, time_ns)
+        keys, bars = _aggregate(ids, price, volume, time_ns)
+        if self._partial is not None:
+            if keys[0] == self._partial_key:
+                self._merge_partial(bars)
+            else:
+                bars = {field: np.r_[self._partial[field], bars[field]] for field in _FIELDS}
+                keys = np.r_[self._partial_key, keys]
+        if last_closed:
+            self._partial = None
+            self._partial_key = None
+            return bars
+        self._partial = {field: values[-1:] for field, values in bars.items()}
+        self._partial_key = keys[-1]
+        return {field: values[:-1] for field, values in bars.items()}
+
+    def flush(self):
+        '''close and return the partial bar'''
+        if self._partial is None:
+            return _empty_bars()
+        bars = self._partial
+        self._partial = None
+        self._partial_key = None
+        self._reset()
+        return bars
+
+    def _merge_partial(self, bars: dict):
+        partial = self._partial
+        bars['time'][0] = partial['time'][0]
+        bars['open'][0] = partial['open'][0]
+        bars['high'][0] = max(bars['high'][0], partial['high'][0])
+        bars['low'][0] = min(bars['low'][0], partial['low'][0])
+        for field in ('volume', 'notional', 'count'):
+            bars[field][0] += partial[field][0]
+
+    def _assign(self, price: np.ndarray, volume: np.ndarray, time_ns: np.ndarray):
+        '''(non-decreasing bar keys per trade, whether the last bar is already complete)'''
+        raise NotImplementedError
+
+    def _reset(self):
+        pass
+
+
+class TimeBars(BarBuilder):
+    def __init__(self, seconds: float):
+        """
+        Bars covering fixed wall-clock intervals, labelled with the interval start.
+
+        A bar is complete once a trade from a later interval arrives (or on `flush`).
+
+        Args:
+            seconds (float): Bar width, e.g. 10 for 10s bars.
+        """
+        super().__init__()
+        self.width = int(seconds * 1e9)
+
+    def append(self, price: np.ndarray, volume: np.ndarray, time_ns: np.ndarray):
+        bars = super().append(price, volume, time_ns)
+        bars['time'] = bars['time'] // self.width * self.width
+        return bars
+
+    def flush(self):
+        bars = super().flush()
+        bars['time'] = bars['time'] // self.width * self.width
+        return bars
+
+    def _assign(self, price, volume, time_ns):
+        return time_ns // self.width, False
+
+
+class _ThresholdBars(BarBuilder):
+    def __init__(self, threshold: float):
+        super().__init__()
+        self.threshold = threshold
+        self._filled = 0.0
+
+    def _amount(self, price, volume):
+        raise NotImplementedError
+
+    def _assign(self, price, volume, time_ns):
+        # a trade belongs to the bar in progress when it starts; the trade that reaches
+        # the threshold closes the bar and any overshoot counts toward the next one
+        filled = self._filled + np.cumsum(self._amount(price, volume))
+        before = np.r_[self._filled, filled[:-1]]
+        ids = np.floor(before / self.threshold).astype(np.int64)
+        closed_through = int(np.floor(filled[-1] / self.threshold))
+        self._filled = float(filled[-1] - closed_through * self.threshold)
+        # keys are relative to this batch: 0 is the bar carried over from the last one
+        return ids, closed_through > ids[-1]
+
+    def append(self, price, volume, time_ns):
+        bars = super().append(price, volume, time_ns)
+        # renumber so the carried partial bar always has key 0
+        if self._partial is not None:
+            self._partial_key = 0
+        return bars
+
+    def _reset(self):
+        self._filled = 0.0
+
+
+class VolumeBars(_ThresholdBars):
+    """Bars that each hold `threshold` units of the base asset."""
+
+    def _amount(self, price, volume):
+        return volume
+
+
+class DollarBars(_ThresholdBars):
+    """Bars that each hold `threshold` of quote currency (price * volume)."""
+
+    def _amount(self, price, volume):
+        return price * volume
+
+
+def bars_to_dataframe(bars: dict):
+    '''completed bars as a DataFrame with BAR_COLUMNS'''
+    with np.errstate(divide='ignore', invalid='ignore'):
+        vwap = bars['notional'] / bars['volume']
+    return pd.DataFrame({
+        'time': pd.to_datetime(bars['time'], unit='ns'),
+        'close_time': pd.to_datetime(bars['close_time'], unit='ns'),
+        'open': bars['open'],
+        'high': bars['high'],
+        'low': bars['low'],
+        'close': bars['close'],
+        'volume': bars['volume'],
+        'vwap': vwap,
+        'count': bars['count'].astype(np.int64),
+    }, columns=BAR_COLUMNS)
+
+
+class BarResampler:
+    def __init__(self, builders: dict):
+        """
+        Build several bar types from one pass over a trade stream.
+
+        Each batch of trades is parsed once and handed to every builder. Only the
+        partially built bar of each type stays in memory, so history can be appended
+        page by page instead of re-aggregating everything. `KrakenAPIClient.iter_trade_history`
+        yields (pair_key, trades, last) tuples, so pass it on as
+        `resample(trades for _, trades, _ in client.iter_trade_history(...))`.
+
+        Args:
+            builders (dict): Name -> BarBuilder, e.g.
+                {'10s': TimeBars(10), 'volume': VolumeBars(5), 'dollar': DollarBars(100_000)}.
+        """
+        self.builders = dict(builders)
+
+    def append(self, trades):
+        """
+        Add trades and return the bars they completed.
+
+        Args:
+            trades: Kraken trade rows (the `trades` element of an iter_trade_history
+                tuple), a trades_to_dataframe DataFrame, or a trades_to_columns dict;
+                in time order.
+
+        Returns:
+            dict: Builder name -> DataFrame of completed bars.
+        """
+        if isinstance(trades, pd.DataFrame):
+            price = trades['price'].to_numpy(np.float64)
+            volume = trades['volume'].to_numpy(np.float64)
+            time_ns = trades['time'].to_numpy('datetime64[ns]').view(np.int64)
+        else:
+            columns = trades if isinstance(trades, dict) else trades_to_columns(trades)
+            price, volume, time_ns = columns['price'], columns['volume'], columns['time']
+        return {name: bars_to_dataframe(builder.append(price, volume, time_ns))
+                for name, builder in self.builders.items()}
+
+    def flush(self):
+        '''close every partial bar and return them'''
+        return {name: bars_to_dataframe(builder.flush()) for name, builder in self.builders.items()}
+
+    def resample(self, batches, flush: bool = True):
+        """
+        Resample a whole stream of trade batches.
+
+        Args:
+            batches: Iterable of trade batches accepted by `append`.
+            flush (bool): Also emit the final partial bars.
+
+        Returns:
+            dict: Builder name -> DataFrame of all bars.
+        """
+        frames = {name: [] for name in self.builders}
+        for batch in batches:
+            for name, bars in self.append(batch).items():
+                frames[name].append(bars)
+        if flush:
+            for name, bars in self.flush().items():
+                frames[name].append(bars)
+        return {name: pd.concat(parts, ignore_index=True) if parts else bars_to_dataframe(_empty_bars())
+                for name, parts in frames.items()}
@@ -1,36 +1,195 @@
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import NamedTuple
 import krakenex
+import requests
+from common.checkpoint_store import CheckpointStore
+from common.exceptions import KrakenAPIConnectionError, KrakenAPIError, KrakenAPIResponseError
+from exchange_tools.asset_registry import AssetRegistry
+from exchange_tools.kraken_errors import RetryPolicy, error_for_status, is_retryable, raise_for_kraken_errors
+from exchange_tools.order_book import snapshot_from_depth, walk_book
+from exchange_tools.rate_governor import KrakenRateGovernor
+from exchange_tools.response_cache import ResponseCache
+
+# character budget for the comma-joined pair list of one Ticker request, well under URL limits
+TICKER_PAIRS_MAX_CHARS = 1500
+# maximum trades Kraken returns per Trades page
+TRADES_PAGE_SIZE = 1000
+# book levels fetched per side when sizing an order against depth
+DEPTH_LEVELS = 25
+# maximum txids Kraken accepts in one QueryOrders call
+QUERY_ORDERS_MAX = 50
+CANCEL_ORDERS_MAX = 50
+
+
+class TickerQuote(NamedTuple):
+    ask: float
+    bid: float
+    last: float
+
+
+class LegQuote(NamedTuple):
+    """
+    Price of one basket leg.
+
+    `pair` is None when the leg could not be resolved and `quote` is None when it could
+    not be priced; `error` then holds the exception.
+    """
+    pair: str
+    quote: TickerQuote
+    error: Exception
+
+
+class LegFill(NamedTuple):
+    """
+    Outcome of one basket leg.
+
+    `expected_price` is the volume-weighted price of sweeping the book for the leg's
+    notional, and `slippage_bps` its distance from the best ask. `latency` is the
+    AddOrder round trip in seconds. `error` holds the exception when the leg failed.
+    """
+    symbol: str
+    pair: str
+    dollar_amount: float
+    volume: float
+    best_ask: float
+    expected_price: float
+    slippage_bps: float
+    latency: float
+    result: dict
+    error: Exception
+
 
 class KrakenAPIClient:
-    def __init__(self, api: krakenex.API):
+    def __init__(self, api: krakenex.API, cache: ResponseCache = None, rate_governor: KrakenRateGovernor = None,
+                 retry_policy: RetryPolicy = None):
+        """
+        Args:
+            api (krakenex.API): The underlying Kraken API connection.
+            cache (ResponseCache): Optional cache for public endpoint responses.
+            rate_governor (KrakenRateGovernor): Optional rate limit model that delays
+                calls before Kraken would reject them.
+            retry_policy (RetryPolicy): Backoff applied to transient failures of idempotent
+                public calls. Defaults to RetryPolicy().
+
+        Every call raises a KrakenAPIError subclass from common.exceptions on failure.
+        """
         self.api = api
+        self.cache = cache
+        self.rate_governor = rate_governor
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    def _query_public(self, method: str, data: dict = None):
+        '''send a public query, going through the response cache when one is configured'''
+        if self.cache is None:
+            return self._send(method, data, private=False)
+        return self.cache.get_or_fetch(method, data, lambda: self._send(method, data, private=False))
+
+    def _query_private(self, method: str, data: dict = None):
+        '''send a private query'''
+        return self._send(method, data, private=True)
+
+    def _send(self, method: str, data: dict, private: bool):
+        attempt = 1
+        while True:
+            try:
+                return self._send_once(method, data, private)
+            except KrakenAPIError as e:
+                # only idempotent public calls are retried, so an AddOrder is never sent twice
+                if attempt >= self.retry_policy.max_attempts or not is_retryable(method, private, e):
+                    raise
+                time.sleep(self.retry_policy.backoff(attempt))
+                attempt += 1
 
-    def get_ohlc(self, pair: str, interval: str, since: int, until: int):
+    def _send_once(self, method: str, data: dict, private: bool):
+        if self.rate_governor is not None:
+            self.rate_governor.acquire(method, private)
+        try:
+            if private:
+                response = self.api.query_private(method, data)
+            else:
+                response = self.api.query_public(method, data)
+        except requests.HTTPError as e:
+            raise error_for_status(method, e.response.status_code) from e
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise KrakenAPIConnectionError(f"Error calling {method}: {e}") from e
+        if self.rate_governor is not None and KrakenRateGovernor.is_rate_limit_error(response.get('error')):
+            self.rate_governor.penalize(method, private)
+        raise_for_kraken_errors(method, response.get('error'))
+        return response
+
+    def get_ohlc(self, pair: str, interval: str, since: int = None, until: int = None):
         '''fetch OHLC from Kraken'''
-        response = self.api.query_public('OHLC', {'pair': pair, 'interval': interval, 'since': since, 'until': until})
-        if response.get('error'):
-            raise Exception(f"Error fetching OHLC: {response['error']}")
+        params = {'pair': pair, 'interval': interval, 'since': since, 'until': until}
+        response = self._query_public('OHLC', {key: value for key, value in params.items() if value is not None})
         return response['result']
         
     def get_balance(self):
         '''fetch balance from Kraken'''
-        response = self.api.query_private('Balance')
-        if response.get('error'):
-            raise Exception(f"Error fetching balance: {response['error']}")
+        response = self._query_private('Balance')
         return response['result']
 
     def fetch_assets(self):
         '''fetch all assets from Kraken'''
-        response = self.api.query_public('Assets')
-        if response.get('error'):
-            raise Exception(f"Error fetching assets: {response['error']}")
+        response = self._query_public('Assets')
+        return response['result']
+
+    def fetch_asset_pairs(self):
+        '''fetch all tradable asset pairs from Kraken'''
+        response = self._query_public('AssetPairs')
         return response['result']
     
     def fetch_asset_history(self, asset: str, start: int, end: int):
-        '''fetch asset history from Kraken'''
-        response = self.api.query_public('Trades', {'pair': asset})
-        if response.get('error'):
-            raise Exception(f"Error fetching asset history: {response['error']}")
-        return response['result']
+        '''fetch asset history from Kraken between the unix timestamps start and end
+        returns {pair: trades, 'last': cursor} with every page concatenated
+        '''
+        pair_key = asset
+        trades = []
+        last = None
+        for pair_key, batch, last in self.iter_trade_history(asset, start, end):
+            trades.extend(batch)
+        return {pair_key: trades, 'last': last}
+
+    def iter_trade_history(self, pair: str, start: int, end: int = None, checkpoint: CheckpointStore = None,
+                           count: int = TRADES_PAGE_SIZE):
+        """
+        Backfill public trades page by page, following Kraken's `last` cursor.
+
+        Only one page is held in memory at a time. When a checkpoint store is given,
+        the cursor is saved after every page and a later call resumes from it; the
+        checkpoint is cleared once the range has been fully read.
+
+        Args:
+            pair (str): The currency pair (e.g., 'XXBTZUSD').
+            start (int): Unix timestamp (seconds) to start from.
+            end (int): Unix timestamp (seconds) to stop at. None reads up to the present.
+            checkpoint (CheckpointStore): Optional store used to resume an interrupted backfill.
+            count (int): Trades requested per page (Kraken allows up to 1000).
+
+        Yields:
+            tuple: (pair_key, trades, last) where `pair_key` is the pair name Kraken
+                returns, `trades` a list of trade rows and `last` the cursor after them.
+        """
+        checkpoint_key = f'trades:{pair}:{start}:{end}'
+        since = checkpoint.get(checkpoint_key, start) if checkpoint else start
+        while True:
+            result = self._query_public('Trades', {'pair': pair, 'since': since, 'count': count})['result']
+            last = result['last']
+            pair_key, trades = next((key, rows) for key, rows in result.items() if key != 'last')
+            finished = len(trades) < count or str(last) == str(since)
+            if end is not None and trades and float(trades[-1][2]) >= end:
+                trades = [trade for trade in trades if float(trade[2]) < end]
+                finished = True
+            if trades:
+                yield pair_key, trades, last
+            if checkpoint:
+                if finished:
+                    checkpoint.delete(checkpoint_key)
+                else:
+                    checkpoint.set(checkpoint_key, last)
+            if finished:
+                return
+            since = last
 
     def fetch_ticker(self, pair: str):
         """
@@ -43,48 +202,188 @@ class KrakenAPIClient:
             dict: The ticker information for the given currency pair.
 
         Raises:
-            Exception: If there is an error fetching the ticker from Kraken.
+            KrakenAPIError: If there is an error fetching the ticker from Kraken.
         """
         '''fetch ticker for a given pair from Kraken'''
-        response = self.api.query_public('Ticker', {'pair': pair})
-        if response.get('error'):
-            raise Exception(f"Error fetching ticker: {response['error']}")
+        response = self._query_public('Ticker', {'pair': pair})
         return response['result'][pair]
 
+    def fetch_tickers(self, pairs: list, max_workers: int = 4):
+        """
+        Fetch ask/bid/last prices for many currency pairs in as few requests as possible.
+
+        The pair list is split into comma-separated chunks that stay under
+        TICKER_PAIRS_MAX_CHARS, and the chunks are requested concurrently.
+
+        Args:
+            pairs (list): The currency pairs to fetch (e.g., ['XXBTZUSD', 'XETHZUSD']).
+            max_workers (int): Maximum number of chunks requested at the same time.
+
+        Returns:
+            dict: Pair -> TickerQuote(ask, bid, last), keyed by the pair names Kraken returns.
+
+        Raises:
+            KrakenAPIError: If there is an error fetching any chunk from Kraken.
+        """
+        chunks = self._chunk_pairs(list(dict.fromkeys(pairs)))
+        if len(chunks) <= 1:
+            results = [self._fetch_ticker_chunk(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                results = list(pool.map(self._fetch_ticker_chunk, chunks))
+        quotes = {}
+        for result in results:
+            for pair, ticker in result.items():
+                quotes[pair] = TickerQuote(float(ticker['a'][0]), float(ticker['b'][0]), float(ticker['c'][0]))
+        return quotes
+
+    def _fetch_ticker_chunk(self, pairs: list):
+        response = self._query_public('Ticker', {'pair': ','.join(pairs)})
+        return response['result']
+
+    @staticmethod
+    def _chunk_pairs(pairs: list):
+        chunks = []
+        current = []
+        length = 0
+        for pair in pairs:
+            if current and length + len(pair) + 1 > TICKER_PAIRS_MAX_CHARS:
+                chunks.append(current)
+                current = []
+                length = 0
+            current.append(pair)
+            length += len(pair) + 1
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def fetch_order_book(self, pair: str, count: int = DEPTH_LEVELS):
+        """
+        Fetch the top `count` bid and ask levels for a currency pair.
+
+        Args:
+            pair (str): The currency pair (e.g., 'XXBTZUSD').
+            count (int): Levels per side (Kraken allows up to 500).
+
+        Returns:
+            BookSnapshot: The book with [price, volume] rows, best first.
+        """
+        response = self._query_public('Depth', {'pair': pair, 'count': count})
+        return snapshot_from_depth(pair, next(iter(response['result'].values())))
+
+    def fetch_order_books(self, pairs: list, count: int = DEPTH_LEVELS, max_workers: int = 4,
+                          return_exceptions: bool = False):
+        """
+        Order books for several pairs, requested concurrently since Depth takes one pair per call.
+
+        Args:
+            pairs (list): The currency pairs.
+            count (int): Levels per side.
+            max_workers (int): Maximum Depth requests in flight at once.
+            return_exceptions (bool): Map a pair whose request failed to its KrakenAPIError
+                instead of raising it.
+
+        Returns:
+            dict: Pair -> BookSnapshot (or KrakenAPIError with `return_exceptions`).
+        """
+        def fetch(pair):
+            try:
+                return self.fetch_order_book(pair, count)
+            except KrakenAPIError as e:
+                if not return_exceptions:
+                    raise
+                return e
+
+        pairs = list(dict.fromkeys(pairs))
+        if len(pairs) <= 1:
+            return {pair: fetch(pair) for pair in pairs}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pairs))) as pool:
+            return dict(zip(pairs, pool.map(fetch, pairs)))
+
     def place_order(self, pair: str, order_type: str, volume: float):
         '''place an order on Kraken with params
         pair: trading pair (e.g., 'XXBTZUSD')
         order_type: 'buy' or 'sell'
         volume: amount to buy/sell
         '''
-        response = self.api.query_private('AddOrder', {
+        response = self._query_private('AddOrder', {
             'pair': pair,
             'type': order_type,
             'ordertype': 'market',
             'volume': volume
         })
-        if response.get('error'):
-            raise Exception(f"Error placing order: {response['error']}")
+        return response['result']
+
+    def query_orders(self, txids: list):
+        """
+        Fetch the status of up to QUERY_ORDERS_MAX orders in one QueryOrders call.
+
+        Args:
+            txids (list): Order transaction IDs.
+
+        Returns:
+            dict: txid -> order info (status, vol, vol_exec, cost, fee, price, ...).
+
+        Raises:
+            ValueError: If more than QUERY_ORDERS_MAX txids are given.
+        """
+        if len(txids) > QUERY_ORDERS_MAX:
+            raise ValueError(f"QueryOrders accepts at most {QUERY_ORDERS_MAX} txids, got {len(txids)}")
+        response = self._query_private('QueryOrders', {'txid': ','.join(txids)})
+        return response['result']
+
+    def fetch_open_orders(self):
+        '''fetch every open order as txid -> order info'''
+        response = self._query_private('OpenOrders')
+        return response['result']['open']
+
+    def cancel_order(self, txid: str):
+        '''cancel an open order by txid; returns {'count': n}'''
+        response = self._query_private('CancelOrder', {'txid': txid})
+        return response['result']
+
+    def cancel_orders(self, txids: list):
+        """
+        Cancel up to CANCEL_ORDERS_MAX open orders in one CancelOrderBatch call.
+
+        Args:
+            txids (list): Order transaction IDs.
+
+        Returns:
+            dict: {'count': n}, the number of orders canceled.
+
+        Raises:
+            ValueError: If more than CANCEL_ORDERS_MAX txids are given.
+        """
+        if len(txids) > CANCEL_ORDERS_MAX:
+            raise ValueError(f"CancelOrderBatch accepts at most {CANCEL_ORDERS_MAX} txids, got {len(txids)}")
+        response = self._query_private('CancelOrderBatch', {'orders': list(txids)})
         return response['result']
 
 class AssetPair:
-    def __init__(self, crypto_a: str, crypto_b: str, assets: dict):
+    def __init__(self, crypto_a: str, crypto_b: str, assets):
         """
         Initializes the ExchangeTool with the given cryptocurrencies and assets.
 
         Args:
             crypto_a (str): The symbol of the first cryptocurrency.
             crypto_b (str): The symbol of the second cryptocurrency.
-            assets (dict): A dictionary containing asset information.
+            assets (dict or AssetRegistry): A dictionary containing asset information,
+                or a shared AssetRegistry to resolve symbols against.
 
         Attributes:
             crypto_a (str): The symbol of the first cryptocurrency in uppercase.
             crypto_b (str): The symbol of the second cryptocurrency in uppercase.
-            assets (dict): A dictionary containing asset information.
+            assets (dict or AssetRegistry): The asset information passed in.
+            registry (AssetRegistry): The index used for asset ID lookups.
         """
         self.crypto_a = crypto_a.upper()
         self.crypto_b = crypto_b.upper()
         self.assets = assets
+        if isinstance(assets, AssetRegistry):
+            self.registry = assets
+        else:
+            self.registry = AssetRegistry.from_assets(assets)
 
     def get_pair_symbol(self):
         """
@@ -115,20 +414,157 @@ class AssetPair:
         Returns:
             str or None: The asset ID if found, otherwise None.
         """
-        for asset_id, info in self.assets.items():
-            if info['altname'] == altname:
-                return asset_id
-        return None
+        return self.registry.get_asset_id(altname)
 
 class TradeExecutor:
-    def __init__(self, api_client: KrakenAPIClient):
+    def __init__(self, api_client: KrakenAPIClient, registry: AssetRegistry = None, order_tracker=None):
         """
         Initializes the ExchangeTool with a KrakenAPIClient instance.
 
         Args:
             api_client (KrakenAPIClient): An instance of KrakenAPIClient to interact with the Kraken API.
+            registry (AssetRegistry): Shared symbol index. Defaults to one backed by `api_client`.
+            order_tracker (OrderTracker): Optional tracker every placed order is registered with.
         """
         self.api_client = api_client
+        self.registry = registry or AssetRegistry(api_client)
+        self.order_tracker = order_tracker
+
+    def _place_order(self, pair: str, volume: float):
+        result = self.api_client.place_order(pair, 'buy', volume)
+        if self.order_tracker is not None:
+            self.order_tracker.track_result(result, pair, volume)
+        return result
+
+    def _feed_book(self, book_source, pair: str):
+        symbol = self.registry.get_websocket_symbol(pair)
+        if symbol is None:
+            return None
+        try:
+            return book_source(symbol)
+        except KeyError:
+            return None
+
+    def quote_basket(self, legs: list):
+        """
+        Resolve and price every leg of a basket with one batched ticker request.
+
+        Legs are resolved to Kraken's canonical pair names, which is how Ticker keys its
+        result. A leg that cannot be resolved or priced is reported in its LegQuote
+        instead of failing the whole basket.
+
+        Args:
+            legs (list): (crypto_a, crypto_b) tuples, e.g. [('XBT', 'USD'), ('ETH', 'USD')].
+
+        Returns:
+            list: LegQuote per leg, in the same order as `legs`.
+        """
+        pairs, errors = [], {}
+        for index, (crypto_a, crypto_b) in enumerate(legs):
+            try:
+                pairs.append(self._resolve_pair(crypto_a, crypto_b))
+            except (ValueError, KrakenAPIError) as e:
+                pairs.append(None)
+                errors[index] = e
+        requested = list(dict.fromkeys(pair for pair in pairs if pair is not None))
+        failures = {}
+        try:
+            quotes = self.api_client.fetch_tickers(requested)
+        except KrakenAPIError:
+            # Kraken rejects the whole request for one bad pair, so price the legs one by one
+            quotes = {}
+            for pair in requested:
+                try:
+                    quotes.update(self.api_client.fetch_tickers([pair]))
+                except KrakenAPIError as e:
+                    failures[pair] = e
+        quotes = {self._canonical_pair(pair): quote for pair, quote in quotes.items()}
+
+        basket = []
+        for index, pair in enumerate(pairs):
+            if pair is None:
+                basket.append(LegQuote(None, None, errors[index]))
+            elif pair in failures:
+                basket.append(LegQuote(pair, None, failures[pair]))
+            elif pair not in quotes:
+                basket.append(LegQuote(pair, None, KrakenAPIResponseError(f"No ticker returned for {pair}")))
+            else:
+                basket.append(LegQuote(pair, quotes[pair], None))
+        return basket
+
+    def _resolve_pair(self, crypto_a: str, crypto_b: str):
+        '''Kraken's pair name for two assets, e.g. SOL/USD -> SOLUSD; ValueError when unknown'''
+        return self._canonical_pair(self.registry.get_pair(crypto_a, crypto_b)
+                                    or AssetPair(crypto_a, crypto_b, self.registry).get_pair_symbol())
+
+    def _canonical_pair(self, pair: str):
+        '''Kraken's pair name for an altname such as XBTUSD; other names pass through'''
+        return self.registry.get_pair_by_altname(pair) or pair
+
+    def execute_basket(self, legs: list, quote: str = 'USD', max_workers: int = 4, depth: int = DEPTH_LEVELS,
+                       book_source=None, max_slippage_bps: float = None):
+        """
+        Buy a basket of cryptocurrencies, sizing every leg against order book depth.
+
+        All legs are resolved and their books fetched in one concurrent step before any
+        order is sent, so every leg is priced against the same moment of the market.
+        Each leg's volume is what its dollar amount buys when swept through the asks,
+        instead of `dollar_amount / ask`, and the orders are submitted concurrently on
+        a bounded pool. A leg whose pair cannot be resolved, whose book cannot be
+        fetched or whose order fails carries the exception in `LegFill.error`; the
+        other legs still go through.
+
+        Args:
+            legs (list): (symbol, dollar_amount) tuples, e.g. [('XBT', 50), ('ETH', 25)].
+            quote (str): Currency the dollar amounts are spent in.
+            max_workers (int): Maximum book requests or orders in flight at once.
+            depth (int): Book levels fetched per pair.
+            book_source (callable): Optional `symbol -> BookSnapshot or None` lookup keyed by
+                v2 WebSocket symbol (e.g. 'BTC/USD'), such as KrakenMarketFeed.book. Pairs
+                it has no book for (None or KeyError) fall back to REST Depth.
+            max_slippage_bps (float): Skip legs whose expected slippage exceeds this.
+
+        Returns:
+            list: LegFill per leg, in the same order as `legs`.
+        """
+        pairs, errors = [], {}
+        for index, (symbol, _) in enumerate(legs):
+            try:
+                pairs.append(self._resolve_pair(symbol, quote))
+            except (ValueError, KrakenAPIError) as e:
+                pairs.append(None)
+                errors[index] = e
+        resolved = [pair for pair in pairs if pair is not None]
+        books = {pair: self._feed_book(book_source, pair) for pair in resolved} if book_source else {}
+        missing = [pair for pair in resolved if books.get(pair) is None]
+        books.update(self.api_client.fetch_order_books(missing, depth, max_workers, return_exceptions=True))
+
+        def submit(leg):
+            index, (symbol, dollar_amount), pair = leg
+            book = books.get(pair)
+            # an unresolved pair or a failed Depth request only fails its own leg
+            error = errors.get(index, book if isinstance(book, Exception) else None)
+            if error is not None:
+                return LegFill(symbol, pair, dollar_amount, 0.0, None, None, None, None, None, error)
+            best_ask = book.best_ask
+            try:
+                volume, expected_price, _ = walk_book(book.asks, dollar_amount)
+                slippage_bps = (expected_price / best_ask - 1) * 10_000
+                if max_slippage_bps is not None and slippage_bps > max_slippage_bps:
+                    raise ValueError(f"Expected slippage {slippage_bps:.1f}bps on {pair} exceeds {max_slippage_bps}bps")
+            except ValueError as e:
+                return LegFill(symbol, pair, dollar_amount, 0.0, best_ask, None, None, None, None, e)
+            started = time.perf_counter()
+            try:
+                result = self._place_order(pair, volume)
+            except KrakenAPIError as e:
+                return LegFill(symbol, pair, dollar_amount, volume, best_ask, expected_price, slippage_bps,
+                               time.perf_counter() - started, None, e)
+            return LegFill(symbol, pair, dollar_amount, volume, best_ask, expected_price, slippage_bps,
+                           time.perf_counter() - started, result, None)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(legs)))) as pool:
+            return list(pool.map(submit, zip(range(len(legs)), legs, pairs)))
 
     def execute_trade(self, crypto_a: str, crypto_b: str, dollar_amount: float):
         """
@@ -140,8 +576,7 @@ class TradeExecutor:
         Returns:
             dict: The result of the order placed, as returned by the API client.
         """
-        assets = self.api_client.fetch_assets()
-        asset_pair = AssetPair(crypto_a, crypto_b, assets)
+        asset_pair = AssetPair(crypto_a, crypto_b, self.registry)
         pair_symbol = asset_pair.get_pair_symbol()
 
         ticker = self.api_client.fetch_ticker(pair_symbol)
@@ -149,5 +584,5 @@ class TradeExecutor:
 
         volume = dollar_amount / ask_price
 
-        order_result = self.api_client.place_order(pair_symbol, 'buy', volume)
+        order_result = self._place_order(pair_symbol, volume)
         return order_result
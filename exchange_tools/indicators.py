@@ -0,0 +1,280 @@
+import numpy as np
+import pandas as pd
+
+# Arrays are 2-D with one row per pair and one column per candle, oldest first. Every
+# batch function has an incremental counterpart in IndicatorEngine that produces the
+# same values, so a history can be warmed up in bulk and then advanced candle by candle.
+
+
+def _along_time(values: np.ndarray, apply):
+    '''run a pandas column-wise operation over the time axis of a (pairs, candles) array'''
+    frame = pd.DataFrame(np.asarray(values, dtype=np.float64).T)
+    return apply(frame).to_numpy().T
+
+
+def ema(values: np.ndarray, span: int):
+    '''exponential moving average with alpha = 2 / (span + 1), seeded with the first value'''
+    return _along_time(values, lambda frame: frame.ewm(span=span, adjust=False).mean())
+
+
+def wilder(values: np.ndarray, period: int):
+    '''Wilder's smoothing (alpha = 1 / period), seeded with the first value'''
+    return _along_time(values, lambda frame: frame.ewm(alpha=1.0 / period, adjust=False).mean())
+
+
+def _rsi_from_averages(avg_gain: np.ndarray, avg_loss: np.ndarray):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0, 100.0, rsi)
+    return np.where((avg_gain == 0) & (avg_loss == 0), 50.0, rsi)
+
+
+def rsi(close: np.ndarray, period: int = 14):
+    """
+    Relative strength index with Wilder smoothing of gains and losses.
+
+    Returns:
+        np.ndarray: Same shape as `close`; the first candle is NaN.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.diff(close, axis=1)
+    avg_gain = wilder(np.clip(delta, 0, None), period)
+    avg_loss = wilder(np.clip(-delta, 0, None), period)
+    result = np.full(close.shape, np.nan)
+    result[:, 1:] = _rsi_from_averages(avg_gain, avg_loss)
+    return result
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray):
+    '''true range; the first candle has no previous close and uses high - low'''
+    high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    previous = np.concatenate([close[:, :1], close[:, :-1]], axis=1)
+    ranges = np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+    ranges[:, 0] = high[:, 0] - low[:, 0]
+    return ranges
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14):
+    '''average true range with Wilder smoothing'''
+    return wilder(true_range(high, low, close), period)
+
+
+def vwap(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray, window: int = None):
+    """
+    Volume-weighted average of the typical price (high + low + close) / 3.
+
+    Args:
+        window (int): Candles per rolling window; None accumulates from the first candle.
+    """
+    typical = (np.asarray(high, dtype=np.float64) + low + close) / 3
+    volume = np.asarray(volume, dtype=np.float64)
+    notional = np.cumsum(typical * volume, axis=1)
+    traded = np.cumsum(volume, axis=1)
+    if window is not None:
+        notional[:, window:] = notional[:, window:] - notional[:, :-window]
+        traded[:, window:] = traded[:, window:] - traded[:, :-window]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return notional / traded
+
+
+def log_returns(close: np.ndarray):
+    '''log returns; the first candle is NaN'''
+    close = np.asarray(close, dtype=np.float64)
+    returns = np.full(close.shape, np.nan)
+    returns[:, 1:] = np.log(close[:, 1:] / close[:, :-1])
+    return returns
+
+
+def rolling_volatility(close: np.ndarray, window: int = 20):
+    '''sample standard deviation of the last `window` log returns (not annualized)'''
+    returns = log_returns(close)
+    return _along_time(returns, lambda frame: frame.rolling(window).std())
+
+
+def stack_ohlc(frames: dict):
+    """
+    Align per-pair OHLC DataFrames (see trade_frames.ohlc_to_dataframe) into 2-D arrays.
+
+    Candles missing for a pair are forward-filled with zero volume.
+
+    Args:
+        frames (dict): Pair -> OHLC DataFrame with a `time` column.
+
+    Returns:
+        tuple: (pairs, times, {'open', 'high', 'low', 'close', 'volume'} -> (pairs, candles) arrays).
+    """
+    pairs = list(frames)
+    times = pd.DatetimeIndex(sorted(set().union(*(frame['time'] for frame in frames.values()))))
+    arrays = {}
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        table = pd.DataFrame({pair: frame.set_index('time')[column].astype(np.float64) for pair, frame in frames.items()},
+                             index=times)
+        table = table.fillna(0.0) if column == 'volume' else table.ffill()
+        arrays[column] = table[pairs].to_numpy().T
+    # a forward-filled candle is flat at the previous close
+    for column in ('open', 'high', 'low'):
+        arrays[column] = np.where(np.isnan(arrays[column]), arrays['close'], arrays[column])
+    return pairs, times, arrays
+
+
+class IndicatorEngine:
+    def __init__(self, pairs: list, ema_spans: tuple = (12, 26), rsi_period: int = 14, atr_period: int = 14,
+                 volatility_window: int = 20, vwap_window: int = None):
+        """
+        Incremental indicators for many pairs at once.
+
+        `warm_up` computes the full history with the batch functions and keeps only the
+        state each indicator needs; `update` then folds in one candle per pair in O(1)
+        (a handful of vectorized operations over the pairs axis), giving the same values
+        the batch functions would over the extended history.
+
+        Args:
+            pairs (list): Pair names, one per row of every array.
+            ema_spans (tuple): EMA spans to maintain.
+            rsi_period (int): RSI period.
+            atr_period (int): ATR period.
+            volatility_window (int): Log returns per rolling volatility window.
+            vwap_window (int): Candles per rolling VWAP window; None for cumulative VWAP.
+        """
+        self.pairs = list(pairs)
+        self.ema_spans = tuple(ema_spans)
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.volatility_window = volatility_window
+        self.vwap_window = vwap_window
+        self.candles = 0
+        self.values = {}
+        self._previous_close = None
+
+    def warm_up(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        """
+        Initialize from (pairs, candles) history and return the full indicator arrays.
+
+        Returns:
+            dict: Indicator name -> (pairs, candles) array.
+        """
+        high, low, close, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, volume))
+        count = close.shape[1]
+        history = {f'ema_{span}': ema(close, span) for span in self.ema_spans}
+        delta = np.diff(close, axis=1)
+        avg_gain = wilder(np.clip(delta, 0, None), self.rsi_period)
+        avg_loss = wilder(np.clip(-delta, 0, None), self.rsi_period)
+        history['rsi'] = np.full(close.shape, np.nan)
+        history['rsi'][:, 1:] = _rsi_from_averages(avg_gain, avg_loss)
+        history['atr'] = atr(high, low, close, self.atr_period)
+        history['vwap'] = vwap(high, low, close, volume, self.vwap_window)
+        history['volatility'] = rolling_volatility(close, self.volatility_window)
+
+        self._ema = {span: history[f'ema_{span}'][:, -1].copy() for span in self.ema_spans}
+        self._avg_gain = avg_gain[:, -1].copy() if count > 1 else None
+        self._avg_loss = avg_loss[:, -1].copy() if count > 1 else None
+        self._atr = history['atr'][:, -1].copy()
+        self._previous_close = close[:, -1].copy()
+
+        notional = (high + low + close) / 3 * volume
+        if self.vwap_window is None:
+            self._notional_sum = notional.sum(axis=1)
+            self._volume_sum = volume.sum(axis=1)
+        else:
+            self._notional_ring = self._ring(notional, self.vwap_window)
+            self._volume_ring = self._ring(volume, self.vwap_window)
+            self._notional_sum = self._notional_ring.sum(axis=1)
+            self._volume_sum = self._volume_ring.sum(axis=1)
+            self._vwap_position = count % self.vwap_window
+
+        returns = log_returns(close)[:, 1:]
+        self._return_ring = self._ring(returns, self.volatility_window)
+        self._return_sum = self._return_ring.sum(axis=1)
+        self._return_sumsq = (self._return_ring ** 2).sum(axis=1)
+        self._return_position = returns.shape[1] % self.volatility_window
+        self._return_count = min(returns.shape[1], self.volatility_window)
+
+        self.candles = count
+        self.values = {name: array[:, -1].copy() for name, array in history.items()}
+        return history
+
+    @staticmethod
+    def _ring(values: np.ndarray, window: int):
+        '''the last `window` columns laid out as a ring buffer indexed by column % window'''
+        ring = np.zeros((values.shape[0], window))
+        count = values.shape[1]
+        for column in range(max(0, count - window), count):
+            ring[:, column % window] = values[:, column]
+        return ring
+
+    def update(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+        """
+        Fold in one new candle per pair.
+
+        Args:
+            high, low, close, volume (np.ndarray): 1-D arrays with one value per pair.
+
+        Returns:
+            dict: Indicator name -> 1-D array of the latest values.
+        """
+        high, low, close, volume = (np.asarray(a, dtype=np.float64) for a in (high, low, close, volume))
+        if self._previous_close is None:
+            self.warm_up(high[:, None], low[:, None], close[:, None], volume[:, None])
+            return self.values
+        previous = self._previous_close
+        values = {}
+        for span in self.ema_spans:
+            alpha = 2.0 / (span + 1)
+            self._ema[span] = self._ema[span] + alpha * (close - self._ema[span])
+            values[f'ema_{span}'] = self._ema[span].copy()
+
+        delta = close - previous
+        gain, loss = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+        if self._avg_gain is None:
+            self._avg_gain, self._avg_loss = gain, loss
+        else:
+            self._avg_gain = self._avg_gain + (gain - self._avg_gain) / self.rsi_period
+            self._avg_loss = self._avg_loss + (loss - self._avg_loss) / self.rsi_period
+        values['rsi'] = _rsi_from_averages(self._avg_gain, self._avg_loss)
+
+        tr = np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+        self._atr = self._atr + (tr - self._atr) / self.atr_period
+        values['atr'] = self._atr.copy()
+
+        notional = (high + low + close) / 3 * volume
+        if self.vwap_window is not None:
+            slot = self._vwap_position
+            self._notional_sum = self._notional_sum - self._notional_ring[:, slot]
+            self._volume_sum = self._volume_sum - self._volume_ring[:, slot]
+            self._notional_ring[:, slot] = notional
+            self._volume_ring[:, slot] = volume
+            self._vwap_position = (slot + 1) % self.vwap_window
+        self._notional_sum = self._notional_sum + notional
+        self._volume_sum = self._volume_sum + volume
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values['vwap'] = self._notional_sum / self._volume_sum
+
+        returned = np.log(close / previous)
+        slot = self._return_position
+        if self._return_count == self.volatility_window:
+            evicted = self._return_ring[:, slot]
+            self._return_sum = self._return_sum - evicted
+            self._return_sumsq = self._return_sumsq - evicted ** 2
+        else:
+            self._return_count += 1
+        self._return_ring[:, slot] = returned
+        self._return_sum = self._return_sum + returned
+        self._return_sumsq = self._return_sumsq + returned ** 2
+        self._return_position = (slot + 1) % self.volatility_window
+        values['volatility'] = self._volatility()
+
+        self._previous_close = close
+        self.candles += 1
+        self.values = values
+        return values
+
+    def _volatility(self):
+        window = self.volatility_window
+        if self._return_count < window or window < 2:
+            return np.full(len(self.pairs), np.nan)
+        variance = (self._return_sumsq - self._return_sum ** 2 / window) / (window - 1)
+        return np.sqrt(np.maximum(variance, 0.0))
+
+    def snapshot(self):
+        '''latest indicator values as a DataFrame indexed by pair, e.g. as market state for a prompt'''
+        return pd.DataFrame(self.values, index=pd.Index(self.pairs, name='pair'))
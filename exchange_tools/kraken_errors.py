@@ -0,0 +1,102 @@
+import random
+from common.exceptions import (
+    KrakenAPIAuthenticationError,
+    KrakenAPIConnectionError,
+    KrakenAPIInternalServerError,
+    KrakenAPIInvalidInputError,
+    KrakenAPINotFoundError,
+    KrakenAPIPermissionError,
+    KrakenAPIRateLimitError,
+    KrakenAPIRequestError,
+    KrakenAPIResponseError,
+    KrakenAPIUnkownPairError,
+)
+
+# Kraken error prefixes -> exception class, checked in order so longer prefixes go first
+KRAKEN_ERROR_CLASSES = [
+    ('EAPI:Rate limit exceeded', KrakenAPIRateLimitError),
+    ('EOrder:Rate limit exceeded', KrakenAPIRateLimitError),
+    ('EGeneral:Too many requests', KrakenAPIRateLimitError),
+    ('EService:Throttled', KrakenAPIRateLimitError),
+    ('EService:Unavailable', KrakenAPIInternalServerError),
+    ('EService:Busy', KrakenAPIInternalServerError),
+    ('EService:Deadline elapsed', KrakenAPIInternalServerError),
+    ('EGeneral:Internal error', KrakenAPIInternalServerError),
+    ('EAPI:Invalid key', KrakenAPIAuthenticationError),
+    ('EAPI:Invalid signature', KrakenAPIAuthenticationError),
+    ('EAPI:Invalid nonce', KrakenAPIAuthenticationError),
+    ('EAPI:Bad request', KrakenAPIRequestError),
+    ('EGeneral:Permission denied', KrakenAPIPermissionError),
+    ('EAPI:Feature disabled', KrakenAPIPermissionError),
+    ('EQuery:Unknown asset pair', KrakenAPIUnkownPairError),
+    ('EQuery:Unknown asset', KrakenAPINotFoundError),
+    ('EOrder:Unknown order', KrakenAPINotFoundError),
+    ('EGeneral:Unknown method', KrakenAPINotFoundError),
+    ('EGeneral:Invalid arguments', KrakenAPIInvalidInputError),
+    ('EOrder:Invalid price', KrakenAPIInvalidInputError),
+    ('EOrder:Order minimum not met', KrakenAPIInvalidInputError),
+    ('EOrder:', KrakenAPIRequestError),
+]
+
+# errors worth retrying: the same request may succeed a moment later
+TRANSIENT_ERRORS = (KrakenAPIConnectionError, KrakenAPIInternalServerError, KrakenAPIRateLimitError)
+
+# public endpoints that are safe to resend; private calls (and above all AddOrder) never are
+IDEMPOTENT_ENDPOINTS = {'Assets', 'AssetPairs', 'Ticker', 'OHLC', 'Trades', 'Depth', 'Spread', 'Time', 'SystemStatus'}
+
+
+def error_class_for(error: str):
+    '''the KrakenAPIError subclass for one Kraken error string'''
+    for prefix, error_class in KRAKEN_ERROR_CLASSES:
+        if error.startswith(prefix):
+            return error_class
+    return KrakenAPIResponseError
+
+
+def raise_for_kraken_errors(method: str, errors: list):
+    """
+    Raise the mapped KrakenAPIError subclass if a Kraken response carries errors.
+
+    Args:
+        method (str): The endpoint that was called, used in the message.
+        errors (list): The `error` list of the Kraken response.
+
+    Raises:
+        KrakenAPIError: The subclass matching the first error.
+    """
+    if errors:
+        raise error_class_for(errors[0])(f"Error calling {method}: {errors}")
+
+
+def error_for_status(method: str, status_code: int):
+    '''the KrakenAPIError for a non-2xx HTTP status'''
+    if status_code == 429:
+        return KrakenAPIRateLimitError(f"Error calling {method}: HTTP {status_code}")
+    if status_code >= 500:
+        return KrakenAPIInternalServerError(f"Error calling {method}: HTTP {status_code}")
+    return KrakenAPIRequestError(f"Error calling {method}: HTTP {status_code}")
+
+
+def is_retryable(method: str, private: bool, error: Exception):
+    '''True if `error` from a call to `method` may be retried without side effects'''
+    return not private and method in IDEMPOTENT_ENDPOINTS and isinstance(error, TRANSIENT_ERRORS)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 8.0):
+        """
+        Jittered exponential backoff for idempotent public Kraken calls.
+
+        Args:
+            max_attempts (int): Total attempts including the first one.
+            base_delay (float): Backoff ceiling in seconds after the first failure.
+            max_delay (float): Upper bound for any single backoff.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int):
+        '''seconds to sleep after failed attempt number `attempt` (1-based), with full jitter'''
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
@@ -0,0 +1,285 @@
+import base64
+import bisect
+import collections
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+import krakenex
+import numpy as np
+from common.exceptions import KrakenAPIRateLimitError
+from exchange_tools.kraken_tools import get_kraken_signature
+from exchange_tools.rate_governor import ORDER_ENDPOINTS, KrakenRateGovernor
+from exchange_tools.simulated_exchange import SimulatedKrakenAPI
+
+DEFAULT_PRICES = {'XBT/USD': 60_000.0, 'ETH/USD': 3_000.0, 'SOL/USD': 150.0, 'XRP/USD': 0.5, 'XRP/XBT': 0.0000085}
+DEFAULT_BALANCES = {'USD': 100_000.0, 'XBT': 1.0}
+TRADES_PAGE_MAX = 1000
+
+
+class KrakenSimulator(SimulatedKrakenAPI):
+    def __init__(self, prices: dict = None, balances: dict = None, latency=0.0, rate_limits: KrakenRateGovernor = None,
+                 error_rate: float = 0.0, trades_per_candle: int = 20, max_trades: int = 100_000, seed: int = 0,
+                 **exchange_kwargs):
+        """
+        Self-running Kraken market for offline tests and load tests.
+
+        Extends SimulatedKrakenAPI with a random-walk price generator, the public Trades
+        endpoint, per-call latency and server-side rate limiting, so code written against
+        krakenex sees realistic payloads, delays and failures. Use it in-process as the
+        `api` of a KrakenAPIClient, or over HTTP through KrakenSimulatorServer.
+
+        Market orders fill on the next candle, so call `step` (or `generate`) to move the
+        market after placing them.
+
+        Args:
+            prices (dict): wsname -> starting price; defaults to DEFAULT_PRICES.
+            balances (dict): Starting balances by altname; defaults to DEFAULT_BALANCES.
+            latency (float or tuple): Seconds slept per call, or a (low, high) range drawn uniformly.
+            rate_limits (KrakenRateGovernor): Limits enforced on callers; calls its buckets
+                cannot cover are rejected with Kraken's rate limit errors. None disables limits.
+            error_rate (float): Probability of answering any call with 'EService:Unavailable'.
+            trades_per_candle (int): Synthetic public trades generated per candle.
+            max_trades (int): Trades kept per pair for the Trades endpoint.
+            seed (int): Seed of the price and trade generator.
+            **exchange_kwargs: Fee, spread and slippage settings of SimulatedKrakenAPI.
+        """
+        self.start_prices = dict(prices or DEFAULT_PRICES)
+        super().__init__(list(self.start_prices), DEFAULT_BALANCES if balances is None else balances, **exchange_kwargs)
+        self.latency = latency
+        self.rate_limits = rate_limits
+        self.error_rate = error_rate
+        self.trades_per_candle = trades_per_candle
+        self.max_trades = max_trades
+        self.interval = 60
+        self.calls = collections.Counter()
+        self.rejected = collections.Counter()
+        self.trades = {pair: [] for pair in self.pairs}
+        self._trade_times = {pair: [] for pair in self.pairs}
+        self._trade_ids = collections.Counter()
+        self._rng = np.random.default_rng(seed)
+        self._random = random.Random(seed)
+        self._counter_lock = threading.Lock()
+
+    # ---- market generation ---------------------------------------------------------
+
+    def generate(self, candles: int = 720, interval: int = 60, end: float = None, volatility: float = 0.002):
+        """
+        Fill the history with random-walk candles and their trades.
+
+        Args:
+            candles (int): Candles per pair.
+            interval (int): Seconds per candle.
+            end (float): Unix time of the last candle; defaults to now.
+            volatility (float): Standard deviation of the log return per candle.
+
+        Returns:
+            KrakenSimulator: self, for chaining.
+        """
+        self.interval = interval
+        end = int(time.time() if end is None else end) // interval * interval
+        for time_ in range(end - (candles - 1) * interval, end + 1, interval):
+            self.step(time_, volatility)
+        return self
+
+    def step(self, time_: int = None, volatility: float = 0.002):
+        '''advance every pair by one random-walk candle, filling orders placed since the last one'''
+        if time_ is None:
+            time_ = self.time + self.interval if self.time is not None else int(time.time()) // self.interval * self.interval
+        candles = {}
+        for pair, wsname in zip(self.pairs, self.start_prices):
+            last = self._last(pair)
+            open_ = float(last[4]) if last else self.start_prices[wsname]
+            path = open_ * np.exp(np.cumsum(self._rng.normal(0, volatility / 2, 4)))
+            close = path[-1]
+            volume = float(self._rng.gamma(2.0, 5_000 / self.start_prices[wsname] ** 0.5))
+            candles[pair] = (open_, max(open_, path.max()), min(open_, path.min()), close, path.mean(), volume,
+                             self.trades_per_candle)
+        self.advance(time_, candles)
+
+    def advance(self, time: int, candles: dict):
+        fills = len(self.fills)
+        super().advance(time, candles)
+        with self._lock:
+            for name in candles:
+                self._record_candle_trades(self._names[name])
+            for fill in self.fills[fills:]:
+                self._record_trade(fill['pair'], [[fill['price'], fill['volume'], float(self.time),
+                                                   fill['side'][0], 'm', '']])
+
+    def _record_candle_trades(self, pair: str):
+        row = self._last(pair)
+        count = self.trades_per_candle
+        if count < 1:
+            return
+        open_, high, low, close, volume = (float(value) for value in (row[1], row[2], row[3], row[4], row[6]))
+        prices = self._rng.uniform(low, high, count)
+        prices[0], prices[-1] = open_, close
+        volumes = volume * self._rng.dirichlet(np.ones(count))
+        times = row[0] + np.sort(self._rng.uniform(0, self.interval, count))
+        sides = np.where(np.r_[True, np.diff(prices) >= 0], 'b', 's')
+        kinds = np.where(self._rng.random(count) < 0.7, 'm', 'l')
+        self._record_trade(pair, [[price, volume, round(time_, 4), side, kind, '']
+                                  for price, volume, time_, side, kind in zip(prices, volumes, times, sides, kinds)])
+
+    def _record_trade(self, pair: str, trades: list):
+        rows, times = self.trades[pair], self._trade_times[pair]
+        for price, volume, time_, side, kind, misc in trades:
+            self._trade_ids[pair] += 1
+            rows.append([f'{price:.5f}', f'{volume:.8f}', time_, str(side), str(kind), misc, self._trade_ids[pair]])
+            # integer nanoseconds, so the `last` cursor compares exactly
+            times.append(round(time_ * 1e9))
+        if len(rows) > 2 * self.max_trades:
+            del rows[:-self.max_trades], times[:-self.max_trades]
+
+    # ---- krakenex.API interface ----------------------------------------------------
+
+    def query_public(self, method: str, data: dict = None):
+        return self._serve(method, data, private=False) or super().query_public(method, data)
+
+    def query_private(self, method: str, data: dict = None):
+        return self._serve(method, data, private=True) or super().query_private(method, data)
+
+    def _serve(self, method: str, data: dict, private: bool):
+        '''apply latency and failures; returns an error response or None to answer normally'''
+        latency = self.latency
+        if isinstance(latency, (tuple, list)):
+            latency = self._random.uniform(*latency)
+        if latency:
+            time.sleep(latency)
+        with self._counter_lock:
+            self.calls[method] += 1
+            error = None
+            if self.error_rate and self._random.random() < self.error_rate:
+                error = 'EService:Unavailable'
+            elif self.rate_limits is not None:
+                bucket, cost = self.rate_limits.bucket_for(method, private)
+                try:
+                    bucket.reserve(cost, max_wait=0)
+                except KrakenAPIRateLimitError:
+                    error = 'EOrder:Rate limit exceeded' if method in ORDER_ENDPOINTS else 'EAPI:Rate limit exceeded'
+            if error:
+                self.rejected[error] += 1
+                return {'error': [error], 'result': {}}
+        return None
+
+    def _public_Trades(self, data):
+        pairs = self._resolve(data)
+        if pairs is None:
+            return {'error': ['EQuery:Unknown asset pair'], 'result': {}}
+        pair = pairs[0]
+        count = min(int(data.get('count') or TRADES_PAGE_MAX), TRADES_PAGE_MAX)
+        since = data.get('since') or 0
+        # `since` is unix seconds on the first call and the nanosecond `last` cursor afterwards
+        since_ns = int(since) if int(float(since)) > 1e12 else round(float(since) * 1e9)
+        times = self._trade_times[pair]
+        start = bisect.bisect_right(times, since_ns)
+        rows = [list(row) for row in self.trades[pair][start:start + count]]
+        last = str(times[start + len(rows) - 1]) if rows else str(since)
+        return {'error': [], 'result': {pair: rows, 'last': last}}
+
+
+class KrakenSimulatorServer(ThreadingHTTPServer):
+    """
+    Serves a KrakenSimulator on localhost with Kraken's REST paths and authentication.
+
+    Public calls are answered on GET (or POST) /0/public/<method>; private calls on
+    POST /0/private/<method> must carry the server's API key, a valid API-Sign and an
+    increasing nonce, exactly as on api.kraken.com. Point krakenex.API.uri,
+    AsyncKrakenAPIClient(base_url=...) or kraken_request at `url`, or export `environ()`
+    so get_kraken_api() connects here.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, simulator: KrakenSimulator = None, api_key: str = 'simulator-key',
+                 api_secret: str = base64.b64encode(b'kraken-simulator-secret').decode(), check_nonce: bool = True):
+        super().__init__(('127.0.0.1', 0), KrakenSimulatorHandler)
+        self.simulator = simulator or KrakenSimulator().generate()
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.check_nonce = check_nonce
+        self.last_nonce = 0
+        self.nonce_lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def krakenex_api(self):
+        '''a krakenex.API with the simulator's credentials pointed at this server'''
+        api = krakenex.API(key=self.api_key, secret=self.api_secret)
+        api.uri = self.url
+        return api
+
+    def environ(self):
+        '''environment variables that make get_kraken_api() use this server'''
+        return {'KRAKEN_API_URL': self.url, 'KRAKEN_PUB': self.api_key, 'KRAKEN_SEC': self.api_secret}
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        self.server_close()
+
+
+class KrakenSimulatorHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._dispatch(dict(parse_qsl(urlparse(self.path).query, keep_blank_values=True)))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+        self._dispatch(dict(parse_qsl(body, keep_blank_values=True)))
+
+    def _dispatch(self, data: dict):
+        path = urlparse(self.path).path
+        parts = path.strip('/').split('/')
+        if len(parts) != 3 or parts[0] != '0' or parts[1] not in ('public', 'private'):
+            self._send(404, {'error': ['EGeneral:Unknown method'], 'result': {}})
+            return
+        simulator = self.server.simulator
+        if parts[1] == 'public':
+            self._send(200, simulator.query_public(parts[2], data))
+            return
+        error = self._authenticate(path, data)
+        if error:
+            self._send(200, {'error': [error], 'result': {}})
+            return
+        data.pop('nonce', None)
+        self._send(200, simulator.query_private(parts[2], data))
+
+    def _authenticate(self, path: str, data: dict):
+        server = self.server
+        if self.headers.get('API-Key') != server.api_key:
+            return 'EAPI:Invalid key'
+        try:
+            nonce = int(data['nonce'])
+            valid = self.headers.get('API-Sign') == get_kraken_signature(path, data, server.api_secret)
+        except (KeyError, ValueError):
+            return 'EAPI:Invalid nonce'
+        if not valid:
+            return 'EAPI:Invalid signature'
+        if server.check_nonce:
+            with server.nonce_lock:
+                if nonce <= server.last_nonce:
+                    return 'EAPI:Invalid nonce'
+                server.last_nonce = nonce
+        return None
+
+    def _send(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
@@ -8,13 +8,29 @@ import krakenex
 import os
 from common.exceptions import *
 from gcp_tools.gcp_utils import get_secret
+from exchange_tools.asset_registry import AssetRegistry
+from exchange_tools.exchange_tool import KrakenAPIClient
+
+_public_asset_registry = None
+# one pooled, keep-alive session for every kraken_request call
+_session = requests.Session()
+
+
+def _api_url():
+    '''REST root to talk to; KRAKEN_API_URL points the tools at a local KrakenSimulatorServer'''
+    return os.environ.get('KRAKEN_API_URL')
 
 
 def get_kraken_api():
-    api_key, api_secret = get_secret()
-    # api_key = os.environ.get('KRAKEN_PUB')
-    # api_secret = os.environ.get('KRAKEN_SEC')
+    if _api_url():
+        # a local simulator takes its credentials from the environment, not Secret Manager
+        api_key = os.environ.get('KRAKEN_PUB', '')
+        api_secret = os.environ.get('KRAKEN_SEC', '')
+    else:
+        api_key, api_secret = get_secret()
     api = krakenex.API(key=api_key, secret=api_secret)
+    if _api_url():
+        api.uri = _api_url()
     return api
 
 
@@ -32,14 +48,14 @@ def get_kraken_signature(url_path, data, secret):
     return sigdigest.decode()
 
 def kraken_request(url_path, data, api_key, api_secret):
-    # headers
-    sign = get_kraken_signature(url_path, data, api_secret)
+    # headers; Kraken signs the URI path only, e.g. /0/private/Balance
+    sign = get_kraken_signature(urllib.parse.urlparse(url_path).path, data, api_secret)
     headers = {
         
         'API-Key': api_key, 
         'API-Sign': sign}
     # send request
-    response = requests.post(url_path, headers=headers, data=data)
+    response = _session.post(url_path, headers=headers, data=data)
     return response
 
 def verify_kraken_api(api_key, api_secret):
@@ -61,6 +77,21 @@ def verify_kraken_api(api_key, api_secret):
         return False
     
 
+def get_public_asset_registry() -> AssetRegistry:
+    """
+    Return the process-wide AssetRegistry backed by Kraken's public endpoints.
+
+    The registry needs no API key, so it is shared by every caller of
+    `get_trading_pair_symbol` and refreshed on its own TTL.
+    """
+    global _public_asset_registry
+    if _public_asset_registry is None:
+        api = krakenex.API()
+        if _api_url():
+            api.uri = _api_url()
+        _public_asset_registry = AssetRegistry(KrakenAPIClient(api))
+    return _public_asset_registry
+
     
 def get_trading_pair_symbol(crypto_a: str, crypto_b: str) -> str:
     """
@@ -76,28 +107,15 @@ def get_trading_pair_symbol(crypto_a: str, crypto_b: str) -> str:
     Raises:
         ValueError: If the trading pair is not found.
     """
-    # Kraken API endpoint for tradable asset pairs
-    url = 'https://api.kraken.com/0/public/AssetPairs'
+    # Normalize input symbols to uppercase
+    crypto_a = crypto_a.upper()
+    crypto_b = crypto_b.upper()
 
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-
-        if data.get('error'):
-            raise Exception(f"API Error: {data['error']}")
-
-        asset_pairs = data.get('result', {})
-
-        # Normalize input symbols to uppercase
-        crypto_a = crypto_a.upper()
-        crypto_b = crypto_b.upper()
-
-        # Search for the matching asset pair
-        for pair, details in asset_pairs.items():
-            altname = details.get('altname', '')
-            if altname == f"{crypto_a}{crypto_b}" or altname == f"{crypto_b}{crypto_a}":
-                return pair
+        registry = get_public_asset_registry()
+        pair = registry.get_pair_by_altname(f"{crypto_a}{crypto_b}") or registry.get_pair_by_altname(f"{crypto_b}{crypto_a}")
+        if pair:
+            return pair
 
         raise ValueError(f"Trading pair for {crypto_a}/{crypto_b} not found.")
 
@@ -0,0 +1,216 @@
+import os
+import time
+import uuid
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.ipc as ipc
+from exchange_tools.trade_frames import ohlc_to_dataframe, trades_to_dataframe
+
+TRADES_DATASET = 'trades'
+
+
+def ohlc_dataset(interval: int):
+    '''dataset name for OHLC candles of `interval` minutes'''
+    return f'ohlc_{interval}'
+
+
+def _to_timestamp(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return pd.Timestamp(value, unit='s').as_unit('ns')
+    return pd.Timestamp(value).as_unit('ns')
+
+
+class LocalMarketStore:
+    def __init__(self, root: str):
+        """
+        On-disk time-series store for Kraken trades and OHLC candles.
+
+        Data is partitioned as `root/<dataset>/<pair>/<YYYY-MM-DD>/part-*.arrow`. Each
+        append writes new immutable Arrow IPC files, and reads memory-map only the day
+        partitions that overlap the requested range, so repeated backtests and notebook
+        sessions load from local disk without copying whole files into memory.
+
+        Args:
+            root (str): Directory holding the store. Created on first append.
+        """
+        self.root = root
+
+    def append(self, dataset: str, pair: str, df: pd.DataFrame):
+        """
+        Append rows to a dataset, split into one new part file per UTC day.
+
+        Args:
+            dataset (str): Dataset name, e.g. 'trades' or ohlc_dataset(60).
+            pair (str): The currency pair (e.g., 'XXBTZUSD').
+            df (pd.DataFrame): Rows with a datetime64[ns] `time` column.
+
+        Returns:
+            int: Number of rows written.
+        """
+        if df.empty:
+            return 0
+        days = df['time'].values.astype('datetime64[D]')
+        for day in np.unique(days):
+            self._write_part(dataset, pair, str(day), df[days == day])
+        return len(df)
+
+    def read(self, dataset: str, pair: str, start=None, end=None, columns: list = None):
+        """
+        Read rows with start <= time < end from the overlapping day partitions.
+
+        Args:
+            dataset (str): Dataset name.
+            pair (str): The currency pair.
+            start: Unix seconds, datetime or string; None reads from the first partition.
+            end: Unix seconds, datetime or string; None reads to the last partition.
+            columns (list): Optional subset of columns to load.
+
+        Returns:
+            pd.DataFrame: The matching rows in time order.
+        """
+        start = _to_timestamp(start)
+        end = _to_timestamp(end)
+        # `time` is needed to filter and order the rows even when it is not returned
+        load_columns = columns if not columns or 'time' in columns else [*columns, 'time']
+        tables = []
+        for day in self.days(dataset, pair):
+            day_start = pd.Timestamp(day)
+            day_end = day_start + pd.Timedelta(days=1)
+            if (start is not None and day_end <= start) or (end is not None and day_start >= end):
+                continue
+            parts = []
+            for path in self._part_paths(dataset, pair, day):
+                table = self._map_part(path, load_columns)
+                # partitions fully inside the range are used as-is, without a filtering copy
+                if start is not None and day_start < start:
+                    table = table.filter(pc.greater_equal(table['time'], pa.scalar(start.to_datetime64())))
+                if end is not None and day_end > end:
+                    table = table.filter(pc.less(table['time'], pa.scalar(end.to_datetime64())))
+                parts.append(table)
+            table = pa.concat_tables(parts) if len(parts) > 1 else parts[0]
+            # appends are not ordered across (or always within) parts; compacted days skip the sort
+            if np.any(np.diff(table['time'].to_numpy()) < np.timedelta64(0)):
+                table = table.sort_by('time')
+            tables.append(table.select(columns) if columns else table)
+        if not tables:
+            return pd.DataFrame(columns=columns)
+        return pa.concat_tables(tables).to_pandas()
+
+    def days(self, dataset: str, pair: str):
+        '''sorted day partitions stored for a pair; days holding no part file (e.g. only an interrupted .tmp) are skipped'''
+        directory = os.path.join(self.root, dataset, pair)
+        if not os.path.isdir(directory):
+            return []
+        return [day for day in sorted(os.listdir(directory)) if self._part_paths(dataset, pair, day)]
+
+    def latest_time(self, dataset: str, pair: str):
+        '''the newest stored `time` for a pair, or None'''
+        days = self.days(dataset, pair)
+        if not days:
+            return None
+        latest = self.read(dataset, pair, start=days[-1], columns=['time'])
+        return latest['time'].max() if len(latest) else None
+
+    def compact(self, dataset: str, pair: str, day: str):
+        '''merge the part files of one day partition into a single file'''
+        paths = self._part_paths(dataset, pair, day)
+        if len(paths) < 2:
+            return
+        df = self.read(dataset, pair, start=day, end=pd.Timestamp(day) + pd.Timedelta(days=1))
+        self._write_part(dataset, pair, day, df.sort_values('time', kind='stable'))
+        for path in paths:
+            os.remove(path)
+
+    def append_trades(self, pair: str, df: pd.DataFrame):
+        '''append a trade frame built by trades_to_dataframe'''
+        return self.append(TRADES_DATASET, pair, df)
+
+    def read_trades(self, pair: str, start=None, end=None, columns: list = None):
+        '''trades for a pair with start <= time < end'''
+        return self.read(TRADES_DATASET, pair, start, end, columns)
+
+    def append_ohlc(self, pair: str, interval: int, df: pd.DataFrame):
+        '''append an OHLC frame built by ohlc_to_dataframe'''
+        return self.append(ohlc_dataset(interval), pair, df)
+
+    def read_ohlc(self, pair: str, interval: int, start=None, end=None, columns: list = None):
+        '''OHLC candles for a pair with start <= time < end'''
+        return self.read(ohlc_dataset(interval), pair, start, end, columns)
+
+    def backfill_trades(self, api_client, pair: str, start: int, end: int = None, checkpoint=None):
+        """
+        Stream trades from Kraken into the store page by page.
+
+        Each page is appended as it arrives and every day is compacted into one part
+        file once the backfill has moved past it, so long backfills do not leave
+        thousands of small files behind.
+
+        Args:
+            api_client (KrakenAPIClient): Client whose iter_trade_history is used.
+            pair (str): The currency pair.
+            start (int): Unix timestamp (seconds) to start from.
+            end (int): Unix timestamp (seconds) to stop at, None for the present.
+            checkpoint (CheckpointStore): Optional store to resume an interrupted backfill.
+
+        Returns:
+            int: Number of trades written.
+        """
+        written = 0
+        open_days = []
+        for _, trades, _ in api_client.iter_trade_history(pair, start, end, checkpoint=checkpoint):
+            df = trades_to_dataframe([trades])
+            written += self.append_trades(pair, df)
+            for day in np.unique(df['time'].values.astype('datetime64[D]')).astype(str).tolist():
+                if day not in open_days:
+                    open_days.append(day)
+            # pages arrive in time order, so every day before the newest one is complete
+            while len(open_days) > 1:
+                self.compact(TRADES_DATASET, pair, open_days.pop(0))
+        for day in open_days:
+            self.compact(TRADES_DATASET, pair, day)
+        return written
+
+    def sync_ohlc(self, api_client, pair: str, interval: int):
+        """
+        Download the closed OHLC candles newer than what the store already holds.
+
+        Args:
+            api_client (KrakenAPIClient): Client whose get_ohlc is used.
+            pair (str): The currency pair.
+            interval (int): Candle size in minutes.
+
+        Returns:
+            int: Number of candles written.
+        """
+        latest = self.latest_time(ohlc_dataset(interval), pair)
+        since = int(latest.timestamp()) if latest is not None else 0
+        result = api_client.get_ohlc(pair, interval, since)
+        rows = next((rows for key, rows in result.items() if key != 'last'), [])
+        # the last candle is still open and will change
+        rows = [row for row in rows[:-1] if int(row[0]) > since]
+        return self.append_ohlc(pair, interval, ohlc_to_dataframe(rows))
+
+    def _part_paths(self, dataset: str, pair: str, day: str):
+        directory = os.path.join(self.root, dataset, pair, day)
+        return [os.path.join(directory, name) for name in sorted(os.listdir(directory)) if name.endswith('.arrow')]
+
+    def _write_part(self, dataset: str, pair: str, day: str, df: pd.DataFrame):
+        directory = os.path.join(self.root, dataset, pair, day)
+        os.makedirs(directory, exist_ok=True)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        path = os.path.join(directory, f'part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.arrow')
+        tmp_path = f'{path}.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _map_part(path: str, columns: list = None):
+        # buffers reference the mapping directly, so this is a zero-copy read
+        table = ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.select(columns) if columns else table
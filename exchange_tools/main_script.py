@@ -3,6 +3,7 @@ from datetime import datetime as dt, timedelta
 from gcp_tools.gcp_utils import get_secret
 from exchange_tools.kraken_tools import get_kraken_api, get_trading_pair_symbol
 from exchange_tools.exchange_tool import KrakenAPIClient, AssetPair, TradeExecutor
+from exchange_tools.trade_frames import trades_to_dataframe
 from common.date_utils import *
 
     
@@ -24,13 +25,8 @@ def main(start_unix_timestamp, end_unix_timestamp):
     assets = kraken_api.fetch_assets()
     asset_pair = AssetPair('XBT', 'USD', assets)
     pair_symbol = asset_pair.get_pair_symbol()
-    asset_history = kraken_api.fetch_asset_history(pair_symbol,start_unix_timestamp, end_unix_timestamp )
-
-
-    asset_history_df = pd.DataFrame(asset_history['XXBTZUSD'], columns=['price', 'volume', 'time', 'buy_sell', 'market_limit', 'misc', 'trade_id'])
-    asset_history_df['time'] = pd.to_datetime(asset_history_df['time'], unit='s')
-    asset_history_df['price'] = pd.to_numeric(asset_history_df['price'])
-    asset_history_df = asset_history_df.sort_values('time')
+    batches = (trades for _, trades, _ in kraken_api.iter_trade_history(pair_symbol, start_unix_timestamp, end_unix_timestamp))
+    asset_history_df = trades_to_dataframe(batches)
     return asset_history_df
 
 if __name__ == '__main__':
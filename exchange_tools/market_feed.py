@@ -0,0 +1,211 @@
+import asyncio
+import json
+import threading
+from collections import deque
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+from common.exceptions import KrakenOrderBookChecksumError
+from exchange_tools.exchange_tool import TickerQuote
+from exchange_tools.kraken_errors import RetryPolicy
+from exchange_tools.order_book import OrderBook
+from exchange_tools.url_enums import KrakenAPIUrls
+
+MARKET_CHANNELS = ('ticker', 'book', 'trade')
+
+
+class KrakenMarketFeed:
+    def __init__(self, symbols: list, channels: tuple = MARKET_CHANNELS, depth: int = 10,
+                 url: str = KrakenAPIUrls.WEBSOCKET_URL.value, precisions: dict = None, trade_history: int = 1000,
+                 reconnect_policy: RetryPolicy = None, on_trade=None):
+        """
+        Streaming market data from Kraken's v2 WebSocket API.
+
+        Subscribes to the ticker, book and trade channels for `symbols` and keeps the
+        latest quote, an L2 OrderBook and a bounded list of recent trades per symbol.
+        The socket runs on its own event loop thread (`start`), and the read methods
+        return immutable values, so executors on other threads read them without locks
+        and without a REST round trip.
+
+        A book whose checksum stops matching is discarded and resubscribed, which makes
+        Kraken send a fresh snapshot. Dropped connections are retried with backoff.
+
+        Args:
+            symbols (list): Websocket symbols such as 'BTC/USD'.
+            channels (tuple): Channels to subscribe to.
+            depth (int): Book depth (10, 25, 100, 500 or 1000).
+            url (str): WebSocket endpoint, overridable for the local replay server.
+            precisions (dict): {symbol: (price_decimals, qty_decimals)} for checksum
+                validation. Symbols left out are looked up on the instrument channel.
+            trade_history (int): Recent trades kept per symbol.
+            reconnect_policy (RetryPolicy): Backoff between reconnect attempts; the feed
+                keeps reconnecting regardless of `max_attempts`.
+            on_trade (callable): Called with each trade dict, on the feed thread.
+        """
+        self.symbols = list(symbols)
+        self.channels = tuple(channels)
+        self.depth = depth
+        self.url = url
+        self.precisions = dict(precisions or {})
+        self.reconnect_policy = reconnect_policy or RetryPolicy()
+        self.on_trade = on_trade
+        self.books = {symbol: self._new_book(symbol) for symbol in self.symbols}
+        self.checksum_failures = 0
+        self._quotes = {}
+        self._trades = {symbol: deque(maxlen=trade_history) for symbol in self.symbols}
+        self._resubscribe = set()
+        self._ready = threading.Event()
+        self._stopping = False
+        self._loop = None
+        self._thread = None
+
+    def _new_book(self, symbol: str):
+        price_decimals, qty_decimals = self.precisions.get(symbol, (None, None))
+        return OrderBook(symbol, self.depth, price_decimals, qty_decimals)
+
+    def book(self, symbol: str):
+        '''latest BookSnapshot for `symbol`, or None until its first snapshot arrives'''
+        return self.books[symbol].snapshot()
+
+    def ticker(self, symbol: str):
+        '''latest TickerQuote for `symbol`, or None'''
+        return self._quotes.get(symbol)
+
+    def trades(self, symbol: str):
+        '''recent trades for `symbol`, oldest first'''
+        return list(self._trades[symbol])
+
+    def wait_ready(self, timeout: float = None):
+        '''block until every subscribed channel has delivered its first message'''
+        return self._ready.wait(timeout)
+
+    def start(self):
+        '''run the feed on a background thread with its own event loop'''
+        self._stopping = False
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self.run(),), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5):
+        '''close the socket and join the feed thread'''
+        self._stopping = True
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._loop.close()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    async def run(self):
+        '''connect, subscribe and consume messages until `stop`, reconnecting on failure'''
+        attempt = 1
+        while not self._stopping:
+            try:
+                async with connect(self.url) as websocket:
+                    attempt = 1
+                    await self._subscribe(websocket)
+                    await self._consume(websocket)
+            except (OSError, WebSocketException) as e:
+                if self._stopping:
+                    break
+                delay = self.reconnect_policy.backoff(attempt)
+                print(f"Market feed disconnected ({e}), reconnecting in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _subscribe(self, websocket):
+        if 'book' in self.channels and any(symbol not in self.precisions for symbol in self.symbols):
+            await self._send(websocket, 'subscribe', 'instrument')
+            while True:
+                message = json.loads(await websocket.recv())
+                self.handle_message(message)
+                if message.get('channel') == 'instrument' and message.get('type') == 'snapshot':
+                    break
+            await self._send(websocket, 'unsubscribe', 'instrument')
+            for symbol in self.symbols:
+                self.books[symbol] = self._new_book(symbol)
+        for channel in self.channels:
+            params = {'depth': self.depth} if channel == 'book' else {}
+            await self._send(websocket, 'subscribe', channel, self.symbols, **params)
+
+    async def _consume(self, websocket):
+        while not self._stopping:
+            try:
+                raw = await asyncio.wait_for(websocket.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            self.handle_message(json.loads(raw))
+            if self._resubscribe:
+                symbols = sorted(self._resubscribe)
+                self._resubscribe.clear()
+                await self._send(websocket, 'unsubscribe', 'book', symbols, depth=self.depth)
+                await self._send(websocket, 'subscribe', 'book', symbols, depth=self.depth)
+
+    async def _send(self, websocket, method: str, channel: str, symbols: list = None, **params):
+        params = {'channel': channel, **params}
+        if symbols is not None:
+            params['symbol'] = symbols
+        await websocket.send(json.dumps({'method': method, 'params': params}))
+
+    def handle_message(self, message: dict):
+        """
+        Apply one decoded WebSocket message to the feed state.
+
+        Args:
+            message (dict): A v2 channel message, subscription ack or heartbeat.
+        """
+        channel = message.get('channel')
+        if 'method' in message:
+            if not message.get('success', True):
+                print(f"Market feed {message['method']} failed: {message.get('error')}")
+            return
+        if channel == 'book':
+            self._handle_book(message)
+        elif channel == 'ticker':
+            for item in message['data']:
+                self._quotes[item['symbol']] = TickerQuote(float(item['ask']), float(item['bid']), float(item['last']))
+        elif channel == 'trade':
+            for item in message['data']:
+                self._trades[item['symbol']].append(item)
+                if self.on_trade is not None:
+                    self.on_trade(item)
+        elif channel == 'instrument':
+            for item in message['data'].get('pairs', []):
+                self.precisions.setdefault(item['symbol'], (item['price_precision'], item['qty_precision']))
+        self._update_ready(channel)
+
+    def _handle_book(self, message: dict):
+        for item in message['data']:
+            symbol = item['symbol']
+            if symbol in self._resubscribe:
+                continue
+            book = self.books[symbol]
+            try:
+                if message['type'] == 'snapshot':
+                    book.apply_snapshot(item.get('bids', []), item.get('asks', []), item.get('checksum'),
+                                        item.get('timestamp'))
+                elif book.snapshot() is not None:
+                    book.apply_update(item.get('bids', []), item.get('asks', []), item.get('checksum'),
+                                      item.get('timestamp'))
+            except KrakenOrderBookChecksumError as e:
+                print(f"{e}; resubscribing")
+                self.checksum_failures += 1
+                self.books[symbol] = self._new_book(symbol)
+                self._resubscribe.add(symbol)
+
+    def _update_ready(self, channel: str):
+        if self._ready.is_set() or channel not in self.channels:
+            return
+        # trades only arrive when someone trades, so they do not gate readiness
+        ready = all(
+            (subscribed != 'book' or self.books[symbol].snapshot() is not None)
+            and (subscribed != 'ticker' or symbol in self._quotes)
+            for subscribed in self.channels
+            for symbol in self.symbols
+        )
+        if ready:
+            self._ready.set()
@@ -0,0 +1,216 @@
+import zlib
+from typing import NamedTuple
+import numpy as np
+from common.exceptions import KrakenOrderBookChecksumError
+
+# Kraken checksums the top 10 levels of each side
+CHECKSUM_DEPTH = 10
+
+
+class BookSnapshot(NamedTuple):
+    """
+    Immutable view of an order book at one point in time.
+
+    `bids` (best first, descending) and `asks` (best first, ascending) are read-only
+    (n, 2) float64 arrays of [price, qty] rows.
+    """
+    symbol: str
+    bids: np.ndarray
+    asks: np.ndarray
+    checksum: int
+    timestamp: str
+    sequence: int
+
+    @property
+    def best_bid(self):
+        return float(self.bids[0, 0]) if len(self.bids) else None
+
+    @property
+    def best_ask(self):
+        return float(self.asks[0, 0]) if len(self.asks) else None
+
+    @property
+    def mid(self):
+        if not len(self.bids) or not len(self.asks):
+            return None
+        return (self.best_bid + self.best_ask) / 2
+
+
+def _checksum_field(value: float, decimals: int):
+    return f'{value:.{decimals}f}'.replace('.', '').lstrip('0')
+
+
+def book_checksum(bids: np.ndarray, asks: np.ndarray, price_decimals: int, qty_decimals: int):
+    """
+    Kraken's CRC32 book checksum over the top 10 asks then the top 10 bids.
+
+    Each level contributes its price and qty formatted to the pair's precision, with
+    the decimal point and leading zeros removed.
+
+    Args:
+        bids (np.ndarray): [price, qty] rows, best first.
+        asks (np.ndarray): [price, qty] rows, best first.
+        price_decimals (int): Price precision of the pair.
+        qty_decimals (int): Quantity precision of the pair.
+
+    Returns:
+        int: The unsigned 32-bit checksum.
+    """
+    parts = []
+    for levels in (asks[:CHECKSUM_DEPTH], bids[:CHECKSUM_DEPTH]):
+        for price, qty in levels:
+            parts.append(_checksum_field(price, price_decimals))
+            parts.append(_checksum_field(qty, qty_decimals))
+    return zlib.crc32(''.join(parts).encode())
+
+
+def _readonly(array: np.ndarray):
+    array.flags.writeable = False
+    return array
+
+
+class OrderBook:
+    def __init__(self, symbol: str, depth: int = 10, price_decimals: int = None, qty_decimals: int = None):
+        """
+        L2 order book for one pair, kept as sorted NumPy price levels.
+
+        Each side is a pair of parallel arrays sorted by a key that is ascending for
+        asks and negated for bids, so a level is found with `np.searchsorted`. Every
+        applied message publishes a new immutable BookSnapshot by swapping a single
+        reference; readers on other threads call `snapshot()` without taking a lock.
+
+        Only one thread (the feed) may call `apply_snapshot`/`apply_update`.
+
+        Args:
+            symbol (str): Websocket symbol, e.g. 'BTC/USD'.
+            depth (int): Subscribed depth; levels beyond it are dropped after each update.
+            price_decimals (int): Price precision, needed to validate checksums.
+            qty_decimals (int): Quantity precision, needed to validate checksums.
+        """
+        self.symbol = symbol
+        self.depth = depth
+        self.price_decimals = price_decimals
+        self.qty_decimals = qty_decimals
+        self._bid_keys = np.empty(0)
+        self._bid_qtys = np.empty(0)
+        self._ask_keys = np.empty(0)
+        self._ask_qtys = np.empty(0)
+        self._sequence = 0
+        self._snapshot = None
+
+    @property
+    def validates_checksum(self):
+        return self.price_decimals is not None and self.qty_decimals is not None
+
+    def snapshot(self):
+        '''latest published BookSnapshot, or None before the first snapshot message'''
+        return self._snapshot
+
+    def apply_snapshot(self, bids: list, asks: list, checksum: int = None, timestamp: str = None):
+        """
+        Replace the book with a full snapshot.
+
+        Args:
+            bids (list): Levels as {'price': float, 'qty': float} dicts.
+            asks (list): Levels as {'price': float, 'qty': float} dicts.
+            checksum (int): Kraken's checksum for the resulting book, if provided.
+            timestamp (str): Exchange timestamp of the message.
+
+        Raises:
+            KrakenOrderBookChecksumError: If the book does not match `checksum`.
+        """
+        self._bid_keys, self._bid_qtys = self._side_from_levels(bids, -1.0)
+        self._ask_keys, self._ask_qtys = self._side_from_levels(asks, 1.0)
+        self._publish(checksum, timestamp)
+
+    def apply_update(self, bids: list, asks: list, checksum: int = None, timestamp: str = None):
+        """
+        Apply incremental level changes; a qty of 0 removes the level.
+
+        Raises:
+            KrakenOrderBookChecksumError: If the book does not match `checksum`.
+        """
+        if bids:
+            self._bid_keys, self._bid_qtys = self._update_side(self._bid_keys, self._bid_qtys, bids, -1.0)
+        if asks:
+            self._ask_keys, self._ask_qtys = self._update_side(self._ask_keys, self._ask_qtys, asks, 1.0)
+        self._publish(checksum, timestamp)
+
+    def _side_from_levels(self, levels: list, sign: float):
+        keys = np.fromiter((sign * level['price'] for level in levels), dtype=np.float64, count=len(levels))
+        qtys = np.fromiter((level['qty'] for level in levels), dtype=np.float64, count=len(levels))
+        order = np.argsort(keys, kind='stable')
+        return keys[order][:self.depth], qtys[order][:self.depth]
+
+    def _update_side(self, keys: np.ndarray, qtys: np.ndarray, levels: list, sign: float):
+        # work on copies: the published snapshot still references the old arrays
+        keys = keys.copy()
+        qtys = qtys.copy()
+        for level in levels:
+            key = sign * level['price']
+            qty = level['qty']
+            index = int(np.searchsorted(keys, key))
+            exists = index < len(keys) and keys[index] == key
+            if qty == 0:
+                if exists:
+                    keys = np.delete(keys, index)
+                    qtys = np.delete(qtys, index)
+            elif exists:
+                qtys[index] = qty
+            else:
+                keys = np.insert(keys, index, key)
+                qtys = np.insert(qtys, index, qty)
+        return keys[:self.depth], qtys[:self.depth]
+
+    def _publish(self, checksum: int, timestamp: str):
+        bids = _readonly(np.column_stack((-self._bid_keys, self._bid_qtys)))
+        asks = _readonly(np.column_stack((self._ask_keys, self._ask_qtys)))
+        if checksum is not None and self.validates_checksum:
+            local = book_checksum(bids, asks, self.price_decimals, self.qty_decimals)
+            if local != checksum:
+                raise KrakenOrderBookChecksumError(
+                    f"Order book checksum mismatch for {self.symbol}: expected {checksum}, got {local}")
+        self._sequence += 1
+        self._snapshot = BookSnapshot(self.symbol, bids, asks, checksum, timestamp, self._sequence)
+
+
+def snapshot_from_depth(symbol: str, depth: dict):
+    """
+    BookSnapshot from one pair of Kraken's REST Depth result.
+
+    Args:
+        symbol (str): Pair name to record on the snapshot.
+        depth (dict): {'bids': [[price, volume, timestamp], ...], 'asks': [...]}.
+
+    Returns:
+        BookSnapshot: The book, without checksum.
+    """
+    def side(levels):
+        array = np.array([[float(price), float(volume)] for price, volume, *_ in levels], dtype=np.float64)
+        return _readonly(array.reshape(-1, 2))
+    return BookSnapshot(symbol, side(depth.get('bids', [])), side(depth.get('asks', [])), None, None, 0)
+
+
+def walk_book(levels: np.ndarray, notional: float):
+    """
+    Volume that `notional` (in quote currency) buys when swept through `levels`.
+
+    Args:
+        levels (np.ndarray): [price, qty] rows, best first (asks for a buy).
+        notional (float): Amount to spend in the quote currency.
+
+    Returns:
+        tuple: (volume, average_price, worst_price).
+
+    Raises:
+        ValueError: If the levels do not hold enough liquidity for `notional`.
+    """
+    prices = levels[:, 0]
+    level_notional = np.cumsum(prices * levels[:, 1])
+    index = int(np.searchsorted(level_notional, notional))
+    if index >= len(levels):
+        available = float(level_notional[-1]) if len(levels) else 0.0
+        raise ValueError(f"Book holds {available:.2f} within the fetched depth, {notional:.2f} requested")
+    spent_before = float(level_notional[index - 1]) if index else 0.0
+    volume = float(levels[:index, 1].sum()) + (notional - spent_before) / prices[index]
+    return volume, notional / volume, float(prices[index])
@@ -0,0 +1,257 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+import numpy as np
+from common.exceptions import KrakenAPIError
+from exchange_tools.exchange_tool import CANCEL_ORDERS_MAX, QUERY_ORDERS_MAX
+
+ORDER_STATUSES = ('pending', 'open', 'closed', 'canceled', 'expired')
+_STATUS_CODES = {status: code for code, status in enumerate(ORDER_STATUSES)}
+_TERMINAL_CODES = {_STATUS_CODES['closed'], _STATUS_CODES['canceled'], _STATUS_CODES['expired']}
+_EVENT_FOR_STATUS = {'closed': 'fill', 'canceled': 'cancel', 'expired': 'expire'}
+
+
+class OrderEvent(NamedTuple):
+    """
+    A change in a tracked order's lifecycle.
+
+    `kind` is 'partial_fill', 'fill', 'cancel' or 'expire'. `latency` is the seconds
+    from submission to the close time Kraken reports, for terminal events.
+    """
+    kind: str
+    txid: str
+    pair: str
+    status: str
+    vol_exec: float
+    avg_price: float
+    latency: float
+    info: dict
+
+
+class OrderStatus(NamedTuple):
+    txid: str
+    pair: str
+    status: str
+    volume: float
+    vol_exec: float
+    cost: float
+    fee: float
+    submitted_at: float
+
+
+class OrderTracker:
+    def __init__(self, api_client, batch_size: int = QUERY_ORDERS_MAX, max_workers: int = 2, capacity: int = 256):
+        """
+        Lifecycle tracking for submitted orders with batched status polling.
+
+        Orders are kept in a columnar table (a txid -> row index plus NumPy columns for
+        status, volumes, cost and fee), and `poll` queries every order that is still
+        live with one QueryOrders call per `batch_size` txids; `cancel` likewise sends one
+        CancelOrderBatch call per batch. Polling cost therefore grows with the number of
+        batches, not the number of orders. Changes are delivered to subscribed listeners
+        as OrderEvents, and batches Kraken rejected during the last poll are kept in
+        `poll_errors`.
+
+        Args:
+            api_client (KrakenAPIClient): Client used for QueryOrders, OpenOrders and CancelOrderBatch.
+            batch_size (int): Txids per QueryOrders or CancelOrderBatch call (Kraken allows up to 50).
+            max_workers (int): Maximum QueryOrders or CancelOrderBatch calls in flight at once.
+            capacity (int): Initial table rows; the table doubles when full.
+        """
+        self.api_client = api_client
+        self.batch_size = min(batch_size, QUERY_ORDERS_MAX)
+        self.max_workers = max_workers
+        self.queries = 0
+        self.poll_errors = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._index = {}
+        self._txids = []
+        self._pairs = []
+        self._status = np.zeros(capacity, dtype=np.int8)
+        self._volume = np.zeros(capacity)
+        self._vol_exec = np.zeros(capacity)
+        self._cost = np.zeros(capacity)
+        self._fee = np.zeros(capacity)
+        self._submitted_at = np.zeros(capacity)
+
+    def subscribe(self, listener):
+        '''call `listener(event)` for every OrderEvent emitted by `poll` or `cancel`'''
+        self._listeners.append(listener)
+
+    def track(self, txid: str, pair: str = None, volume: float = 0.0, submitted_at: float = None):
+        '''start tracking a submitted order'''
+        with self._lock:
+            if txid in self._index:
+                return
+            row = len(self._txids)
+            if row == len(self._status):
+                self._grow()
+            self._index[txid] = row
+            self._txids.append(txid)
+            self._pairs.append(pair)
+            self._status[row] = _STATUS_CODES['pending']
+            self._volume[row] = volume
+            self._submitted_at[row] = time.time() if submitted_at is None else submitted_at
+
+    def track_result(self, result: dict, pair: str = None, volume: float = 0.0):
+        '''track every txid of an AddOrder result and return them'''
+        txids = result.get('txid', [])
+        for txid in txids:
+            self.track(txid, pair, volume)
+        return txids
+
+    def adopt_open_orders(self):
+        '''track the account's open orders, e.g. after a restart; returns the newly tracked txids'''
+        adopted = []
+        for txid, info in self.api_client.fetch_open_orders().items():
+            if txid not in self._index:
+                self.track(txid, info.get('descr', {}).get('pair'), float(info.get('vol', 0)),
+                           float(info.get('opentm', time.time())))
+                adopted.append(txid)
+        return adopted
+
+    def status(self, txid: str):
+        '''OrderStatus of a tracked order'''
+        row = self._index[txid]
+        with self._lock:
+            return OrderStatus(txid, self._pairs[row], ORDER_STATUSES[self._status[row]], float(self._volume[row]),
+                               float(self._vol_exec[row]), float(self._cost[row]), float(self._fee[row]),
+                               float(self._submitted_at[row]))
+
+    def live_txids(self):
+        '''txids that are not closed, canceled or expired'''
+        count = len(self._txids)
+        live = ~np.isin(self._status[:count], list(_TERMINAL_CODES))
+        return [self._txids[row] for row in np.flatnonzero(live)]
+
+    def poll(self):
+        """
+        Refresh every live order with batched QueryOrders calls.
+
+        A batch Kraken rejects does not stop the others: its txids keep their last known
+        status and map to the KrakenAPIError in `poll_errors` until the next poll.
+
+        Returns:
+            list: The OrderEvents emitted by this poll.
+        """
+        txids = self.live_txids()
+        batches = [txids[i:i + self.batch_size] for i in range(0, len(txids), self.batch_size)]
+        self.poll_errors = {}
+        if not batches:
+            return []
+
+        def query(batch):
+            try:
+                return self.api_client.query_orders(batch)
+            except KrakenAPIError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            results = list(pool.map(query, batches))
+        self.queries += len(batches)
+        events = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, KrakenAPIError):
+                self.poll_errors.update(dict.fromkeys(batch, result))
+                continue
+            for txid, info in result.items():
+                event = self._update(txid, info)
+                if event is not None:
+                    events.append(event)
+        self._emit(events)
+        return events
+
+    def wait(self, txids: list = None, interval: float = 1.0, timeout: float = None):
+        """
+        Poll until the given orders (default: all tracked) reach a terminal status.
+
+        Returns:
+            list: Every OrderEvent emitted while waiting.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pending = set(txids if txids is not None else self._txids)
+        events = []
+        while pending & set(self.live_txids()):
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            events.extend(self.poll())
+            if pending & set(self.live_txids()):
+                time.sleep(interval)
+        return events
+
+    def cancel(self, txids: list = None):
+        """
+        Cancel several orders (default: every live order) with one CancelOrderBatch call
+        per `batch_size` txids, sent concurrently.
+
+        Returns:
+            dict: txid -> None on success, or the KrakenAPIError raised for its batch.
+        """
+        txids = self.live_txids() if txids is None else list(txids)
+        if not txids:
+            return {}
+        size = min(self.batch_size, CANCEL_ORDERS_MAX)
+        batches = [txids[i:i + size] for i in range(0, len(txids), size)]
+
+        def cancel_batch(batch):
+            try:
+                self.api_client.cancel_orders(batch)
+                return None
+            except KrakenAPIError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            outcomes = {}
+            for batch, error in zip(batches, pool.map(cancel_batch, batches)):
+                outcomes.update(dict.fromkeys(batch, error))
+        events = []
+        for txid, error in outcomes.items():
+            if error is None and txid in self._index:
+                event = self._update(txid, {'status': 'canceled'})
+                if event is not None:
+                    events.append(event)
+        self._emit(events)
+        return outcomes
+
+    def _update(self, txid: str, info: dict):
+        row = self._index.get(txid)
+        if row is None:
+            return None
+        # track() may replace the columns while growing them, so read and write under the lock
+        with self._lock:
+            status = info.get('status', ORDER_STATUSES[self._status[row]])
+            code = _STATUS_CODES.get(status, self._status[row])
+            vol_exec = float(info.get('vol_exec', self._vol_exec[row]))
+            changed_status = code != self._status[row]
+            filled_more = vol_exec > self._vol_exec[row]
+            self._status[row] = code
+            self._vol_exec[row] = vol_exec
+            if 'vol' in info:
+                self._volume[row] = float(info['vol'])
+            self._cost[row] = float(info.get('cost', self._cost[row]))
+            self._fee[row] = float(info.get('fee', self._fee[row]))
+            submitted_at = self._submitted_at[row]
+        if changed_status and status in _EVENT_FOR_STATUS:
+            kind = _EVENT_FOR_STATUS[status]
+        elif filled_more:
+            kind = 'partial_fill'
+        else:
+            return None
+        avg_price = float(info['price']) if float(info.get('price') or 0) else None
+        latency = float(info['closetm']) - submitted_at if info.get('closetm') else None
+        return OrderEvent(kind, txid, self._pairs[row], status, vol_exec, avg_price, latency, info)
+
+    def _emit(self, events: list):
+        for event in events:
+            for listener in self._listeners:
+                listener(event)
+
+    def _grow(self):
+        size = len(self._status) * 2
+        for name in ('_status', '_volume', '_vol_exec', '_cost', '_fee', '_submitted_at'):
+            column = getattr(self, name)
+            grown = np.zeros(size, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
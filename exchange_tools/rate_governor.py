@@ -0,0 +1,149 @@
+import threading
+import time
+from common.exceptions import KrakenAPIRateLimitError
+
+# (max counter, decay per second) of the private API call counter per verification tier
+KRAKEN_API_TIERS = {
+    'starter': (15, 0.33),
+    'intermediate': (20, 0.5),
+    'pro': (20, 1.0),
+}
+
+# (max counter, decay per second) of the trading engine's order counter per tier
+KRAKEN_ORDER_TIERS = {
+    'starter': (60, 1.0),
+    'intermediate': (125, 2.34),
+    'pro': (180, 3.75),
+}
+
+# private endpoints that cost more than one point on the API counter
+PRIVATE_ENDPOINT_COSTS = {
+    'Ledgers': 2,
+    'QueryLedgers': 2,
+    'TradesHistory': 2,
+}
+
+# endpoints metered by the order counter instead of the API counter
+ORDER_ENDPOINTS = {'AddOrder', 'AddOrderBatch', 'EditOrder', 'CancelOrder', 'CancelAll', 'CancelOrderBatch'}
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_rate: float):
+        """
+        Token bucket mirroring Kraken's decaying call counter.
+
+        Kraken counts calls up and decays the counter over time; the bucket holds
+        `capacity - counter` tokens. Reservations may drive the level negative, in
+        which case the caller is told how long to wait for the debt to decay.
+
+        Args:
+            capacity (float): Maximum counter value for the tier.
+            refill_rate (float): Counter decay per second.
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._level = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, cost: float, max_wait: float = None):
+        """
+        Take `cost` tokens and return the seconds to wait before sending the call.
+
+        Raises:
+            KrakenAPIRateLimitError: If the wait would exceed `max_wait`.
+        """
+        with self._lock:
+            self._refill()
+            level = self._level - cost
+            delay = 0.0 if level >= 0 else -level / self.refill_rate
+            if max_wait is not None and delay > max_wait:
+                raise KrakenAPIRateLimitError(f"Rate limit wait of {delay:.2f}s exceeds max_wait of {max_wait:.2f}s")
+            self._level = level
+            return delay
+
+    def drain(self):
+        '''empty the bucket, used when Kraken reports the limit was hit anyway'''
+        with self._lock:
+            self._refill()
+            self._level = min(self._level, 0.0)
+
+    def level(self):
+        '''tokens currently available (negative while calls are queued)'''
+        with self._lock:
+            self._refill()
+            return self._level
+
+    def _refill(self):
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated_at) * self.refill_rate)
+        self._updated_at = now
+
+
+class KrakenRateGovernor:
+    def __init__(self, tier: str = 'starter', public_burst: float = 15, public_rate: float = 1.0, max_wait: float = None):
+        """
+        Client-side model of Kraken's rate limits that delays calls instead of letting them fail.
+
+        Public calls, private calls and order calls are metered by separate buckets.
+        Ledger and trade history calls cost two points on the private bucket.
+
+        Args:
+            tier (str): Kraken verification tier: 'starter', 'intermediate' or 'pro'.
+            public_burst (float): Public calls allowed back to back.
+            public_rate (float): Sustained public calls per second.
+            max_wait (float): Longest delay in seconds before giving up with
+                KrakenAPIRateLimitError. None waits as long as needed.
+        """
+        self.tier = tier
+        self.max_wait = max_wait
+        self.public = TokenBucket(public_burst, public_rate)
+        self.private = TokenBucket(*KRAKEN_API_TIERS[tier])
+        self.orders = TokenBucket(*KRAKEN_ORDER_TIERS[tier])
+        self.waits = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def bucket_for(self, method: str, private: bool):
+        '''the bucket and cost that meter a call to `method`'''
+        if method in ORDER_ENDPOINTS:
+            return self.orders, 1
+        if private:
+            return self.private, PRIVATE_ENDPOINT_COSTS.get(method, 1)
+        return self.public, 1
+
+    def reserve(self, method: str, private: bool = False):
+        '''reserve capacity for one call and return the seconds to wait before sending it'''
+        bucket, cost = self.bucket_for(method, private)
+        delay = bucket.reserve(cost, self.max_wait)
+        if delay > 0:
+            with self._lock:
+                self.waits += 1
+                self.waited_seconds += delay
+        return delay
+
+    def acquire(self, method: str, private: bool = False):
+        '''block until a call to `method` fits within the rate limit'''
+        delay = self.reserve(method, private)
+        if delay > 0:
+            time.sleep(delay)
+
+    def penalize(self, method: str, private: bool = False):
+        '''drain the bucket of `method` after Kraken returned a rate limit error'''
+        bucket, _ = self.bucket_for(method, private)
+        bucket.drain()
+
+    def metrics(self):
+        '''current bucket levels and accumulated waiting'''
+        return {
+            'public_level': self.public.level(),
+            'private_level': self.private.level(),
+            'orders_level': self.orders.level(),
+            'waits': self.waits,
+            'waited_seconds': self.waited_seconds,
+        }
+
+    @staticmethod
+    def is_rate_limit_error(errors):
+        '''True if a Kraken `error` list reports a rate limit'''
+        return any('Rate limit exceeded' in error or 'Throttled' in error for error in errors or [])
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import threading
+from websockets.asyncio.server import serve
+
+
+class KrakenReplayServer:
+    def __init__(self, messages: list, host: str = '127.0.0.1', port: int = 0, interval: float = 0.0):
+        """
+        Local WebSocket server that replays recorded Kraken v2 messages.
+
+        A client's `subscribe` request is acknowledged like Kraken does, then the
+        recorded messages on that channel for the requested symbols are sent in
+        recorded order. Recordings are split into segments at each 'snapshot' message;
+        the n-th subscription to a channel on a connection replays the n-th segment, so
+        a client that resubscribes (after a checksum failure, say) receives the next
+        recorded snapshot like it would from Kraken. It is meant for tests and for
+        developing against captured sessions without touching the exchange.
+
+        Args:
+            messages (list): Recorded channel messages (decoded JSON dicts).
+            host (str): Interface to bind.
+            port (int): Port to bind; 0 picks a free one.
+            interval (float): Seconds to wait between replayed messages.
+
+        Attributes:
+            requests (list): Every request received from clients, decoded.
+        """
+        self.messages = list(messages)
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.requests = []
+        self._loop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._stop = None
+
+    @classmethod
+    def from_jsonl(cls, path: str, **kwargs):
+        '''server replaying a session recorded as one JSON message per line'''
+        with open(path) as f:
+            return cls([json.loads(line) for line in f if line.strip()], **kwargs)
+
+    @property
+    def url(self):
+        return f'ws://{self.host}:{self.port}'
+
+    def start(self):
+        '''serve on a background thread; returns once the port is bound'''
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._serve(),), daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self):
+        '''close every connection and join the server thread'''
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._stop.set_result, None)
+            self._thread.join()
+            self._loop.close()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    async def _serve(self):
+        self._stop = self._loop.create_future()
+        async with serve(self._handle, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._started.set()
+            await self._stop
+
+    async def _handle(self, websocket):
+        subscriptions = {}
+        async for raw in websocket:
+            request = json.loads(raw)
+            self.requests.append(request)
+            params = request.get('params', {})
+            channel = params.get('channel')
+            symbols = params.get('symbol')
+            await websocket.send(json.dumps({
+                'method': request.get('method'),
+                'result': {'channel': channel, 'symbol': symbols},
+                'success': True,
+                'req_id': request.get('req_id'),
+            }))
+            if request.get('method') == 'subscribe':
+                segments = self._segments(channel, symbols)
+                index = subscriptions.get(channel, 0)
+                subscriptions[channel] = index + 1
+                for message in segments[min(index, len(segments) - 1)] if segments else []:
+                    await websocket.send(json.dumps(message))
+                    if self.interval:
+                        await asyncio.sleep(self.interval)
+
+    def _segments(self, channel: str, symbols: list):
+        segments = []
+        for message in self._recorded(channel, symbols):
+            if not segments or message.get('type') == 'snapshot' and segments[-1]:
+                segments.append([])
+            segments[-1].append(message)
+        return segments
+
+    def _recorded(self, channel: str, symbols: list):
+        for message in self.messages:
+            if message.get('channel') != channel:
+                continue
+            data = message.get('data')
+            if symbols is None or not isinstance(data, list):
+                yield message
+                continue
+            items = [item for item in data if item.get('symbol') in symbols]
+            if items:
+                yield {**message, 'data': items}
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+
+# seconds each public endpoint's response stays fresh; endpoints not listed are never cached
+DEFAULT_ENDPOINT_TTLS = {
+    'Assets': 3600,
+    'AssetPairs': 3600,
+    'OHLC': 30,
+    'Ticker': 0.5,
+    'Depth': 0.5,
+}
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    def __init__(self, ttls: dict = None, max_entries: int = 1024):
+        """
+        TTL + LRU cache for Kraken public query responses.
+
+        Concurrent requests for the same endpoint and parameters are collapsed into a
+        single upstream call (single-flight); the other callers wait for its result.
+
+        Args:
+            ttls (dict): Endpoint name -> TTL in seconds. Defaults to DEFAULT_ENDPOINT_TTLS.
+            max_entries (int): Maximum number of cached responses before LRU eviction.
+
+        Attributes:
+            ttls (dict): Endpoint name -> TTL in seconds.
+            max_entries (int): Maximum number of cached responses.
+            hits (int): Requests served from the cache.
+            misses (int): Requests that went upstream.
+            coalesced (int): Requests that waited on an identical in-flight request.
+            evictions (int): Entries dropped to stay under `max_entries`.
+        """
+        self.ttls = dict(DEFAULT_ENDPOINT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get_or_fetch(self, method: str, data: dict, fetch):
+        """
+        Return the cached response for `method`/`data`, calling `fetch()` on a miss.
+
+        Args:
+            method (str): The Kraken endpoint name (e.g., 'Ticker').
+            data (dict): The request parameters.
+            fetch (callable): Zero-argument callable performing the real request.
+
+        Returns:
+            dict: The raw Kraken response.
+        """
+        ttl = self.ttls.get(method)
+        if not ttl:
+            return fetch()
+        key = self._make_key(method, data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._in_flight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fetch()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if call.error is None and not self._is_error(call.value):
+                    self._store(key, call.value, ttl)
+            call.done.set()
+        return call.value
+
+    def invalidate(self, method: str = None):
+        '''drop every cached response, or only those of one endpoint'''
+        with self._lock:
+            if method is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == method]:
+                del self._entries[key]
+
+    def stats(self):
+        '''hit/miss counters and current size'''
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+            }
+
+    def _store(self, key, value, ttl):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @staticmethod
+    def _make_key(method: str, data: dict):
+        return (method, tuple(sorted((k, str(v)) for k, v in (data or {}).items())))
+
+    @staticmethod
+    def _is_error(response):
+        return isinstance(response, dict) and bool(response.get('error'))
@@ -0,0 +1,343 @@
+import itertools
+import threading
+from email.utils import formatdate
+import numpy as np
+
+# Kraken prefixes legacy asset ids: Z for fiat, X for the original cryptocurrencies
+FIAT_ASSETS = {'USD', 'EUR', 'GBP', 'CAD', 'JPY', 'CHF', 'AUD'}
+X_PREFIXED_ASSETS = {'XBT', 'ETH', 'LTC', 'XRP', 'XLM', 'ETC', 'XMR', 'ZEC', 'MLN', 'REP', 'XDG'}
+# only pairs listed before Kraken's naming change are keyed by their asset ids (XXBTZUSD, XETHXXBT);
+# every later pair, including XDG/USD, is keyed by its altname (SOLUSD, XDGUSD)
+LEGACY_PAIR_ASSETS = (X_PREFIXED_ASSETS - {'XDG'}) | {'USD', 'EUR', 'GBP', 'CAD', 'JPY'}
+DEFAULT_TAKER_FEE = 0.004
+DEFAULT_MAKER_FEE = 0.0025
+
+
+def kraken_asset_id(altname: str):
+    '''the asset id Kraken uses for an altname, e.g. XBT -> XXBT, USD -> ZUSD, SOL -> SOL'''
+    altname = altname.upper()
+    if altname in FIAT_ASSETS:
+        return f'Z{altname}'
+    if altname in X_PREFIXED_ASSETS:
+        return f'X{altname}'
+    return altname
+
+
+def kraken_pair_id(base: str, quote: str):
+    '''the pair name Kraken uses for two altnames, e.g. XBT/USD -> XXBTZUSD, SOL/USD -> SOLUSD'''
+    base, quote = base.upper(), quote.upper()
+    if base in LEGACY_PAIR_ASSETS and quote in LEGACY_PAIR_ASSETS:
+        return f'{kraken_asset_id(base)}{kraken_asset_id(quote)}'
+    return f'{base}{quote}'
+
+
+def _ok(result):
+    return {'error': [], 'result': result}
+
+
+def _error(*errors):
+    return {'error': list(errors), 'result': {}}
+
+
+class SimulatedKrakenAPI:
+    def __init__(self, wsnames: list, balances: dict = None, taker_fee: float = DEFAULT_TAKER_FEE,
+                 maker_fee: float = DEFAULT_MAKER_FEE, spread_bps: float = 2.0, slippage_bps: float = 1.0,
+                 impact: float = 0.1, level_bps: float = 1.0, level_share: float = 0.02):
+        """
+        In-memory exchange with the krakenex.API interface, driven by replayed candles.
+
+        Wrap it in a KrakenAPIClient and TradeExecutor, AssetRegistry and OrderTracker
+        work unchanged against it. Time only moves when `advance` feeds the next candle
+        of every pair. Orders accepted during a candle are matched against the next one:
+
+        - market orders fill at its open, moved against the trader by half the spread,
+          `slippage_bps`, and `impact` times the order's share of the candle volume;
+        - limit orders fill at the limit (or a better open) once the candle trades
+          through it, paying the maker fee.
+
+        Fees are charged in the quote currency. An order that can no longer be paid for
+        when it fills is canceled.
+
+        Args:
+            wsnames (list): Pairs as 'BASE/QUOTE' altnames, e.g. ['XBT/USD', 'ETH/USD'].
+            balances (dict): Starting balances by altname, e.g. {'USD': 10000}.
+            taker_fee (float): Fee rate for market orders.
+            maker_fee (float): Fee rate for limit orders.
+            spread_bps (float): Quoted bid/ask spread around the close.
+            slippage_bps (float): Fixed extra cost of a market order.
+            impact (float): Price impact per unit of participation in the candle volume.
+            level_bps (float): Price step between synthetic Depth levels.
+            level_share (float): Share of the candle volume quoted on each Depth level.
+        """
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.spread_bps = spread_bps
+        self.slippage_bps = slippage_bps
+        self.impact = impact
+        self.level_bps = level_bps
+        self.level_share = level_share
+        self.pairs = {}
+        self.assets = {}
+        self._names = {}
+        for wsname in wsnames:
+            base_alt, quote_alt = wsname.upper().split('/')
+            base, quote = kraken_asset_id(base_alt), kraken_asset_id(quote_alt)
+            for asset_id, altname in ((base, base_alt), (quote, quote_alt)):
+                self.assets[asset_id] = {'aclass': 'currency', 'altname': altname, 'decimals': 10,
+                                         'display_decimals': 5, 'status': 'enabled'}
+            pair = kraken_pair_id(base_alt, quote_alt)
+            self.pairs[pair] = {
+                'altname': f'{base_alt}{quote_alt}', 'wsname': f'{base_alt}/{quote_alt}', 'aclass_base': 'currency',
+                'base': base, 'aclass_quote': 'currency', 'quote': quote, 'lot': 'unit', 'cost_decimals': 5,
+                'pair_decimals': 5, 'lot_decimals': 8, 'lot_multiplier': 1, 'fees': [[0, taker_fee * 100]],
+                'fees_maker': [[0, maker_fee * 100]], 'fee_volume_currency': 'ZUSD', 'margin_call': 80,
+                'margin_stop': 40, 'ordermin': '0.00001', 'costmin': '0.5', 'tick_size': '0.00001', 'status': 'online',
+            }
+            for name in (pair, f'{base_alt}{quote_alt}', f'{base_alt}/{quote_alt}'):
+                self._names[name] = pair
+        self.balances = {kraken_asset_id(altname): float(amount) for altname, amount in (balances or {}).items()}
+        self.time = None
+        self.candles = {pair: [] for pair in self.pairs}
+        self.orders = {}
+        self.fills = []
+        self._open = []
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ---- market data -------------------------------------------------------------
+
+    def advance(self, time: int, candles: dict):
+        """
+        Move to the next candle: match open orders against it, then publish it.
+
+        Args:
+            time (int): Candle open time, unix seconds.
+            candles (dict): Pair (key, altname or wsname) -> (open, high, low, close, vwap,
+                volume, count). Pairs left out keep their previous candle.
+        """
+        with self._lock:
+            rows = {}
+            for name, (open_, high, low, close, vwap, volume, count) in candles.items():
+                pair = self._names[name]
+                rows[pair] = [int(time), f'{open_:.5f}', f'{high:.5f}', f'{low:.5f}', f'{close:.5f}', f'{vwap:.5f}',
+                              f'{volume:.8f}', int(count)]
+            self.time = int(time)
+            self._match(rows)
+            for pair, row in rows.items():
+                self.candles[pair].append(row)
+
+    def _last(self, pair: str):
+        return self.candles[pair][-1] if self.candles[pair] else None
+
+    def _quote(self, pair: str):
+        close = float(self._last(pair)[4])
+        half_spread = close * self.spread_bps / 2e4
+        return close - half_spread, close + half_spread, close
+
+    def equity(self, quote: str = 'USD'):
+        '''balances valued at the latest closes, in `quote`'''
+        quote = kraken_asset_id(quote)
+        total = self.balances.get(quote, 0.0)
+        for pair, info in self.pairs.items():
+            if info['quote'] == quote and self._last(pair) is not None:
+                total += self.balances.get(info['base'], 0.0) * float(self._last(pair)[4])
+        return total
+
+    # ---- krakenex.API interface ----------------------------------------------------
+
+    def query_public(self, method: str, data: dict = None):
+        handler = getattr(self, f'_public_{method}', None)
+        if handler is None:
+            return _error('EGeneral:Unknown method')
+        with self._lock:
+            return handler(data or {})
+
+    def query_private(self, method: str, data: dict = None):
+        handler = getattr(self, f'_private_{method}', None)
+        if handler is None:
+            return _error('EGeneral:Unknown method')
+        with self._lock:
+            return handler(data or {})
+
+    def _resolve(self, data: dict):
+        pairs = [self._names.get(name.strip().upper()) for name in str(data.get('pair', '')).split(',')]
+        if not pairs or None in pairs:
+            return None
+        return pairs
+
+    def _public_Time(self, data):
+        return _ok({'unixtime': self.time, 'rfc1123': formatdate(self.time or 0, usegmt=True)})
+
+    def _public_Assets(self, data):
+        return _ok(dict(self.assets))
+
+    def _public_AssetPairs(self, data):
+        return _ok(dict(self.pairs))
+
+    def _public_Ticker(self, data):
+        pairs = self._resolve(data)
+        if pairs is None:
+            return _error('EQuery:Unknown asset pair')
+        result = {}
+        for pair in pairs:
+            row = self._last(pair)
+            if row is None:
+                continue
+            bid, ask, close = self._quote(pair)
+            result[pair] = {
+                'a': [f'{ask:.5f}', '1', '1.000'], 'b': [f'{bid:.5f}', '1', '1.000'], 'c': [f'{close:.5f}', row[6]],
+                'v': [row[6], row[6]], 'p': [row[5], row[5]], 't': [row[7], row[7]], 'l': [row[3], row[3]],
+                'h': [row[2], row[2]], 'o': row[1],
+            }
+        return _ok(result)
+
+    def _public_OHLC(self, data):
+        pairs = self._resolve(data)
+        if pairs is None:
+            return _error('EQuery:Unknown asset pair')
+        pair = pairs[0]
+        since = int(data.get('since') or 0)
+        rows = [row for row in self.candles[pair] if row[0] > since][-720:]
+        return _ok({pair: rows, 'last': rows[-1][0] if rows else since})
+
+    def _public_Depth(self, data):
+        pairs = self._resolve(data)
+        if pairs is None:
+            return _error('EQuery:Unknown asset pair')
+        pair = pairs[0]
+        count = int(data.get('count', 100))
+        bid, ask, _ = self._quote(pair)
+        level_volume = max(float(self._last(pair)[6]) * self.level_share, 1e-8)
+        steps = 1 + self.level_bps / 1e4 * np.arange(count)
+        asks = [[f'{price:.5f}', f'{level_volume:.8f}', self.time] for price in ask * steps]
+        bids = [[f'{price:.5f}', f'{level_volume:.8f}', self.time] for price in bid * (2 - steps)]
+        return _ok({pair: {'asks': asks, 'bids': bids}})
+
+    # ---- private endpoints ---------------------------------------------------------
+
+    def _private_Balance(self, data):
+        return _ok({asset: f'{amount:.10f}' for asset, amount in self.balances.items()})
+
+    def _private_AddOrder(self, data):
+        pairs = self._resolve(data)
+        if pairs is None or len(pairs) != 1:
+            return _error('EQuery:Unknown asset pair')
+        pair = pairs[0]
+        side, order_type = data.get('type'), data.get('ordertype')
+        try:
+            volume = float(data.get('volume', 0))
+            price = float(data.get('price', 0) or 0)
+        except (TypeError, ValueError):
+            return _error('EGeneral:Invalid arguments:volume')
+        if side not in ('buy', 'sell') or order_type not in ('market', 'limit') or volume <= 0:
+            return _error('EGeneral:Invalid arguments')
+        if order_type == 'limit' and price <= 0:
+            return _error('EGeneral:Invalid arguments:price')
+        if self._last(pair) is None:
+            return _error('EService:Market in cancel_only mode')
+        info = self.pairs[pair]
+        if side == 'buy':
+            estimate = price if order_type == 'limit' else self._quote(pair)[1]
+            if volume * estimate * (1 + self.taker_fee) > self.balances.get(info['quote'], 0.0):
+                return _error('EOrder:Insufficient funds')
+        elif volume > self.balances.get(info['base'], 0.0):
+            return _error('EOrder:Insufficient funds')
+        txid = self._next_txid()
+        description = f"{side} {volume:.8f} {info['altname']} @ {'market' if order_type == 'market' else f'limit {price:.5f}'}"
+        self.orders[txid] = {
+            'refid': None, 'userref': 0, 'status': 'open', 'opentm': float(self.time), 'starttm': 0, 'expiretm': 0,
+            'closetm': 0, 'descr': {'pair': info['altname'], 'type': side, 'ordertype': order_type,
+                                    'price': f'{price:.5f}', 'price2': '0', 'leverage': 'none', 'order': description},
+            'vol': f'{volume:.8f}', 'vol_exec': '0.00000000', 'cost': '0.00000', 'fee': '0.00000', 'price': '0.00000',
+            'stopprice': '0.00000', 'limitprice': '0.00000', 'misc': '', 'oflags': 'fciq',
+        }
+        self._open.append((txid, pair))
+        return _ok({'descr': {'order': description}, 'txid': [txid]})
+
+    def _private_QueryOrders(self, data):
+        txids = [txid for txid in str(data.get('txid', '')).split(',') if txid]
+        if not txids or any(txid not in self.orders for txid in txids):
+            return _error('EOrder:Invalid order')
+        return _ok({txid: dict(self.orders[txid]) for txid in txids})
+
+    def _private_OpenOrders(self, data):
+        return _ok({'open': {txid: dict(self.orders[txid]) for txid, _ in self._open}})
+
+    def _private_CancelOrder(self, data):
+        txid = data.get('txid')
+        if txid not in {open_txid for open_txid, _ in self._open}:
+            return _error('EOrder:Unknown order')
+        self._close(txid, 'canceled', reason='User requested')
+        return _ok({'count': 1})
+
+    def _private_CancelOrderBatch(self, data):
+        txids = data.get('orders', [])
+        if isinstance(txids, str):
+            txids = [txid for txid in txids.split(',') if txid]
+        open_txids = {open_txid for open_txid, _ in self._open}
+        if not txids or any(txid not in open_txids for txid in txids):
+            return _error('EOrder:Unknown order')
+        for txid in txids:
+            self._close(txid, 'canceled', reason='User requested')
+        return _ok({'count': len(txids)})
+
+    # ---- matching ------------------------------------------------------------------
+
+    def _next_txid(self):
+        number = next(self._counter)
+        return f'O{number:05X}-{number * 7919 % 16 ** 5:05X}-{number * 104729 % 16 ** 6:06X}'
+
+    def _close(self, txid: str, status: str, reason: str = None):
+        order = self.orders[txid]
+        order['status'] = status
+        order['closetm'] = float(self.time)
+        if reason:
+            order['reason'] = reason
+        self._open = [(open_txid, pair) for open_txid, pair in self._open if open_txid != txid]
+
+    def _match(self, rows: dict):
+        for txid, pair in list(self._open):
+            row = rows.get(pair)
+            if row is None:
+                continue
+            order = self.orders[txid]
+            side = order['descr']['type']
+            volume = float(order['vol'])
+            open_, high, low = float(row[1]), float(row[2]), float(row[3])
+            if order['descr']['ordertype'] == 'market':
+                participation = volume / max(float(row[6]), 1e-12)
+                cost_bps = self.spread_bps / 2 + self.slippage_bps + self.impact * participation * 1e4
+                price = open_ * (1 + cost_bps / 1e4) if side == 'buy' else open_ * (1 - cost_bps / 1e4)
+                fee_rate = self.taker_fee
+            else:
+                limit = float(order['descr']['price'])
+                if side == 'buy' and low > limit or side == 'sell' and high < limit:
+                    continue
+                price = min(open_, limit) if side == 'buy' else max(open_, limit)
+                fee_rate = self.maker_fee
+            self._fill(txid, pair, side, volume, price, fee_rate, reference=open_)
+
+    def _fill(self, txid: str, pair: str, side: str, volume: float, price: float, fee_rate: float, reference: float):
+        info = self.pairs[pair]
+        cost = volume * price
+        fee = cost * fee_rate
+        if side == 'buy':
+            if cost + fee > self.balances.get(info['quote'], 0.0) + 1e-9:
+                self._close(txid, 'canceled', reason='Insufficient funds')
+                return
+            self.balances[info['quote']] = self.balances.get(info['quote'], 0.0) - cost - fee
+            self.balances[info['base']] = self.balances.get(info['base'], 0.0) + volume
+        else:
+            if volume > self.balances.get(info['base'], 0.0) + 1e-12:
+                self._close(txid, 'canceled', reason='Insufficient funds')
+                return
+            self.balances[info['base']] = self.balances.get(info['base'], 0.0) - volume
+            self.balances[info['quote']] = self.balances.get(info['quote'], 0.0) + cost - fee
+        order = self.orders[txid]
+        order.update({'vol_exec': f'{volume:.8f}', 'cost': f'{cost:.5f}', 'fee': f'{fee:.5f}', 'price': f'{price:.5f}'})
+        self._close(txid, 'closed')
+        signed = 1 if side == 'buy' else -1
+        self.fills.append({
+            'time': self.time, 'txid': txid, 'pair': pair, 'side': side, 'volume': volume, 'price': price,
+            'cost': cost, 'fee': fee, 'slippage_bps': signed * (price / reference - 1) * 1e4,
+        })
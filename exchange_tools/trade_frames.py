@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+TRADE_COLUMNS = ['price', 'volume', 'time', 'buy_sell', 'market_limit', 'misc', 'trade_id']
+OHLC_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'vwap', 'volume', 'count']
+BUY_SELL_CATEGORIES = ['b', 's']
+MARKET_LIMIT_CATEGORIES = ['m', 'l']
+
+
+def trades_to_columns(trades: list):
+    """
+    Parse one page of Kraken trade rows into typed NumPy columns.
+
+    Args:
+        trades (list): Kraken trade rows [price, volume, time, side, type, misc(, trade_id)].
+
+    Returns:
+        dict: Column name -> NumPy array. `time` is int64 nanoseconds since the epoch,
+            `buy_sell` and `market_limit` are category codes.
+    """
+    columns = list(zip(*trades)) if trades else [()] * len(TRADE_COLUMNS)
+    seconds = np.array(columns[2], dtype=np.float64)
+    # round through microseconds so float seconds don't pick up spurious nanoseconds
+    time_ns = np.rint(seconds * 1e6).astype(np.int64) * 1000
+    trade_ids = columns[6] if len(columns) > 6 else [-1] * len(trades)
+    return {
+        'price': np.array(columns[0], dtype=np.float64),
+        'volume': np.array(columns[1], dtype=np.float64),
+        'time': time_ns,
+        'buy_sell': pd.Categorical(columns[3], categories=BUY_SELL_CATEGORIES).codes,
+        'market_limit': pd.Categorical(columns[4], categories=MARKET_LIMIT_CATEGORIES).codes,
+        'misc': np.array(columns[5], dtype=object),
+        'trade_id': np.array(trade_ids, dtype=np.int64),
+    }
+
+
+def trades_to_dataframe(batches):
+    """
+    Build one typed trade DataFrame from an iterable of Kraken trade pages.
+
+    Each page is parsed into arrays as it arrives, so only one page of Python
+    strings is alive at a time. The frame is only sorted if the pages were not
+    already in time order.
+
+    Args:
+        batches (iterable): Lists of Kraken trade rows, e.g. the `trades` element of each
+            (pair_key, trades, last) tuple yielded by KrakenAPIClient.iter_trade_history.
+
+    Returns:
+        pd.DataFrame: Columns price/volume (float64), time (datetime64[ns]),
+            buy_sell/market_limit (category), misc (object) and trade_id (int64).
+    """
+    parts = {name: [] for name in TRADE_COLUMNS}
+    for batch in batches:
+        for name, values in trades_to_columns(batch).items():
+            parts[name].append(values)
+    columns = {
+        name: np.concatenate(values) if values else trades_to_columns([])[name]
+        for name, values in parts.items()
+    }
+    time_ns = columns['time']
+    if len(time_ns) > 1 and not np.all(time_ns[1:] >= time_ns[:-1]):
+        order = np.argsort(time_ns, kind='stable')
+        columns = {name: values[order] for name, values in columns.items()}
+    return pd.DataFrame({
+        'price': columns['price'],
+        'volume': columns['volume'],
+        'time': columns['time'].view('datetime64[ns]'),
+        'buy_sell': pd.Categorical.from_codes(columns['buy_sell'], categories=BUY_SELL_CATEGORIES),
+        'market_limit': pd.Categorical.from_codes(columns['market_limit'], categories=MARKET_LIMIT_CATEGORIES),
+        'misc': columns['misc'],
+        'trade_id': columns['trade_id'],
+    }, columns=TRADE_COLUMNS)
+
+
+def ohlc_to_dataframe(rows: list):
+    """
+    Build a typed OHLC DataFrame from Kraken OHLC rows.
+
+    Args:
+        rows (list): Kraken OHLC rows [time, open, high, low, close, vwap, volume, count].
+
+    Returns:
+        pd.DataFrame: time (datetime64[ns]), float64 prices/volume and int64 count.
+    """
+    columns = list(zip(*rows)) if rows else [()] * len(OHLC_COLUMNS)
+    frame = {'time': (np.array(columns[0], dtype=np.int64) * 1_000_000_000).view('datetime64[ns]')}
+    for index, name in enumerate(OHLC_COLUMNS[1:7], start=1):
+        frame[name] = np.array(columns[index], dtype=np.float64)
+    frame['count'] = np.array(columns[7], dtype=np.int64)
+    return pd.DataFrame(frame, columns=OHLC_COLUMNS)
@@ -17,4 +17,6 @@ class KrakenAPIUrls(Enum):
     QUERY_TRADES = f"{PRIVATE_URL}/QueryTrades"
     OPEN_POSITIONS = f"{PRIVATE_URL}/OpenPositions"
     ADD_ORDER = f"{PRIVATE_URL}/AddOrder"
-    CANCEL_ORDER = f"{PRIVATE_URL}/CancelOrder"
\ No newline at end of file
+    CANCEL_ORDER = f"{PRIVATE_URL}/CancelOrder"
+    CANCEL_ORDER_BATCH = f"{PRIVATE_URL}/CancelOrderBatch"
+    WEBSOCKET_URL = "wss://ws.kraken.com/v2"
\ No newline at end of file
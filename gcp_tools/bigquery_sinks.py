@@ -0,0 +1,217 @@
+import io
+import json
+import sqlite3
+import threading
+from datetime import datetime
+import pandas as pd
+from google.cloud import bigquery
+
+# BigQuery's streaming API recommends ~500 rows and caps requests at 10 MB
+STREAM_MAX_ROWS = 500
+STREAM_MAX_BYTES = 5 * 1024 * 1024
+
+_clients = {}
+_tables = {}
+_cache_lock = threading.Lock()
+
+
+def get_bigquery_client(project_id: str):
+    '''one BigQuery client per project for the whole process'''
+    with _cache_lock:
+        if project_id not in _clients:
+            _clients[project_id] = bigquery.Client(project=project_id)
+        return _clients[project_id]
+
+
+def get_table_cached(client, table_id: str):
+    '''table metadata fetched once per process instead of on every insert'''
+    with _cache_lock:
+        if table_id not in _tables:
+            _tables[table_id] = client.get_table(table_id)
+        return _tables[table_id]
+
+
+class RowSink:
+    """
+    Destination for rows produced by the ingestion jobs.
+
+    `write` may buffer; `flush` pushes whatever is buffered. Both return a list of
+    errors, empty on success, matching what `client.insert_rows` returns.
+    """
+
+    def write(self, rows: list, row_ids: list = None):
+        raise NotImplementedError
+
+    def flush(self):
+        return []
+
+    def close(self):
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class BigQueryStreamingSink(RowSink):
+    def __init__(self, client, table_id: str, max_rows: int = STREAM_MAX_ROWS, max_bytes: int = STREAM_MAX_BYTES):
+        """
+        Streaming inserts, micro-batched by row count or payload size.
+
+        The `index` of a returned row error counts every row written to this sink, not
+        just the rows of the request that failed, so callers can map it back to the row.
+
+        Args:
+            client (bigquery.Client): The BigQuery client.
+            table_id (str): Fully qualified table id.
+            max_rows (int): Flush once this many rows are buffered.
+            max_bytes (int): Flush once the buffered rows reach roughly this JSON size.
+        """
+        self.client = client
+        self.table_id = table_id
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self._rows = []
+        self._row_ids = []
+        self._bytes = 0
+        self._flushed = 0
+
+    def write(self, rows: list, row_ids: list = None):
+        errors = []
+        for index, row in enumerate(rows):
+            self._rows.append(row)
+            self._row_ids.append(row_ids[index] if row_ids else None)
+            self._bytes += len(json.dumps(row, default=str))
+            if len(self._rows) >= self.max_rows or self._bytes >= self.max_bytes:
+                errors.extend(self.flush())
+        return errors
+
+    def flush(self):
+        if not self._rows:
+            return []
+        table = get_table_cached(self.client, self.table_id)
+        row_ids = self._row_ids if any(row_id is not None for row_id in self._row_ids) else None
+        errors = self.client.insert_rows(table, self._rows, row_ids=row_ids)
+        offset = self._flushed
+        self._flushed += len(self._rows)
+        self._rows, self._row_ids, self._bytes = [], [], 0
+        return [dict(error, index=error['index'] + offset) if isinstance(error, dict) and 'index' in error else error
+                for error in errors]
+
+
+class BigQueryLoadSink(RowSink):
+    def __init__(self, client, table_id: str):
+        """
+        Bulk loads: buffered rows are sent as one Parquet load job on flush.
+
+        Load jobs are free and far faster than streaming for history backfills, but
+        do not deduplicate on row ids; those are ignored.
+
+        Args:
+            client (bigquery.Client): The BigQuery client.
+            table_id (str): Fully qualified table id.
+        """
+        self.client = client
+        self.table_id = table_id
+        self._rows = []
+
+    def write(self, rows: list, row_ids: list = None):
+        self._rows.extend(rows)
+        return []
+
+    def flush(self):
+        if not self._rows:
+            return []
+        table = get_table_cached(self.client, self.table_id)
+        df = rows_to_dataframe(self._rows, table.schema)
+        buffer = io.BytesIO()
+        df.to_parquet(buffer, engine='pyarrow', index=False)
+        buffer.seek(0)
+        job_config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition=bigquery.WriteDisposition.WRITE_APPEND,
+        )
+        job = self.client.load_table_from_file(buffer, self.table_id, job_config=job_config)
+        job.result()
+        self._rows = []
+        return list(job.errors or [])
+
+
+class SQLiteSink(RowSink):
+    def __init__(self, path: str, table: str = 'ohlc_data'):
+        """
+        Local stand-in with the same interface, for offline runs and tests.
+
+        The table is created from the first row's keys. Row ids are kept in a primary
+        key column, so replayed rows are ignored like BigQuery insertIds.
+
+        Args:
+            path (str): SQLite database file, or ':memory:'.
+            table (str): Table name.
+        """
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.table = table
+        self._columns = None
+        self._lock = threading.Lock()
+
+    def write(self, rows: list, row_ids: list = None):
+        if not rows:
+            return []
+        with self._lock:
+            if self._columns is None:
+                self._columns = list(rows[0].keys())
+                columns = ', '.join(f'"{column}"' for column in self._columns)
+                self.connection.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" (_row_id TEXT PRIMARY KEY, {columns})')
+            placeholders = ', '.join('?' for _ in range(len(self._columns) + 1))
+            values = [
+                (row_ids[index] if row_ids else None, *(_to_sqlite(row.get(column)) for column in self._columns))
+                for index, row in enumerate(rows)
+            ]
+            self.connection.executemany(f'INSERT OR IGNORE INTO "{self.table}" VALUES ({placeholders})', values)
+            self.connection.commit()
+        return []
+
+    def close(self):
+        self.connection.close()
+        return []
+
+
+def _to_sqlite(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def rows_to_dataframe(rows: list, schema: list):
+    '''a DataFrame whose column types follow the BigQuery schema, ready for a Parquet load'''
+    df = pd.DataFrame(rows)
+    for field in schema:
+        if field.name not in df:
+            continue
+        if field.field_type in ('FLOAT', 'FLOAT64', 'NUMERIC'):
+            df[field.name] = pd.to_numeric(df[field.name]).astype('float64')
+        elif field.field_type in ('INTEGER', 'INT64'):
+            df[field.name] = pd.to_numeric(df[field.name]).astype('Int64')
+        elif field.field_type == 'TIMESTAMP':
+            df[field.name] = pd.to_datetime(df[field.name], utc=True)
+        elif field.field_type == 'STRING':
+            df[field.name] = df[field.name].astype('string')
+    return df
+
+
+def make_sink(kind: str, project_id: str, table_id: str, path: str = None):
+    """
+    Build a sink by name: 'stream' (default), 'load' or 'sqlite'.
+
+    Args:
+        kind (str): The sink type.
+        project_id (str): GCP project for the BigQuery sinks.
+        table_id (str): Fully qualified table id, or the local table name for sqlite.
+        path (str): SQLite database file for the 'sqlite' sink.
+    """
+    if kind == 'sqlite':
+        return SQLiteSink(path or ':memory:', table_id.split('.')[-1])
+    client = get_bigquery_client(project_id)
+    if kind == 'load':
+        return BigQueryLoadSink(client, table_id)
+    return BigQueryStreamingSink(client, table_id)
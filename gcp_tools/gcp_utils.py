@@ -1,19 +1,18 @@
 import os
-from google.cloud import secretmanager
-from gcp_tools.project_enums import GCPSecret
+from gcp_tools.project_enums import GCPSecret, KrakenReadOnlySecret
+from gcp_tools.secret_provider import get_secret_provider
 from google.auth import default
 from google.auth.transport.requests import AuthorizedSession
 import json
 
-def get_secret( gcp_secret: GCPSecret):
-    client = secretmanager.SecretManagerServiceClient()
-    response = client.access_secret_version(request={"name": gcp_secret.NAME})
-    payload = response.payload.data.decode("UTF-8") # payload is the entire JSON string
+def get_secret( gcp_secret: GCPSecret = KrakenReadOnlySecret()):
+    # served from the process-wide cache; only the first call (or a refresh) hits Secret Manager
+    payload = get_secret_provider().get(gcp_secret.KEY_LOCATION or gcp_secret.NAME) # payload is the entire JSON string
 
     secrets = json.loads(payload)
 
-    api_key = secrets[secrets_key]
-    api_secret = secrets[secrets_value]
+    api_key = secrets[gcp_secret.NAME]
+    api_secret = secrets[gcp_secret.VALUE]
 
     print(f"API Key retrieved") # Handle these securely!
     print(f"API Secret retrieved") # Handle these securely!
@@ -16,6 +16,9 @@ class GCPSecretSamples(GCPSecret):
 @dataclass
 class KrakenReadOnlySecret(GCPSecret):    
     KEY_LOCATION: str = field(default="projects/trading-app-project-450322/secrets/KRAKEN_PUB_KEY_READONLY/versions/latest")
+    # JSON fields of the secret payload holding the API key and the API secret
+    NAME: str = field(default="KRAKEN_PUB")
+    VALUE: str = field(default="KRAKEN_SEC")
 
 
 @dataclass
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+DEFAULT_SECRET_TTL = 3600
+DEFAULT_REFRESH_AHEAD = 300
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def secret_id_from_name(name: str):
+    '''SECRET_ID from projects/<p>/secrets/<SECRET_ID>/versions/<v>; plain names pass through'''
+    parts = name.split('/')
+    if 'secrets' in parts:
+        return parts[parts.index('secrets') + 1]
+    return name
+
+
+class SecretManagerBackend:
+    """Reads secrets from GCP Secret Manager over one client channel per process."""
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from google.cloud import secretmanager
+                self._client = secretmanager.SecretManagerServiceClient()
+            return self._client
+
+    def fetch(self, name: str):
+        response = self.client.access_secret_version(request={"name": name})
+        return response.payload.data.decode("UTF-8")
+
+
+class EnvSecretBackend:
+    """Reads secrets from environment variables named after the secret id, for offline runs."""
+
+    def fetch(self, name: str):
+        env_name = secret_id_from_name(name)
+        if env_name not in os.environ:
+            raise KeyError(f"Secret {name} not found in environment variable {env_name}")
+        return os.environ[env_name]
+
+
+class FileSecretBackend:
+    """Reads secrets from <directory>/<secret id> files, for offline runs."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def fetch(self, name: str):
+        with open(os.path.join(self.directory, secret_id_from_name(name))) as f:
+            return f.read().strip()
+
+
+class SecretProvider:
+    def __init__(self, backend=None, ttl: float = DEFAULT_SECRET_TTL, refresh_ahead: float = DEFAULT_REFRESH_AHEAD):
+        """
+        Thread-safe, memoizing secret lookup.
+
+        A secret is fetched once and served from memory for `ttl` seconds. During the
+        last `refresh_ahead` seconds of its lifetime the cached value is still returned
+        while a background thread fetches the new one, so callers rarely wait on the
+        network after the first fetch.
+
+        Args:
+            backend: Object with a `fetch(name) -> str` method. Defaults to Secret Manager.
+            ttl (float): Seconds a fetched secret stays valid.
+            refresh_ahead (float): Seconds before expiry at which a background refresh starts.
+        """
+        self.backend = backend or SecretManagerBackend()
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._cache = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, name: str):
+        """
+        Return the secret payload for a resource name (or plain name for local backends).
+
+        Args:
+            name (str): e.g. 'projects/<p>/secrets/<id>/versions/latest'.
+
+        Returns:
+            str: The secret payload.
+        """
+        with self._lock:
+            entry = self._cache.get(name)
+            if entry is not None:
+                value, fetched_at = entry
+                age = time.monotonic() - fetched_at
+                if age < self.ttl:
+                    self.hits += 1
+                    if age >= self.ttl - self.refresh_ahead and name not in self._refreshing:
+                        self._refreshing.add(name)
+                        threading.Thread(target=self._refresh, args=(name,), daemon=True).start()
+                    return value
+            self.misses += 1
+        value = self.backend.fetch(name)
+        with self._lock:
+            self._cache[name] = (value, time.monotonic())
+        return value
+
+    def invalidate(self, name: str = None):
+        '''forget one secret, or all of them'''
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def _refresh(self, name: str):
+        try:
+            value = self.backend.fetch(name)
+            with self._lock:
+                self._cache[name] = (value, time.monotonic())
+                self.refreshes += 1
+        except Exception as e:
+            # keep serving the cached value; the next call after expiry fetches synchronously
+            print(f"Background refresh of secret {name} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+
+def get_secret_provider():
+    """
+    Return the process-wide SecretProvider.
+
+    The backend is chosen by SECRET_BACKEND: 'gcp' (default), 'env', or 'file' (reading
+    from SECRET_DIR). SECRET_TTL overrides the cache lifetime in seconds.
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            backend_name = os.environ.get('SECRET_BACKEND', 'gcp')
+            if backend_name == 'env':
+                backend = EnvSecretBackend()
+            elif backend_name == 'file':
+                backend = FileSecretBackend(os.environ.get('SECRET_DIR', '.secrets'))
+            else:
+                backend = SecretManagerBackend()
+            _provider = SecretProvider(backend, ttl=float(os.environ.get('SECRET_TTL', DEFAULT_SECRET_TTL)))
+        return _provider
@@ -1,65 +1,247 @@
 import functions_framework
 import requests
 from google.cloud import bigquery
-from google.cloud import secretmanager
 import os
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from gcp_tools.bigquery_sinks import make_sink
+from gcp_tools.secret_provider import get_secret_provider
+
+DEFAULT_PAIRS = ["XBTUSD"]
+DEFAULT_INTERVALS = [60]
 
 def access_secret_version(project_id, secret_id, version_id="latest"):
-    """Access the payload for the given secret version if one exists."""
-    client = secretmanager.SecretManagerServiceClient()
+    """Access the payload for the given secret version if one exists.
+
+    Served from the process-wide secret cache, so warm invocations skip Secret Manager.
+    """
     name = f"projects/{project_id}/secrets/{secret_id}/versions/{version_id}"
-    response = client.access_secret_version(request={"name": name})
-    return response.payload.data.decode("UTF-8")
+    return get_secret_provider().get(name)
 
-def get_kraken_data(pair, interval, project_id):
-    """Retrieves OHLC data from the Kraken API."""
-    secret_id = "KRAKEN_PUB_KEY_READONLY" #replace with your secret name.
-    api_key = access_secret_version(project_id, secret_id)
+def get_kraken_data(pair, interval, project_id, since=None, api_key=None, session=None):
+    """Retrieves OHLC data from the Kraken API.
+
+    Returns the candles (oldest first, the last one still open) and Kraken's `last` cursor.
+    Pass api_key and a shared requests session when fetching many pairs.
+    """
+    if api_key is None:
+        secret_id = "KRAKEN_PUB_KEY_READONLY" #replace with your secret name.
+        api_key = access_secret_version(project_id, secret_id)
     url = f"https://api.kraken.com/0/public/OHLC?pair={pair}&interval={interval}"
+    if since is not None:
+        url = f"{url}&since={since}"
     headers = {"API-Key": api_key}
-    response = requests.get(url, headers=headers)
+    response = (session or requests).get(url, headers=headers)
     response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
     data = response.json()
-    return data["result"][pair]
-
-def insert_bigquery(rows, project_id):
-    """Inserts data into the BigQuery table."""
-    client = bigquery.Client(project=project_id)
-    table_id = f"{project_id}.kraken_data.ohlc_data"
-    table = client.get_table(table_id)
-    errors = client.insert_rows(table, rows)
+    if data.get("error"):
+        raise Exception(f"Kraken API error: {data['error']}")
+    result = data["result"]
+    # Kraken keys the candles by its canonical pair name (XBTUSD -> XXBTZUSD)
+    candles = next(rows for key, rows in result.items() if key != "last")
+    return candles, result["last"]
+
+class BigQueryWatermarkStore:
+    """High-watermarks kept in a small BigQuery table (key STRING, value INT64, updated_at TIMESTAMP).
+
+    Exposes the same get/set interface as common.checkpoint_store.CheckpointStore,
+    so a local JSON store can stand in when running offline.
+    """
+
+    def __init__(self, client, table_id):
+        self.client = client
+        self.table_id = table_id
+
+    def get(self, key, default=None):
+        query = f"SELECT value FROM `{self.table_id}` WHERE key = @key"
+        job_config = bigquery.QueryJobConfig(query_parameters=[bigquery.ScalarQueryParameter("key", "STRING", key)])
+        rows = list(self.client.query(query, job_config=job_config).result())
+        return rows[0]["value"] if rows else default
+
+    def set(self, key, value):
+        query = f"""
+            MERGE `{self.table_id}` T
+            USING (SELECT @key AS key, @value AS value) S
+            ON T.key = S.key
+            WHEN MATCHED THEN UPDATE SET value = S.value, updated_at = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN INSERT (key, value, updated_at) VALUES (S.key, S.value, CURRENT_TIMESTAMP())
+        """
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter("key", "STRING", key),
+            bigquery.ScalarQueryParameter("value", "INT64", value),
+        ])
+        self.client.query(query, job_config=job_config).result()
+
+    def get_many(self, keys):
+        """Watermarks for many keys in one query; missing keys are absent from the result."""
+        query = f"SELECT key, value FROM `{self.table_id}` WHERE key IN UNNEST(@keys)"
+        job_config = bigquery.QueryJobConfig(query_parameters=[bigquery.ArrayQueryParameter("keys", "STRING", list(keys))])
+        return {row["key"]: row["value"] for row in self.client.query(query, job_config=job_config).result()}
+
+    def set_many(self, values):
+        """Upserts many watermarks in one MERGE."""
+        if not values:
+            return
+        query = f"""
+            MERGE `{self.table_id}` T
+            USING (SELECT key, value FROM UNNEST(@keys) AS key WITH OFFSET i JOIN UNNEST(@values) AS value WITH OFFSET j ON i = j) S
+            ON T.key = S.key
+            WHEN MATCHED THEN UPDATE SET value = S.value, updated_at = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN INSERT (key, value, updated_at) VALUES (S.key, S.value, CURRENT_TIMESTAMP())
+        """
+        job_config = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ArrayQueryParameter("keys", "STRING", list(values.keys())),
+            bigquery.ArrayQueryParameter("values", "INT64", list(values.values())),
+        ])
+        self.client.query(query, job_config=job_config).result()
+
+def closed_candles_since(candles, watermark):
+    """Drops the still-open final candle and everything at or before the watermark."""
+    return [item for item in candles[:-1] if watermark is None or item[0] > watermark]
+
+def insert_bigquery(rows, project_id, row_ids=None, sink=None):
+    """Inserts data into the BigQuery table.
+
+    Rows go through a sink chosen by BIGQUERY_SINK: "stream" (micro-batched streaming
+    inserts, the default), "load" (one Parquet load job) or "sqlite" (local file at
+    SQLITE_SINK_PATH, for offline runs). row_ids become BigQuery insertIds, a best-effort
+    dedupe that only catches a repeated insert within about a minute; the watermarks are
+    what keep later runs from inserting the same candles again.
+    """
+    owns_sink = sink is None
+    if owns_sink:
+        table_id = f"{project_id}.kraken_data.ohlc_data"
+        sink = make_sink(os.environ.get("BIGQUERY_SINK", "stream"), project_id, table_id, os.environ.get("SQLITE_SINK_PATH"))
+    errors = sink.write(rows, row_ids)
+    errors += sink.close() if owns_sink else sink.flush()
     if errors:
         print(f"Encountered errors while inserting rows: {errors}")
     else:
         print("Data successfully inserted into BigQuery.")
+    return errors
+
+def watermark_key(pair, interval):
+    return f"ohlc:{pair}:{interval}"
+
+def candles_to_rows(pair, interval, candles):
+    """Builds BigQuery rows (and their insertIds) from closed Kraken candles."""
+    rows = []
+    for item in candles:
+        timestamp = datetime.fromtimestamp(item[0])
+        row = {
+            "timestamp": timestamp,
+            "pair": pair,
+            "interval": interval,
+            "open": item[1],
+            "high": item[2],
+            "low": item[3],
+            "close": item[4],
+            "volume": item[6],
+        }
+        rows.append(row)
+    row_ids = [f"{pair}-{interval}-{item[0]}" for item in candles]
+    return rows, row_ids
+
+def fetch_closed_candles(pair, interval, watermark, project_id, api_key, session):
+    """Fetches one pair/interval and reports its latency; errors are reported, not raised."""
+    started = time.perf_counter()
+    report = {"pair": pair, "interval": interval, "rows": 0, "error": None, "candles": []}
+    try:
+        candles, _ = get_kraken_data(pair, interval, project_id, since=watermark, api_key=api_key, session=session)
+        report["candles"] = closed_candles_since(candles, watermark)
+        report["rows"] = len(report["candles"])
+    except Exception as e:
+        report["error"] = str(e)
+    report["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+def run_ingestion_job(pairs, intervals, project_id, watermarks, max_workers=8, insert=insert_bigquery):
+    """Ingests every pair x interval combination.
+
+    Fetches run on a bounded thread pool sharing one API key and one HTTP session, so a
+    sweep takes about as long as the slowest pair. Rows of all combinations are merged
+    into one insert (which the sink micro-batches, or sends as a single load job).
+    Errors the insert reports for particular rows are mapped back to the combinations
+    those rows came from; an error without a row index fails every combination. Only
+    combinations whose rows all went in advance their watermark, so a failed one is
+    retried on the next run without holding the others back.
+    Returns the per-pair/per-interval report; failed fetches and inserts set its "error".
+    """
+    jobs = [(pair, interval) for pair in pairs for interval in intervals]
+    known = watermarks.get_many([watermark_key(pair, interval) for pair, interval in jobs])
+    api_key = access_secret_version(project_id, "KRAKEN_PUB_KEY_READONLY")
+    session = requests.Session()
+    session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=max_workers))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        reports = list(pool.map(
+            lambda job: fetch_closed_candles(job[0], job[1], known.get(watermark_key(*job)), project_id, api_key, session),
+            jobs,
+        ))
+
+    rows, row_ids, spans = [], [], []
+    for report in reports:
+        candles = report.pop("candles")
+        if candles:
+            job_rows, job_row_ids = candles_to_rows(report["pair"], report["interval"], candles)
+            spans.append((report, candles[-1][0], len(rows), len(rows) + len(job_rows)))
+            rows.extend(job_rows)
+            row_ids.extend(job_row_ids)
+
+    errors = []
+    if rows:
+        try:
+            errors = insert(rows, project_id, row_ids=row_ids)
+        except Exception as e:
+            errors = [str(e)]
+    row_errors = [error for error in errors if isinstance(error, dict) and "index" in error]
+    run_errors = [error for error in errors if not (isinstance(error, dict) and "index" in error)]
+
+    new_watermarks = {}
+    for report, watermark, start, end in spans:
+        job_errors = run_errors + [error for error in row_errors if start <= error["index"] < end]
+        if job_errors:
+            report["error"] = f"Insert failed: {job_errors}"
+        else:
+            new_watermarks[watermark_key(report["pair"], report["interval"])] = watermark
+    for report in reports:
+        print(f"{report['pair']} {report['interval']}m: {report['rows']} rows in {report['latency_ms']} ms"
+              + (f" (error: {report['error']})" if report["error"] else ""))
+
+    # only advance combinations whose rows are in, so a failed one is simply retried
+    watermarks.set_many(new_watermarks)
+    return reports
+
+def parse_job_config(request):
+    """Reads pairs/intervals from the request JSON, then KRAKEN_PAIRS/KRAKEN_INTERVALS, then defaults."""
+    payload = (request.get_json(silent=True) if request is not None else None) or {}
+    pairs = payload.get("pairs") or [pair for pair in os.environ.get("KRAKEN_PAIRS", "").split(",") if pair] or DEFAULT_PAIRS
+    intervals = payload.get("intervals") or [int(i) for i in os.environ.get("KRAKEN_INTERVALS", "").split(",") if i] or DEFAULT_INTERVALS
+    return pairs, [int(interval) for interval in intervals], int(payload.get("max_workers", 8))
 
 # @functions_framework.http
-# def kraken_to_bigquery(request):
-def kraken_to_bigquery():
-    """HTTP Cloud Function to ingest Kraken data into BigQuery."""
+def kraken_to_bigquery(request=None, watermarks=None):
+    """HTTP Cloud Function to ingest Kraken data into BigQuery.
+
+    Accepts {"pairs": [...], "intervals": [...], "max_workers": n} as JSON. Only candles
+    closed since each pair/interval high-watermark are requested and inserted.
+    """
     # project_id = os.environ.get("GCP_PROJECT")
     project_id = 'trading-app-project-450322'
     print(f"Found project id: {project_id}")
-    pair = "XBTUSD"  # Example pair
-    interval = 60  # Example interval (minutes)
     try:
-        kraken_data = get_kraken_data(pair, interval, project_id)
-        rows = []
-        for item in kraken_data:
-            timestamp = datetime.fromtimestamp(item[0])
-            row = {
-                "timestamp": timestamp,
-                "pair": pair,
-                "open": item[1],
-                "high": item[2],
-                "low": item[3],
-                "close": item[4],
-                "volume": item[5],
-            }
-            rows.append(row)
-        insert_bigquery(rows, project_id)
-        return "Data ingestion successful", 200
+        pairs, intervals, max_workers = parse_job_config(request)
+        if watermarks is None:
+            watermarks = BigQueryWatermarkStore(bigquery.Client(project=project_id), f"{project_id}.kraken_data.ohlc_watermarks")
+        started = time.perf_counter()
+        reports = run_ingestion_job(pairs, intervals, project_id, watermarks, max_workers=max_workers)
+        summary = {
+            "rows": sum(report["rows"] for report in reports),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+            "jobs": reports,
+        }
+        status = 200 if not any(report["error"] for report in reports) else 207
+        return json.dumps(summary), status
     except Exception as e:
-        return f"Error: {e}", 500
\ No newline at end of file
+        return f"Error: {e}", 500
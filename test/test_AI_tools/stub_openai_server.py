@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def recommendations(*rows):
+    '''analyst-prompt JSON content for (symbol, price, gain, weight) rows'''
+    return json.dumps({'cryptos': [
+        {'coin_symbol': symbol, 'coin_current_price': price, 'expected_gain_percentage': gain, 'weight': weight}
+        for symbol, price, gain, weight in rows
+    ]})
+
+
+class StubOpenAIServer(ThreadingHTTPServer):
+    """
+    Local OpenAI-compatible chat completions endpoint.
+
+    `responses` maps a model name to the message content it answers with; unknown
+    models get a 404. Streamed requests receive the content as server-sent chunks of
+    `chunk_size` characters, `chunk_delay` seconds apart. Every request body is kept
+    in `requests`.
+    """
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, responses: dict, latency: float = 0.0, chunk_size: int = 7, chunk_delay: float = 0.0):
+        super().__init__(('127.0.0.1', 0), StubOpenAIHandler)
+        self.responses = responses
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1'
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        self.server_close()
+
+
+class StubOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with server.lock:
+            server.requests.append(body)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            content = server.responses.get(body['model'])
+            if content is None:
+                self._send(404, {'error': {'message': f"model {body['model']} not found", 'type': 'invalid_request_error'}})
+            elif body.get('stream'):
+                self._stream(body['model'], content)
+            else:
+                self._send(200, completion(body['model'], content))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, model, content):
+        server = self.server
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        for start in range(0, len(content), server.chunk_size):
+            delta = {'content': content[start:start + server.chunk_size]}
+            chunk = {'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': 0, 'model': model,
+                     'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]}
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode())
+            self.wfile.flush()
+            time.sleep(server.chunk_delay)
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+def completion(model, content):
+    return {
+        'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': 0, 'model': model,
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2},
+    }
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import time
+import unittest
+from ai_tools.ai_enum_classes import AICryptoAnalystPrompts
+from ai_tools.ai_instagator import AIInstagator
+from ai_tools.prompt_cache import PromptCache, market_fingerprint
+from test.test_AI_tools.stub_openai_server import StubOpenAIServer, recommendations
+
+MESSAGES = AICryptoAnalystPrompts.MESSAGES.value
+RESPONSES = {'model-a': recommendations(('XBT', 60000, 5.0, 1.0))}
+
+
+class TestPromptCache(unittest.TestCase):
+
+    def test_key_ignores_formatting_but_not_content(self):
+        cache = PromptCache(':memory:')
+        reformatted = [{'content': '  '.join(m['content'].split()), 'role': m['role']} for m in MESSAGES]
+        self.assertEqual(cache.key('m', MESSAGES), cache.key('m', reformatted))
+        self.assertNotEqual(cache.key('m', MESSAGES), cache.key('other', MESSAGES))
+        changed = MESSAGES[:1] + [{'role': 'user', 'content': 'give me 5 cryptos'}]
+        self.assertNotEqual(cache.key('m', MESSAGES), cache.key('m', changed))
+
+    def test_market_fingerprint_rounds_noise(self):
+        self.assertEqual(market_fingerprint({'XBT': 60012.3}), market_fingerprint({'XBT': 60024.9}))
+        self.assertNotEqual(market_fingerprint({'XBT': 60000}), market_fingerprint({'XBT': 61000}))
+        self.assertEqual(market_fingerprint(None), '')
+
+    def test_ttl_and_lru_eviction(self):
+        cache = PromptCache(':memory:', ttl=0.05, max_entries=2)
+        cache.set('a', '1')
+        cache.set('b', '2')
+        self.assertEqual(cache.get('a'), '1')
+        cache.set('c', '3')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), '1')
+        time.sleep(0.06)
+        self.assertIsNone(cache.get('c'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions'], stats['expired']), (2, 2, 1, 1))
+
+    def test_instagator_reuses_answers_across_runs(self):
+        with tempfile.TemporaryDirectory() as tmp, StubOpenAIServer(RESPONSES) as server:
+            path = os.path.join(tmp, 'prompts.sqlite')
+            market = {'XBT': 60000.0}
+            for _ in range(2):
+                instagator = AIInstagator('test-key', base_url=server.base_url, cache=PromptCache(path))
+                result = instagator.recommend(MESSAGES, 'model-a', market)
+                self.assertEqual(result.cryptos[0].coin_symbol, 'XBT')
+                instagator.prompt_ai(MESSAGES, 'model-a', market)
+            self.assertEqual(len(server.requests), 2)
+            instagator.recommend(MESSAGES, 'model-a', {'XBT': 65000.0})
+            self.assertEqual(len(server.requests), 3)
+            stats = instagator.cache.stats()
+            self.assertEqual((stats['hits'], stats['misses']), (2, 3))
+            instagator.cache.close()
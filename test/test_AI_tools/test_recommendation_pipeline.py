@@ -0,0 +1,50 @@
+import time
+import unittest
+from ai_tools.ai_instagator import AIInstagator
+from ai_tools.ai_schemas import RECOMMENDATION_COLUMNS
+from test.test_AI_tools.stub_openai_server import StubOpenAIServer, recommendations
+
+RESPONSES = {
+    'model-a': recommendations(('XBT', '$60,000', '5%', 0.6), ('ETH', 3000, 4.0, 0.4)),
+    'model-b': recommendations(('xbt', 62000, 3.0, 1.0), ('SOL', 150, 10.0, 3.0)),
+    'model-bad': '{"cryptos": [{"coin_symbol": "XBT"}]}',
+}
+
+
+class TestRecommendationPipeline(unittest.TestCase):
+
+    def test_recommend_parses_typed_records(self):
+        with StubOpenAIServer(RESPONSES) as server:
+            result = AIInstagator('test-key', base_url=server.base_url).recommend([], 'model-a')
+        self.assertEqual([record.coin_symbol for record in result.cryptos], ['XBT', 'ETH'])
+        self.assertEqual(result.cryptos[0].coin_current_price, 60000.0)
+        self.assertEqual(result.cryptos[0].expected_gain_percentage, 5.0)
+        self.assertEqual(server.requests[0]['response_format'], {'type': 'json_object'})
+
+    def test_ensemble_merges_weighted(self):
+        with StubOpenAIServer(RESPONSES) as server:
+            df = AIInstagator('test-key', base_url=server.base_url).recommend_ensemble(['model-a', 'model-b'])
+        self.assertEqual(list(df.columns), RECOMMENDATION_COLUMNS + ['votes'])
+        self.assertAlmostEqual(df['weight'].sum(), 1.0)
+        xbt = df.set_index('coin_symbol').loc['XBT']
+        # 0.6 from model-a and 0.25 from model-b, out of two sources
+        self.assertAlmostEqual(xbt['weight'], (0.6 + 0.25) / 2)
+        self.assertAlmostEqual(xbt['coin_current_price'], (60000 * 0.6 + 62000 * 0.25) / 0.85)
+        self.assertEqual(xbt['votes'], 2)
+        self.assertEqual(df['coin_symbol'].iloc[0], 'XBT')
+
+    def test_ensemble_runs_concurrently_and_skips_failures(self):
+        models = ['model-a', 'model-b', 'model-bad', 'missing-model']
+        with StubOpenAIServer(RESPONSES, latency=0.2) as server:
+            instagator = AIInstagator('test-key', base_url=server.base_url, max_workers=4)
+            started = time.perf_counter()
+            df = instagator.recommend_ensemble(models)
+            elapsed = time.perf_counter() - started
+        self.assertEqual(server.max_in_flight, 4)
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(set(df['coin_symbol']), {'XBT', 'ETH', 'SOL'})
+
+    def test_ensemble_with_only_failures_raises(self):
+        with StubOpenAIServer(RESPONSES) as server:
+            with self.assertRaises(ValueError):
+                AIInstagator('test-key', base_url=server.base_url).recommend_ensemble(['model-bad'])
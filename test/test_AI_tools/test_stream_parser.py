@@ -0,0 +1,73 @@
+import json
+import time
+import unittest
+from ai_tools.ai_instagator import AIInstagator
+from ai_tools.stream_parser import JSONArrayStreamParser
+from exchange_tools.asset_registry import AssetRegistry
+from exchange_tools.exchange_tool import KrakenAPIClient, TradeExecutor
+from test.test_AI_tools.stub_openai_server import StubOpenAIServer, recommendations
+
+DOCUMENT = json.dumps({
+    'note': 'cryptos [ { "tricky" } ]',
+    'cryptos': [
+        {'coin_symbol': 'XBT', 'coin_current_price': 60000, 'expected_gain_percentage': 5, 'weight': 0.5,
+         'reason': 'breakout {above} "resistance" \\ ]'},
+        {'coin_symbol': 'ETH', 'coin_current_price': 3000, 'expected_gain_percentage': 4, 'weight': 0.3,
+         'levels': [{'support': [2900, 2800]}]},
+        {'coin_symbol': 'SOL', 'coin_current_price': 150, 'expected_gain_percentage': 9, 'weight': 0.2},
+    ],
+    'other': [{'coin_symbol': 'IGNORED'}],
+}, indent=2)
+
+
+class TestJSONArrayStreamParser(unittest.TestCase):
+
+    def test_character_by_character(self):
+        parser = JSONArrayStreamParser()
+        items = []
+        for char in DOCUMENT:
+            items.extend(parser.feed(char))
+        self.assertEqual(items, json.loads(DOCUMENT)['cryptos'])
+
+    def test_items_are_emitted_as_soon_as_complete(self):
+        parser = JSONArrayStreamParser()
+        first_end = DOCUMENT.index('"levels"')
+        self.assertEqual([item['coin_symbol'] for item in parser.feed(DOCUMENT[:first_end])], ['XBT'])
+        self.assertEqual([item['coin_symbol'] for item in parser.feed(DOCUMENT[first_end:])], ['ETH', 'SOL'])
+
+    def test_buffer_holds_only_the_open_item(self):
+        parser = JSONArrayStreamParser()
+        parser.feed(DOCUMENT[:DOCUMENT.index('"SOL"')])
+        self.assertLess(len(parser._buffer), 40)
+
+
+class TickerAPI:
+    def query_public(self, method, data=None):
+        return {'error': [], 'result': {data['pair']: {'a': ['101.0', '1', '1'], 'b': ['100.0', '1', '1'],
+                                                       'c': ['100.5', '1']}}}
+
+
+class TestStreamingRecommendations(unittest.TestCase):
+
+    def test_first_record_arrives_before_stream_ends(self):
+        content = recommendations(*[(f'C{i}', 1.0, 1.0, 0.1) for i in range(10)])
+        with StubOpenAIServer({'model-a': content}, chunk_size=20, chunk_delay=0.01) as server:
+            instagator = AIInstagator('test-key', base_url=server.base_url)
+            started = time.perf_counter()
+            arrivals = [(record.coin_symbol, time.perf_counter() - started)
+                        for record in instagator.stream_recommendations([], 'model-a')]
+            total = time.perf_counter() - started
+        self.assertEqual([symbol for symbol, _ in arrivals], [f'C{i}' for i in range(10)])
+        self.assertLess(arrivals[0][1], total / 2)
+        self.assertTrue(server.requests[0]['stream'])
+
+    def test_quotes_overlap_with_generation(self):
+        content = recommendations(('XBT', 60000, 5, 0.5), ('NOPE', 1, 1, 0.5))
+        registry = AssetRegistry.from_assets({'XXBT': {'altname': 'XBT'}, 'ZUSD': {'altname': 'USD'}})
+        executor = TradeExecutor(KrakenAPIClient(TickerAPI()), registry)
+        with StubOpenAIServer({'model-a': content}) as server:
+            quoted = AIInstagator('test-key', base_url=server.base_url).quote_streamed_recommendations(
+                [], 'model-a', executor)
+        self.assertEqual(quoted[0][1], 'XXBTZUSD')
+        self.assertEqual(quoted[0][2].ask, 101.0)
+        self.assertEqual(quoted[1][1:], (None, None))
@@ -0,0 +1,53 @@
+import json
+import os
+import tempfile
+import unittest
+from benchmarks import hot_paths  # noqa: F401  registers the benchmarks
+from benchmarks.__main__ import main
+from benchmarks.harness import compare, load_results, measure, registered, run_benchmarks, save_results
+
+
+class TestHarness(unittest.TestCase):
+
+    def test_measure_tracks_time_and_memory(self):
+        result = measure(lambda size: [str(i) for i in range(size)], 10_000, repeat=2)
+        self.assertGreater(result['wall_time'], 0)
+        self.assertGreater(result['peak_bytes'], 10_000 * 40)
+        self.assertGreaterEqual(result['allocated_blocks'], 10_000)
+
+    def test_compare_flags_growth_beyond_tolerance(self):
+        baseline = {'a[1000]': {'wall_time': 0.1, 'peak_bytes': 1e6, 'allocated_blocks': 1000},
+                    'b[1000]': {'wall_time': 1e-5, 'peak_bytes': 100, 'allocated_blocks': 1}}
+        results = {'a[1000]': {'wall_time': 0.2, 'peak_bytes': 1.1e6, 'allocated_blocks': 1000},
+                   'b[1000]': {'wall_time': 5e-4, 'peak_bytes': 900, 'allocated_blocks': 50},
+                   'c[1000]': {'wall_time': 9.0, 'peak_bytes': 9e9, 'allocated_blocks': 9}}
+        regressions = compare(results, baseline, tolerance=0.25)
+        self.assertEqual([(r.key, r.metric) for r in regressions], [('a[1000]', 'wall_time')])
+        self.assertAlmostEqual(regressions[0].ratio, 2.0)
+
+    def test_every_benchmark_runs_on_small_fixtures(self):
+        results = run_benchmarks(sizes=(1_000,), repeat=1)
+        self.assertEqual(set(results), {f'{name}[1000]' for name in registered()})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'results.json')
+            save_results(path, results)
+            self.assertEqual(load_results(path), json.loads(json.dumps(results)))
+            self.assertEqual(compare(load_results(path), results), [])
+
+    def test_cli_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            name = 'main_script.trades_to_dataframe'
+            missing = os.path.join(tmp, 'missing.json')
+            self.assertEqual(main([name, '--sizes', '1000', '--repeat', '1', '--save', path, '--baseline', missing]), 0)
+            with open(path) as f:
+                baseline = json.load(f)
+            baseline['results'][f'{name}[1000]']['peak_bytes'] = 1
+            with open(path, 'w') as f:
+                json.dump(baseline, f)
+            self.assertEqual(main([name, '--sizes', '1000', '--repeat', '1', '--baseline', path]), 1)
+
+    def test_stored_baseline_covers_default_sizes(self):
+        baseline = load_results(os.path.join(os.path.dirname(hot_paths.__file__), 'baseline.json'))
+        self.assertIn('main_script.trades_to_dataframe[100000]', baseline)
+        self.assertIn('asset_pair.registry[1000]', baseline)
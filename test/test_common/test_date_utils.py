@@ -0,0 +1,70 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+import numpy as np
+import pandas as pd
+from dateutil import tz
+from common import date_utils
+
+# spans a US daylight-saving change so the local-time paths cross an offset boundary
+TIMESTAMPS = np.arange(1710000000, 1710000000 + 7 * 86400, 3607)
+
+
+class TestDateUtilsArrays(unittest.TestCase):
+
+    def test_unix_to_str_matches_scalar(self):
+        strings = date_utils.unix_to_datetime_str_array(TIMESTAMPS)
+        expected = [datetime.fromtimestamp(int(ts)).strftime(date_utils.DEFAULT_FORMAT) for ts in TIMESTAMPS]
+        self.assertEqual(list(strings), expected)
+
+    def test_custom_format(self):
+        strings = date_utils.unix_to_datetime_str_array(TIMESTAMPS[:3], '%d/%m/%Y %H:%M')
+        expected = [datetime.fromtimestamp(int(ts)).strftime('%d/%m/%Y %H:%M') for ts in TIMESTAMPS[:3]]
+        self.assertEqual(list(strings), expected)
+
+    def test_round_trip(self):
+        strings = date_utils.unix_to_datetime_str_array(TIMESTAMPS)
+        np.testing.assert_array_equal(date_utils.datetime_str_to_unix_array(strings), TIMESTAMPS)
+
+    def test_series_keeps_index(self):
+        series = pd.Series(TIMESTAMPS[:3], index=['a', 'b', 'c'], name='time')
+        central = date_utils.utc_to_central_array(series)
+        self.assertEqual(list(central.index), ['a', 'b', 'c'])
+        self.assertEqual(central.iloc[0], date_utils.utc_to_central(int(TIMESTAMPS[0])))
+
+    def test_invalid_input_raises(self):
+        with self.assertRaises(ValueError):
+            date_utils.datetime_str_to_unix_array(['not a date'])
+        with self.assertRaises(ValueError):
+            date_utils.unix_to_datetime_str_array([1700000000, np.nan])
+        # NumPy's ISO parser would accept these, strptime does not
+        for text in ('2024-01-01', '2024-01-01T00:00:00', '2024-01-01 00:00'):
+            with self.assertRaises(ValueError):
+                date_utils.datetime_str_to_unix_array(['2024-01-01 00:00:00', text])
+
+    @mock.patch.object(date_utils, 'LOCAL_TZ', tz.gettz('America/Chicago'))
+    def test_dst_transitions_match_datetime_timestamp(self):
+        # 02:30 on 2024-03-10 is skipped and read as CST; 01:30 on 2024-11-03 repeats and resolves to CDT
+        unix = date_utils.datetime_str_to_unix_array(['2024-03-10 02:30:00', '2024-11-03 01:30:00',
+                                                      '2024-06-01 12:00:00'])
+        self.assertEqual(list(unix), [1710059400, 1730615400, 1717261200])
+
+
+class TestDateUtilsScalars(unittest.TestCase):
+
+    def test_scalar_wrappers(self):
+        text = date_utils.unix_to_datetime_str(1700000000)
+        self.assertEqual(text, datetime.fromtimestamp(1700000000).strftime(date_utils.DEFAULT_FORMAT))
+        self.assertEqual(date_utils.datetime_str_to_unix(text), 1700000000)
+
+    def test_scalar_errors_are_strings(self):
+        self.assertTrue(date_utils.unix_to_datetime_str('x').startswith('Error'))
+        self.assertTrue(date_utils.unix_to_datetime_str(None).startswith('Error'))
+        self.assertTrue(date_utils.unix_to_datetime_str(float('nan')).startswith('Error'))
+        self.assertTrue(date_utils.datetime_str_to_unix('bad').startswith('Error'))
+        self.assertTrue(date_utils.datetime_str_to_unix('2024-01-01').startswith('Error'))
+
+    def test_scalars_match_arrays(self):
+        strings = date_utils.unix_to_datetime_str_array(TIMESTAMPS)
+        self.assertEqual([date_utils.unix_to_datetime_str(int(ts)) for ts in TIMESTAMPS], list(strings))
+        self.assertEqual([date_utils.datetime_str_to_unix(text) for text in strings], list(TIMESTAMPS))
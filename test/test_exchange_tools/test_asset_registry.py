@@ -0,0 +1,60 @@
+import unittest
+from exchange_tools.asset_registry import AssetRegistry
+from exchange_tools.exchange_tool import AssetPair
+
+ASSETS = {
+    'XXBT': {'altname': 'XBT'},
+    'ZUSD': {'altname': 'USD'},
+    'XXRP': {'altname': 'XRP'},
+}
+
+ASSET_PAIRS = {
+    'XXBTZUSD': {'altname': 'XBTUSD', 'wsname': 'XBT/USD', 'base': 'XXBT', 'quote': 'ZUSD'},
+    'XXBTZUSD.d': {'altname': 'XBTUSD.d', 'base': 'XXBT', 'quote': 'ZUSD'},
+    'XXRPXXBT': {'altname': 'XRPXBT', 'wsname': 'XRP/XBT', 'base': 'XXRP', 'quote': 'XXBT'},
+}
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def fetch_assets(self):
+        self.calls += 1
+        return ASSETS
+
+    def fetch_asset_pairs(self):
+        return ASSET_PAIRS
+
+
+class TestAssetRegistry(unittest.TestCase):
+
+    def test_lookups(self):
+        registry = AssetRegistry.from_assets(ASSETS, ASSET_PAIRS)
+        self.assertEqual(registry.get_asset_id('xbt'), 'XXBT')
+        self.assertIsNone(registry.get_asset_id('DOGE'))
+        self.assertEqual(registry.get_pair('XBT', 'USD'), 'XXBTZUSD')
+        self.assertEqual(registry.get_pair('XXRP', 'XXBT'), 'XXRPXXBT')
+        self.assertEqual(registry.get_pair_by_wsname('XRP/XBT'), 'XXRPXXBT')
+        self.assertEqual(registry.get_pair_by_altname('XBTUSD'), 'XXBTZUSD')
+
+    def test_loads_once_within_ttl(self):
+        client = CountingClient()
+        registry = AssetRegistry(client, ttl=60)
+        for _ in range(100):
+            registry.get_asset_id('XBT')
+        self.assertEqual(client.calls, 1)
+
+    def test_refreshes_after_ttl(self):
+        client = CountingClient()
+        registry = AssetRegistry(client, ttl=0)
+        registry.get_asset_id('XBT')
+        registry.get_asset_id('XBT')
+        self.assertEqual(client.calls, 2)
+
+    def test_asset_pair_accepts_registry(self):
+        registry = AssetRegistry.from_assets(ASSETS)
+        self.assertEqual(AssetPair('xbt', 'usd', registry).get_pair_symbol(), 'XXBTZUSD')
+        self.assertEqual(AssetPair('XBT', 'USD', ASSETS).get_pair_symbol(), 'XXBTZUSD')
+        with self.assertRaises(ValueError):
+            AssetPair('DOGE', 'USD', registry).get_pair_symbol()
@@ -0,0 +1,138 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import krakenex
+from exchange_tools.async_exchange_tool import AsyncKrakenAPIClient
+from exchange_tools.exchange_tool import KrakenAPIClient
+
+STUB_LATENCY = 0.05
+
+
+class StubKrakenServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def reset_concurrency(self):
+        with self.lock:
+            self.max_in_flight = 0
+
+
+class StubKrakenHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self._reply(parse_qs(urlparse(self.path).query))
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0))).decode()
+        self._reply(parse_qs(body))
+
+    def _reply(self, params):
+        server = self.server
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(STUB_LATENCY)
+        with server.lock:
+            server.in_flight -= 1
+        method = urlparse(self.path).path.rsplit('/', 1)[-1]
+        if method == 'Ticker':
+            pair = params['pair'][0]
+            result = {pair: {'a': ['100.0', '1', '1.000'], 'b': ['99.0', '1', '1.000'], 'c': ['99.5', '0.1']}}
+        elif method == 'OHLC':
+            # echo the raw query so empty parameters (which parse_qs drops) stay visible
+            result = {'query': urlparse(self.path).query}
+        elif method == 'Balance':
+            result = {'ZUSD': '100.0'} if 'nonce' in params and self.headers.get('API-Sign') else None
+        else:
+            result = {}
+        payload = json.dumps({'error': [] if result is not None else ['EAPI:Invalid key'], 'result': result}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAsyncKrakenAPIClient(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = StubKrakenServer(('127.0.0.1', 0), StubKrakenHandler)
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.pairs = [f'PAIR{i}USD' for i in range(20)]
+
+    async def _poll(self, pairs, max_concurrency):
+        async with AsyncKrakenAPIClient(base_url=self.base_url, max_concurrency=max_concurrency) as client:
+            return await asyncio.gather(*(client.fetch_ticker(pair) for pair in pairs))
+
+    def test_fetch_ticker(self):
+        tickers = asyncio.run(self._poll(self.pairs[:1], 1))
+        self.assertEqual(tickers[0]['a'][0], '100.0')
+
+    def test_get_balance_is_signed(self):
+        async def balance():
+            async with AsyncKrakenAPIClient('key', 'c2VjcmV0', base_url=self.base_url) as client:
+                return await client.get_balance()
+        self.assertEqual(asyncio.run(balance()), {'ZUSD': '100.0'})
+
+    def test_get_ohlc_omits_unset_parameters(self):
+        async def ohlc(**kwargs):
+            async with AsyncKrakenAPIClient(base_url=self.base_url) as client:
+                return await client.get_ohlc('XXBTZUSD', 60, **kwargs)
+        self.assertEqual(asyncio.run(ohlc())['query'], 'pair=XXBTZUSD&interval=60')
+        self.assertEqual(asyncio.run(ohlc(since=1700000000))['query'], 'pair=XXBTZUSD&interval=60&since=1700000000')
+
+    def test_concurrent_fan_out_beats_serial_client(self):
+        api = krakenex.API()
+        api.uri = self.base_url
+        sync_client = KrakenAPIClient(api)
+        self.server.reset_concurrency()
+        start = time.perf_counter()
+        for pair in self.pairs:
+            sync_client.fetch_ticker(pair)
+        serial_elapsed = time.perf_counter() - start
+        self.assertEqual(self.server.max_in_flight, 1)
+
+        self.server.reset_concurrency()
+        start = time.perf_counter()
+        tickers = asyncio.run(self._poll(self.pairs, 20))
+        async_elapsed = time.perf_counter() - start
+
+        self.assertEqual(len(tickers), len(self.pairs))
+        # the stub sleeps per request, so requests only overlap if the client really fans out
+        self.assertGreaterEqual(self.server.max_in_flight, len(self.pairs) // 2)
+        self.assertLess(async_elapsed * 3, serial_elapsed)
+
+    def test_concurrency_limit(self):
+        self.server.reset_concurrency()
+        start = time.perf_counter()
+        asyncio.run(self._poll(self.pairs[:4], 1))
+        self.assertGreaterEqual(time.perf_counter() - start, 4 * STUB_LATENCY)
+        self.assertEqual(self.server.max_in_flight, 1)
+
+        self.server.reset_concurrency()
+        asyncio.run(self._poll(self.pairs[:8], 3))
+        self.assertEqual(self.server.max_in_flight, 3)
@@ -0,0 +1,128 @@
+import time
+import unittest
+import numpy as np
+from common.exceptions import KrakenAPIError
+from exchange_tools.backtest import Backtest, EMACrossStrategy, Strategy, run_grid
+from exchange_tools.exchange_tool import KrakenAPIClient, TradeExecutor
+from exchange_tools.simulated_exchange import SimulatedKrakenAPI, kraken_asset_id, kraken_pair_id
+from exchange_tools.trade_frames import ohlc_to_dataframe
+
+
+def synthetic_ohlc(count, start=100.0, seed=0, drift=0.0):
+    '''hourly random-walk candles in Kraken OHLC row format'''
+    rng = np.random.default_rng(seed)
+    close = start * np.exp(np.cumsum(rng.normal(drift, 0.01, count)))
+    open_ = np.r_[start, close[:-1]]
+    high = np.maximum(open_, close) * 1.002
+    low = np.minimum(open_, close) * 0.998
+    volume = rng.uniform(50, 150, count)
+    rows = [[1_700_000_000 + 3600 * i, o, h, l, c, (h + l + c) / 3, v, 10]
+            for i, (o, h, l, c, v) in enumerate(zip(open_, high, low, close, volume))]
+    return ohlc_to_dataframe(rows)
+
+
+class BuyOnce(Strategy):
+    def on_bar(self, context):
+        if context.index == 0:
+            context.executor.execute_basket([('XBT', 900)])
+
+
+class TestSimulatedExchange(unittest.TestCase):
+
+    def setUp(self):
+        self.exchange = SimulatedKrakenAPI(['XBT/USD'], {'USD': 1000}, spread_bps=0, slippage_bps=0, impact=0)
+        self.client = KrakenAPIClient(self.exchange)
+        self.exchange.advance(0, {'XBT/USD': (100, 101, 99, 100, 100, 1000, 5)})
+
+    def test_asset_ids_and_payloads(self):
+        self.assertEqual((kraken_asset_id('xbt'), kraken_asset_id('USD'), kraken_asset_id('SOL')),
+                         ('XXBT', 'ZUSD', 'SOL'))
+        self.assertEqual((kraken_pair_id('XBT', 'USD'), kraken_pair_id('SOL', 'usd'), kraken_pair_id('XDG', 'USD'),
+                          kraken_pair_id('ETH', 'XBT')), ('XXBTZUSD', 'SOLUSD', 'XDGUSD', 'XETHXXBT'))
+        self.assertEqual(self.client.fetch_asset_pairs()['XXBTZUSD']['wsname'], 'XBT/USD')
+        self.assertEqual(self.client.fetch_ticker('XXBTZUSD')['c'][0], '100.00000')
+        book = self.client.fetch_order_book('XXBTZUSD', 5)
+        self.assertEqual(book.asks.shape, (5, 2))
+        self.assertEqual(book.best_bid, book.best_ask)
+
+    def test_market_order_fills_at_next_open_with_fee(self):
+        txid = self.client.place_order('XXBTZUSD', 'buy', 2)['txid'][0]
+        self.assertEqual(self.client.query_orders([txid])[txid]['status'], 'open')
+        self.exchange.advance(60, {'XBT/USD': (110, 111, 109, 110, 110, 1000, 5)})
+        order = self.client.query_orders([txid])[txid]
+        self.assertEqual((order['status'], order['price']), ('closed', '110.00000'))
+        self.assertAlmostEqual(self.exchange.balances['ZUSD'], 1000 - 220 * 1.004)
+        self.assertAlmostEqual(self.exchange.balances['XXBT'], 2)
+
+    def test_limit_order_waits_for_price(self):
+        txid = self.client._query_private('AddOrder', {'pair': 'XBTUSD', 'type': 'buy', 'ordertype': 'limit',
+                                                       'price': 95, 'volume': 1})['result']['txid'][0]
+        self.exchange.advance(60, {'XBT/USD': (100, 101, 96, 100, 100, 1000, 5)})
+        self.assertIn(txid, self.client.fetch_open_orders())
+        self.exchange.advance(120, {'XBT/USD': (97, 98, 94, 95, 95, 1000, 5)})
+        self.assertEqual(self.exchange.fills[0]['price'], 95)
+        self.assertAlmostEqual(self.exchange.fills[0]['fee'], 95 * 0.0025)
+
+    def test_batch_cancel(self):
+        txids = [self.client._query_private('AddOrder', {'pair': 'XBTUSD', 'type': 'buy', 'ordertype': 'limit',
+                                                         'price': 90, 'volume': 1})['result']['txid'][0]
+                 for _ in range(3)]
+        self.assertEqual(self.client.cancel_orders(txids[:2]), {'count': 2})
+        self.assertEqual(list(self.client.fetch_open_orders()), txids[2:])
+        with self.assertRaises(KrakenAPIError):
+            self.client.cancel_orders(txids[1:])
+        self.assertIn(txids[2], self.client.fetch_open_orders())
+
+    def test_errors_and_slippage(self):
+        with self.assertRaises(KrakenAPIError):
+            self.client.place_order('XXBTZUSD', 'buy', 100)
+        with self.assertRaises(KrakenAPIError):
+            self.client.cancel_order('missing')
+        exchange = SimulatedKrakenAPI(['XBT/USD'], {'USD': 1000}, spread_bps=2, slippage_bps=1, impact=0.1)
+        exchange.advance(0, {'XBT/USD': (100, 101, 99, 100, 100, 100, 5)})
+        KrakenAPIClient(exchange).place_order('XXBTZUSD', 'buy', 1)
+        exchange.advance(60, {'XBT/USD': (100, 101, 99, 100, 100, 100, 5)})
+        # half spread + fixed slippage + 1% participation * 0.1 impact
+        self.assertAlmostEqual(exchange.fills[0]['slippage_bps'], 1 + 1 + 10)
+
+    def test_executor_runs_against_simulator(self):
+        fills = TradeExecutor(self.client).execute_basket([('XBT', 500)])
+        self.assertIsNone(fills[0].error)
+        self.assertIn(fills[0].result['txid'][0], self.client.fetch_open_orders())
+
+
+class TestBacktest(unittest.TestCase):
+
+    def setUp(self):
+        self.data = {'XBT/USD': synthetic_ohlc(300, 30_000, seed=1, drift=0.001),
+                     'ETH/USD': synthetic_ohlc(300, 2_000, seed=2)}
+
+    def test_buy_and_hold_equity_follows_price(self):
+        result = Backtest({'XBT/USD': self.data['XBT/USD']}, initial_cash=1000).run(BuyOnce())
+        self.assertEqual(len(result.fills), 1)
+        fill = result.fills.iloc[0]
+        closes = self.data['XBT/USD']['close'].to_numpy()
+        self.assertAlmostEqual(result.equity.iloc[-1], 1000 - fill['cost'] - fill['fee'] + fill['volume'] * closes[-1],
+                               places=4)
+        self.assertAlmostEqual(result.metrics['total_return'], result.equity.iloc[-1] / 1000 - 1)
+        self.assertLessEqual(result.metrics['max_drawdown'], 0)
+
+    def test_ema_cross_trades_every_pair(self):
+        data = dict(self.data, **{'SOL/USD': synthetic_ohlc(300, 150, seed=3)})
+        result = Backtest(data).run(EMACrossStrategy(5, 20))
+        self.assertGreater(result.metrics['fills'], 4)
+        self.assertEqual(set(result.fills['side']), {'buy', 'sell'})
+        # newer pairs are keyed by altname on Kraken, not by concatenated asset ids
+        self.assertEqual(set(result.fills['pair']), {'XXBTZUSD', 'XETHZUSD', 'SOLUSD'})
+        self.assertGreater(result.metrics['fees'], 0)
+
+    def test_grid_in_process_pool_matches_inline(self):
+        grid = {'fast': [3, 5, 8], 'slow': [20, 30]}
+        started = time.perf_counter()
+        pooled = run_grid(self.data, EMACrossStrategy, grid, max_workers=2)
+        self.assertLess(time.perf_counter() - started, 30)
+        inline = run_grid(self.data, EMACrossStrategy, grid, max_workers=1)
+        self.assertEqual(len(pooled), 6)
+        self.assertEqual(list(pooled[['fast', 'slow']].itertuples(index=False, name=None)),
+                         [(3, 20), (3, 30), (5, 20), (5, 30), (8, 20), (8, 30)])
+        np.testing.assert_allclose(pooled['total_return'], inline['total_return'])
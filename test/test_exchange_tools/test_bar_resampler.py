@@ -0,0 +1,91 @@
+import unittest
+import numpy as np
+import pandas as pd
+from exchange_tools.bar_resampler import BarResampler, DollarBars, TimeBars, VolumeBars
+from exchange_tools.exchange_tool import KrakenAPIClient
+from exchange_tools.kraken_simulator import KrakenSimulator
+from exchange_tools.trade_frames import trades_to_dataframe
+
+
+def random_trades(count=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    times = 1_700_000_000 + np.cumsum(rng.exponential(0.5, count))
+    prices = 100 + np.cumsum(rng.normal(0, 0.05, count))
+    volumes = rng.exponential(0.4, count)
+    return [[f'{p:.5f}', f'{v:.8f}', float(f'{t:.4f}'), 'b', 'm', '', i] for i, (p, v, t) in
+            enumerate(zip(prices, volumes, times))]
+
+
+def split(trades, seed=5):
+    cuts = np.sort(np.random.default_rng(seed).choice(len(trades), 30, replace=False))
+    return [trades[a:b] for a, b in zip(np.r_[0, cuts], np.r_[cuts, len(trades)])]
+
+
+def threshold_bars_reference(df, amounts, threshold):
+    '''trade-by-trade threshold bars: the trade reaching the threshold closes the bar, overshoot carries over'''
+    bars, current, filled = [], [], 0.0
+    for row, amount in zip(df.itertuples(), amounts):
+        current.append(row)
+        filled += amount
+        if filled >= threshold:
+            bars.append(current)
+            current = []
+            filled -= np.floor(filled / threshold) * threshold
+    if current:
+        bars.append(current)
+    return [(bar[0].price, max(r.price for r in bar), min(r.price for r in bar), bar[-1].price,
+             sum(r.volume for r in bar), len(bar)) for bar in bars]
+
+
+class TestBarResampler(unittest.TestCase):
+
+    def setUp(self):
+        self.trades = random_trades()
+        self.df = trades_to_dataframe([self.trades])
+
+    def test_time_bars_match_pandas_resample(self):
+        bars = BarResampler({'10s': TimeBars(10)}).resample(split(self.trades))['10s']
+        expected = self.df.set_index('time').resample('10s').agg(
+            {'price': ['first', 'max', 'min', 'last', 'count'], 'volume': 'sum'}).dropna()
+        self.assertEqual(len(bars), len(expected))
+        np.testing.assert_array_equal(bars['time'].to_numpy(), expected.index.to_numpy())
+        np.testing.assert_allclose(bars[['open', 'high', 'low', 'close']].to_numpy(),
+                                   expected['price'][['first', 'max', 'min', 'last']].to_numpy())
+        np.testing.assert_allclose(bars['volume'].to_numpy(), expected['volume']['sum'].to_numpy())
+        np.testing.assert_array_equal(bars['count'].to_numpy(), expected['price']['count'].to_numpy())
+
+    def test_threshold_bars_match_reference(self):
+        resampler = BarResampler({'volume': VolumeBars(5.0), 'dollar': DollarBars(20_000.0)})
+        bars = resampler.resample(split(self.trades))
+        cases = (('volume', self.df['volume'].to_numpy(), 5.0),
+                 ('dollar', (self.df['price'] * self.df['volume']).to_numpy(), 20_000.0))
+        for name, amounts, threshold in cases:
+            expected = np.array(threshold_bars_reference(self.df, amounts, threshold))
+            got = bars[name][['open', 'high', 'low', 'close', 'volume', 'count']].to_numpy()
+            np.testing.assert_allclose(got, expected, err_msg=name)
+
+    def test_incremental_appends_equal_one_pass(self):
+        builders = lambda: {'10s': TimeBars(10), 'volume': VolumeBars(5.0), 'dollar': DollarBars(20_000.0)}
+        whole = BarResampler(builders()).resample([self.trades])
+        pieces = BarResampler(builders()).resample(split(self.trades))
+        for name in whole:
+            pd.testing.assert_frame_equal(whole[name], pieces[name], check_exact=False, obj=name)
+
+    def test_only_partial_bar_is_kept(self):
+        resampler = BarResampler({'10s': TimeBars(10)})
+        completed = resampler.append(self.trades[:100])['10s']
+        partial = resampler.builders['10s'].partial
+        self.assertEqual(len(partial['open']), 1)
+        self.assertEqual(completed['count'].sum() + partial['count'][0], 100)
+        # the DataFrame and raw-row inputs give the same bars
+        same = BarResampler({'10s': TimeBars(10)}).append(self.df.iloc[:100])['10s']
+        pd.testing.assert_frame_equal(completed, same)
+
+    def test_trade_history_pages(self):
+        simulator = KrakenSimulator(trades_per_candle=10).generate(candles=60, end=1_700_000_000)
+        client = KrakenAPIClient(simulator)
+        start = simulator.candles['XXBTZUSD'][0][0]
+        pages = (trades for _, trades, _ in client.iter_trade_history('XXBTZUSD', start, count=97))
+        bars = BarResampler({'1m': TimeBars(60)}).resample(pages)['1m']
+        self.assertEqual(len(bars), 60)
+        self.assertEqual(bars['count'].sum(), 600)
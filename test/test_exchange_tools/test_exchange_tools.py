@@ -1,8 +1,26 @@
+import os
 import unittest
+from unittest import mock
+from exchange_tools import kraken_tools
 from exchange_tools.exchange_tool import KrakenAPIClient, AssetPair, TradeExecutor
 import pandas as pd
+from exchange_tools.kraken_simulator import KrakenSimulator, KrakenSimulatorServer
 from exchange_tools.kraken_tools import get_kraken_api, get_trading_pair_symbol
 class TestExchangeTools(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # runs against a local simulator instead of api.kraken.com and Secret Manager
+        cls.server = KrakenSimulatorServer(KrakenSimulator().generate(), check_nonce=False).__enter__()
+        cls.environ = mock.patch.dict(os.environ, cls.server.environ())
+        cls.environ.start()
+        kraken_tools._public_asset_registry = None
+
+    @classmethod
+    def tearDownClass(cls):
+        kraken_tools._public_asset_registry = None
+        cls.environ.stop()
+        cls.server.__exit__(None, None, None)
     
     def setUp(self):
         self.kraken_api = KrakenAPIClient(get_kraken_api())
@@ -56,8 +74,8 @@ class TestExchangeTools(unittest.TestCase):
         assets = self.kraken_api.fetch_assets()
         asset_pair = AssetPair('XBT', 'USD', assets)
         pair_symbol = asset_pair.get_pair_symbol()
-        ticker = self.kraken_api.get_ohlc(pair_symbol)
-        ticket_df = pd.json_normalize(ticker)
-        print(ticket_df)
-        self.assertIn('a', ticker)
+        ohlc = self.kraken_api.get_ohlc(pair_symbol, 1)
+        ohlc_df = pd.DataFrame(ohlc[pair_symbol])
+        print(ohlc_df)
+        self.assertIn(pair_symbol, ohlc)
     
\ No newline at end of file
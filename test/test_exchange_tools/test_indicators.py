@@ -0,0 +1,78 @@
+import unittest
+import numpy as np
+import pandas as pd
+from exchange_tools import indicators
+from exchange_tools.indicators import IndicatorEngine
+
+
+def random_ohlc(pairs=3, candles=200, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (pairs, candles)), axis=1))
+    high = close * (1 + rng.uniform(0, 0.01, close.shape))
+    low = close * (1 - rng.uniform(0, 0.01, close.shape))
+    volume = rng.uniform(1, 10, close.shape)
+    return high, low, close, volume
+
+
+class TestIndicators(unittest.TestCase):
+
+    def test_ema_matches_recursion(self):
+        close = np.array([[1.0, 2.0, 3.0, 4.0]])
+        alpha = 2 / 4
+        expected = [1.0]
+        for value in close[0, 1:]:
+            expected.append(expected[-1] + alpha * (value - expected[-1]))
+        np.testing.assert_allclose(indicators.ema(close, 3)[0], expected)
+
+    def test_rsi_bounds(self):
+        rising = np.arange(1.0, 31.0)[None, :]
+        flat = np.ones((1, 30))
+        values = indicators.rsi(np.vstack([rising, flat, rising[:, ::-1]]), 14)
+        self.assertTrue(np.isnan(values[:, 0]).all())
+        np.testing.assert_allclose(values[:, -1], [100.0, 50.0, 0.0])
+
+    def test_vwap_and_volatility(self):
+        high, low, close, volume = random_ohlc(pairs=2, candles=50)
+        typical = (high + low + close) / 3
+        np.testing.assert_allclose(indicators.vwap(high, low, close, volume)[:, -1],
+                                   (typical * volume).sum(axis=1) / volume.sum(axis=1))
+        np.testing.assert_allclose(indicators.vwap(high, low, close, volume, window=5)[:, -1],
+                                   (typical * volume)[:, -5:].sum(axis=1) / volume[:, -5:].sum(axis=1))
+        returns = np.diff(np.log(close), axis=1)
+        np.testing.assert_allclose(indicators.rolling_volatility(close, 20)[:, -1], returns[:, -20:].std(axis=1, ddof=1))
+
+    def test_incremental_updates_match_batch(self):
+        high, low, close, volume = random_ohlc()
+        for vwap_window in (None, 10):
+            engine = IndicatorEngine(['A', 'B', 'C'], vwap_window=vwap_window)
+            engine.warm_up(high[:, :150], low[:, :150], close[:, :150], volume[:, :150])
+            for column in range(150, 200):
+                latest = engine.update(high[:, column], low[:, column], close[:, column], volume[:, column])
+            batch = IndicatorEngine(['A', 'B', 'C'], vwap_window=vwap_window).warm_up(high, low, close, volume)
+            for name, values in latest.items():
+                np.testing.assert_allclose(values, batch[name][:, -1], rtol=1e-9, err_msg=name)
+
+    def test_engine_starts_from_single_candle(self):
+        high, low, close, volume = random_ohlc(pairs=2, candles=30)
+        engine = IndicatorEngine(['A', 'B'], volatility_window=5)
+        for column in range(30):
+            engine.update(high[:, column], low[:, column], close[:, column], volume[:, column])
+        batch = IndicatorEngine(['A', 'B'], volatility_window=5).warm_up(high, low, close, volume)
+        snapshot = engine.snapshot()
+        self.assertEqual(list(snapshot.index), ['A', 'B'])
+        for name in snapshot.columns:
+            np.testing.assert_allclose(snapshot[name].to_numpy(), batch[name][:, -1], rtol=1e-9, err_msg=name)
+
+    def test_stack_ohlc_aligns_pairs(self):
+        times = pd.to_datetime([0, 60, 120], unit='s')
+        frames = {
+            'A': pd.DataFrame({'time': times, 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': [1.0, 1.5, 2.0],
+                               'volume': 1.0}),
+            'B': pd.DataFrame({'time': times[[0, 2]], 'open': 5.0, 'high': 6.0, 'low': 4.0, 'close': [5.0, 5.5],
+                               'volume': 2.0}),
+        }
+        pairs, index, arrays = indicators.stack_ohlc(frames)
+        self.assertEqual(pairs, ['A', 'B'])
+        self.assertEqual(len(index), 3)
+        np.testing.assert_array_equal(arrays['close'][1], [5.0, 5.0, 5.5])
+        np.testing.assert_array_equal(arrays['volume'][1], [2.0, 0.0, 2.0])
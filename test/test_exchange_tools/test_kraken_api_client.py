@@ -0,0 +1,333 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+import requests
+from common.checkpoint_store import CheckpointStore
+from common.exceptions import (
+    KrakenAPIConnectionError,
+    KrakenAPIInternalServerError,
+    KrakenAPIInvalidInputError,
+    KrakenAPIUnkownPairError,
+)
+from exchange_tools import exchange_tool
+from exchange_tools.asset_registry import AssetRegistry
+from exchange_tools.exchange_tool import KrakenAPIClient, TickerQuote, TradeExecutor
+from exchange_tools.kraken_errors import RetryPolicy
+from exchange_tools.market_feed import KrakenMarketFeed
+from exchange_tools.order_tracker import OrderTracker
+from exchange_tools.replay_server import KrakenReplayServer
+from test.test_exchange_tools.test_market_feed import PRECISION, SYMBOL, recorded_session
+
+
+def ticker(ask, bid, last):
+    return {'a': [str(ask), '1', '1.000'], 'b': [str(bid), '1', '1.000'], 'c': [str(last), '0.1']}
+
+
+class TickerAPI:
+    def __init__(self):
+        self.requests = []
+
+    def query_public(self, method, data=None):
+        pairs = data['pair'].split(',')
+        self.requests.append(pairs)
+        return {'error': [], 'result': {pair: ticker(101.0, 100.0, 100.5) for pair in pairs}}
+
+
+class TestFetchTickers(unittest.TestCase):
+
+    def test_single_request_for_small_basket(self):
+        api = TickerAPI()
+        quotes = KrakenAPIClient(api).fetch_tickers(['XXBTZUSD', 'XETHZUSD', 'XXBTZUSD'])
+        self.assertEqual(len(api.requests), 1)
+        self.assertEqual(quotes['XETHZUSD'], TickerQuote(101.0, 100.0, 100.5))
+        self.assertEqual(len(quotes), 2)
+
+    def test_large_basket_is_chunked(self):
+        api = TickerAPI()
+        pairs = [f'PAIR{i:04d}USD' for i in range(500)]
+        quotes = KrakenAPIClient(api).fetch_tickers(pairs)
+        self.assertGreater(len(api.requests), 1)
+        for chunk in api.requests:
+            self.assertLessEqual(len(','.join(chunk)), exchange_tool.TICKER_PAIRS_MAX_CHARS)
+        self.assertEqual(set(quotes), set(pairs))
+
+    def test_quote_basket(self):
+        api = TickerAPI()
+        registry = AssetRegistry.from_assets({
+            'XXBT': {'altname': 'XBT'},
+            'XETH': {'altname': 'ETH'},
+            'ZUSD': {'altname': 'USD'},
+        })
+        executor = TradeExecutor(KrakenAPIClient(api), registry)
+        basket = executor.quote_basket([('ETH', 'USD'), ('XBT', 'USD')])
+        self.assertEqual([leg.pair for leg in basket], ['XETHZUSD', 'XXBTZUSD'])
+        self.assertEqual(basket[0].quote, TickerQuote(101.0, 100.0, 100.5))
+        self.assertEqual(len(api.requests), 1)
+
+    def test_quote_basket_uses_canonical_pair_keys(self):
+        api = CanonicalTickerAPI()
+        registry = AssetRegistry.from_assets(
+            {'XXBT': {'altname': 'XBT'}, 'SOL': {'altname': 'SOL'}, 'ZUSD': {'altname': 'USD'}},
+            {'XXBTZUSD': {'altname': 'XBTUSD', 'base': 'XXBT', 'quote': 'ZUSD'},
+             'SOLUSD': {'altname': 'SOLUSD', 'base': 'SOL', 'quote': 'ZUSD'}})
+        basket = TradeExecutor(KrakenAPIClient(api), registry).quote_basket([('SOL', 'USD'), ('XBT', 'USD')])
+        self.assertEqual([(leg.pair, leg.error) for leg in basket], [('SOLUSD', None), ('XXBTZUSD', None)])
+        self.assertEqual(basket[1].quote.ask, 101.0)
+
+    def test_quote_basket_reports_failing_legs(self):
+        api = CanonicalTickerAPI()
+        registry = AssetRegistry.from_assets(
+            {'XXBT': {'altname': 'XBT'}, 'XETH': {'altname': 'ETH'}, 'ZUSD': {'altname': 'USD'}},
+            {'XXBTZUSD': {'altname': 'XBTUSD', 'base': 'XXBT', 'quote': 'ZUSD'},
+             'XETHZUSD': {'altname': 'ETHUSD', 'base': 'XETH', 'quote': 'ZUSD'}})
+        api.unknown = {'XETHZUSD'}
+        basket = TradeExecutor(KrakenAPIClient(api), registry).quote_basket(
+            [('NOPE', 'USD'), ('ETH', 'USD'), ('XBT', 'USD')])
+        self.assertEqual([leg.pair for leg in basket], [None, 'XETHZUSD', 'XXBTZUSD'])
+        self.assertIsInstance(basket[0].error, ValueError)
+        self.assertIsInstance(basket[1].error, KrakenAPIUnkownPairError)
+        self.assertIsNone(basket[1].quote)
+        self.assertEqual(basket[2].quote, TickerQuote(101.0, 100.0, 100.5))
+        self.assertIsNone(basket[2].error)
+
+
+class CanonicalTickerAPI:
+    '''Ticker that keys its result by canonical pair name and rejects requests with an unknown pair'''
+    canonical = {'XBTUSD': 'XXBTZUSD', 'ETHUSD': 'XETHZUSD', 'SOLUSD': 'SOLUSD'}
+
+    def __init__(self):
+        self.unknown = set()
+
+    def query_public(self, method, data=None):
+        pairs = [self.canonical.get(pair, pair) for pair in data['pair'].split(',')]
+        if self.unknown & set(pairs):
+            return {'error': ['EQuery:Unknown asset pair'], 'result': {}}
+        return {'error': [], 'result': {pair: ticker(101.0, 100.0, 100.5) for pair in pairs}}
+
+
+class FlakyAPI:
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = []
+
+    def _next(self, method):
+        self.calls.append(method)
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return {'error': [failure]}
+        return {'error': [], 'result': {'txid': ['O1'], 'XXBT': {'altname': 'XBT'}}}
+
+    def query_public(self, method, data=None):
+        return self._next(method)
+
+    def query_private(self, method, data=None):
+        return self._next(method)
+
+
+class TestErrorHandling(unittest.TestCase):
+
+    def setUp(self):
+        self.retry_policy = RetryPolicy(max_attempts=3, base_delay=0.001)
+
+    def test_errors_map_to_exception_classes(self):
+        client = KrakenAPIClient(FlakyAPI(['EQuery:Unknown asset pair']), retry_policy=self.retry_policy)
+        with self.assertRaises(KrakenAPIUnkownPairError):
+            client.fetch_ticker('FOOBAR')
+        client = KrakenAPIClient(FlakyAPI(['EGeneral:Invalid arguments:volume']), retry_policy=self.retry_policy)
+        with self.assertRaises(KrakenAPIInvalidInputError):
+            client.place_order('XXBTZUSD', 'buy', -1)
+
+    def test_transient_public_errors_are_retried(self):
+        api = FlakyAPI(['EService:Unavailable', requests.ConnectionError('reset')])
+        client = KrakenAPIClient(api, retry_policy=self.retry_policy)
+        self.assertIn('XXBT', client.fetch_assets())
+        self.assertEqual(api.calls, ['Assets'] * 3)
+
+    def test_retries_give_up_after_max_attempts(self):
+        api = FlakyAPI([requests.Timeout('slow')] * 5)
+        client = KrakenAPIClient(api, retry_policy=self.retry_policy)
+        with self.assertRaises(KrakenAPIConnectionError):
+            client.fetch_assets()
+        self.assertEqual(len(api.calls), 3)
+
+    def test_add_order_is_never_retried(self):
+        api = FlakyAPI(['EService:Unavailable'])
+        client = KrakenAPIClient(api, retry_policy=self.retry_policy)
+        with self.assertRaises(KrakenAPIInternalServerError):
+            client.place_order('XXBTZUSD', 'buy', 1)
+        self.assertEqual(api.calls, ['AddOrder'])
+
+
+class PagedTradesAPI:
+    '''serves one trade per second from t=1000 to t=1099, three per page'''
+
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.requests = []
+
+    def query_public(self, method, data=None):
+        self.requests.append(data['since'])
+        if self.fail_after is not None and len(self.requests) > self.fail_after:
+            raise requests.ConnectionError('dropped')
+        since = int(data['since'])
+        since = since // 10**9 if since > 10**12 else since - 1
+        times = [t for t in range(1000, 1100) if t > since][:data['count']]
+        trades = [['100.0', '0.1', float(t), 'b', 'm', '', t] for t in times]
+        last = str(times[-1] * 10**9) if times else str(data['since'])
+        return {'error': [], 'result': {'XXBTZUSD': trades, 'last': last}}
+
+
+class TestTradeHistory(unittest.TestCase):
+
+    def test_follows_cursor_until_end(self):
+        api = PagedTradesAPI()
+        client = KrakenAPIClient(api)
+        batches = list(client.iter_trade_history('XBTUSD', 1000, 1010, count=3))
+        times = [trade[2] for _, batch, _ in batches for trade in batch]
+        self.assertEqual(times, [float(t) for t in range(1000, 1010)])
+        self.assertTrue(all(len(batch) <= 3 for _, batch, _ in batches))
+
+    def test_fetch_asset_history_uses_range(self):
+        client = KrakenAPIClient(PagedTradesAPI())
+        history = client.fetch_asset_history('XBTUSD', 1090, 2000)
+        self.assertEqual(len(history['XXBTZUSD']), 10)
+
+    def test_resumes_from_checkpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = CheckpointStore(os.path.join(tmp, 'checkpoint.json'))
+            client = KrakenAPIClient(PagedTradesAPI(fail_after=2), retry_policy=RetryPolicy(max_attempts=1))
+            seen = []
+            with self.assertRaises(KrakenAPIConnectionError):
+                for _, batch, _ in client.iter_trade_history('XBTUSD', 1000, 1020, checkpoint=checkpoint, count=3):
+                    seen.extend(trade[2] for trade in batch)
+            client = KrakenAPIClient(PagedTradesAPI())
+            for _, batch, _ in client.iter_trade_history('XBTUSD', 1000, 1020, checkpoint=checkpoint, count=3):
+                seen.extend(trade[2] for trade in batch)
+            self.assertEqual(seen, [float(t) for t in range(1000, 1020)])
+            self.assertIsNone(checkpoint.get('trades:XBTUSD:1000:1020'))
+
+
+class DepthAPI:
+    '''asks of 1 unit at 100, 101, 102, ...; AddOrder records the order and sleeps briefly'''
+
+    def __init__(self, order_delay=0.05, unknown=()):
+        self.order_delay = order_delay
+        self.unknown = set(unknown)
+        self.depth_requests = []
+        self.orders = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def query_public(self, method, data=None):
+        self.depth_requests.append(data['pair'])
+        if data['pair'] in self.unknown:
+            return {'error': ['EQuery:Unknown asset pair'], 'result': {}}
+        asks = [[f'{100 + i}.0', '1.0', 1700000000] for i in range(data['count'])]
+        bids = [[f'{99 - i}.0', '1.0', 1700000000] for i in range(data['count'])]
+        return {'error': [], 'result': {data['pair']: {'asks': asks, 'bids': bids}}}
+
+    def query_private(self, method, data=None):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.order_delay)
+        with self.lock:
+            self.in_flight -= 1
+            self.orders.append(data)
+        return {'error': [], 'result': {'txid': [f"O-{data['pair']}"]}}
+
+
+class TestExecuteBasket(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = AssetRegistry.from_assets({
+            'XXBT': {'altname': 'XBT'},
+            'XETH': {'altname': 'ETH'},
+            'SOL': {'altname': 'SOL'},
+            'ZUSD': {'altname': 'USD'},
+        }, {
+            'XXBTZUSD': {'altname': 'XBTUSD', 'wsname': 'XBT/USD', 'base': 'XXBT', 'quote': 'ZUSD'},
+            'XETHZUSD': {'altname': 'ETHUSD', 'wsname': 'ETH/USD', 'base': 'XETH', 'quote': 'ZUSD'},
+            'SOLUSD': {'altname': 'SOLUSD', 'wsname': 'SOL/USD', 'base': 'SOL', 'quote': 'ZUSD'},
+        })
+
+    def test_legs_are_sized_against_depth(self):
+        api = DepthAPI(order_delay=0)
+        fills = TradeExecutor(KrakenAPIClient(api), self.registry).execute_basket([('XBT', 100.0), ('ETH', 251.0)])
+        self.assertEqual([fill.pair for fill in fills], ['XXBTZUSD', 'XETHZUSD'])
+        self.assertAlmostEqual(fills[0].volume, 1.0)
+        self.assertEqual(fills[0].slippage_bps, 0)
+        # 100 + 101 fill two units, the remaining 50 buys 50/102 of the third level
+        self.assertAlmostEqual(fills[1].volume, 2 + 50 / 102)
+        self.assertAlmostEqual(fills[1].expected_price, 251.0 / (2 + 50 / 102))
+        self.assertGreater(fills[1].slippage_bps, 0)
+        self.assertEqual(fills[1].result, {'txid': ['O-XETHZUSD']})
+
+    def test_legs_are_submitted_concurrently(self):
+        api = DepthAPI()
+        legs = [('XBT', 10.0), ('ETH', 10.0), ('SOL', 10.0)]
+        started = time.perf_counter()
+        fills = TradeExecutor(KrakenAPIClient(api), self.registry).execute_basket(legs, max_workers=2)
+        elapsed = time.perf_counter() - started
+        self.assertEqual(api.max_in_flight, 2)
+        self.assertLess(elapsed, 3 * api.order_delay)
+        self.assertTrue(all(fill.latency >= api.order_delay for fill in fills))
+
+    def test_failing_leg_does_not_stop_others(self):
+        api = DepthAPI(order_delay=0)
+        fills = TradeExecutor(KrakenAPIClient(api), self.registry).execute_basket(
+            [('XBT', 1e9), ('ETH', 10.0), ('SOL', 500.0)], depth=10, max_slippage_bps=50)
+        self.assertIsInstance(fills[0].error, ValueError)
+        self.assertIsNone(fills[1].error)
+        self.assertIsInstance(fills[2].error, ValueError)
+        self.assertEqual([order['pair'] for order in api.orders], ['XETHZUSD'])
+
+    def test_pairs_resolve_to_kraken_names(self):
+        api = DepthAPI(order_delay=0)
+        fills = TradeExecutor(KrakenAPIClient(api), self.registry).execute_basket([('XBT', 50.0), ('SOL', 20.0)])
+        self.assertEqual([(fill.pair, fill.error) for fill in fills], [('XXBTZUSD', None), ('SOLUSD', None)])
+        self.assertEqual(sorted(order['pair'] for order in api.orders), ['SOLUSD', 'XXBTZUSD'])
+
+    def test_unresolved_or_unpriced_legs_fail_alone(self):
+        api = DepthAPI(order_delay=0, unknown={'XETHZUSD'})
+        fills = TradeExecutor(KrakenAPIClient(api), self.registry).execute_basket(
+            [('XBT', 50.0), ('NOPE', 20.0), ('ETH', 20.0)])
+        self.assertIsNone(fills[0].error)
+        self.assertIsNone(fills[1].pair)
+        self.assertIsInstance(fills[1].error, ValueError)
+        self.assertEqual(fills[2].pair, 'XETHZUSD')
+        self.assertIsInstance(fills[2].error, KrakenAPIUnkownPairError)
+        self.assertEqual([order['pair'] for order in api.orders], ['XXBTZUSD'])
+
+    def test_book_source_skips_rest_depth(self):
+        api = DepthAPI(order_delay=0)
+        client = KrakenAPIClient(api)
+        feed_book = client.fetch_order_book('XXBTZUSD')
+        api.depth_requests.clear()
+        books = {'BTC/USD': feed_book}
+        TradeExecutor(client, self.registry).execute_basket([('XBT', 10.0), ('ETH', 10.0)], book_source=books.get)
+        self.assertEqual(api.depth_requests, ['XETHZUSD'])
+
+    def test_market_feed_as_book_source(self):
+        api = DepthAPI(order_delay=0)
+        with KrakenReplayServer(recorded_session()[:2]) as server:
+            with KrakenMarketFeed([SYMBOL], channels=('book',), url=server.url, precisions={SYMBOL: PRECISION}) as feed:
+                self.assertTrue(feed.wait_ready(5))
+                # the feed only knows BTC/USD; its book raises KeyError for ETH/USD
+                fills = TradeExecutor(KrakenAPIClient(api), self.registry).execute_basket(
+                    [('XBT', 10.0), ('ETH', 10.0)], book_source=feed.book)
+        self.assertEqual(api.depth_requests, ['XETHZUSD'])
+        self.assertEqual([fill.best_ask for fill in fills], [100.5, 100.0])
+        self.assertTrue(all(fill.error is None for fill in fills))
+
+    def test_orders_are_registered_with_tracker(self):
+        api = DepthAPI(order_delay=0)
+        client = KrakenAPIClient(api)
+        tracker = OrderTracker(client)
+        TradeExecutor(client, self.registry, order_tracker=tracker).execute_basket([('XBT', 10.0), ('ETH', 10.0)])
+        self.assertEqual(sorted(tracker.live_txids()), ['O-XETHZUSD', 'O-XXBTZUSD'])
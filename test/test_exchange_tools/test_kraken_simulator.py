@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from common.exceptions import KrakenAPIAuthenticationError, KrakenAPIRateLimitError
+from exchange_tools import kraken_tools
+from exchange_tools.async_exchange_tool import AsyncKrakenAPIClient
+from exchange_tools.exchange_tool import KrakenAPIClient
+from exchange_tools.kraken_errors import RetryPolicy
+from exchange_tools.kraken_simulator import KrakenSimulator, KrakenSimulatorServer
+from exchange_tools.rate_governor import KrakenRateGovernor
+from exchange_tools.trade_frames import trades_to_dataframe
+
+
+class TestKrakenSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.simulator = KrakenSimulator(trades_per_candle=10).generate(candles=120, end=1_700_000_000)
+        self.client = KrakenAPIClient(self.simulator)
+
+    def test_public_payloads(self):
+        self.assertEqual(self.client.fetch_assets()['XXBT']['altname'], 'XBT')
+        self.assertEqual(self.client.fetch_asset_pairs()['XXRPXXBT']['wsname'], 'XRP/XBT')
+        ticker = self.client.fetch_ticker('XXBTZUSD')
+        self.assertLess(float(ticker['b'][0]), float(ticker['a'][0]))
+        ohlc = self.client.get_ohlc('XXBTZUSD', 1)
+        self.assertEqual(len(ohlc['XXBTZUSD']), 120)
+        self.assertEqual(ohlc['last'], 1_700_000_000 // 60 * 60)
+
+    def test_trade_history_pages_through_all_trades(self):
+        start = self.simulator.candles['XXBTZUSD'][0][0]
+        pages = list(self.client.iter_trade_history('XXBTZUSD', start, count=500))
+        self.assertEqual(len(pages), 3)
+        frame = trades_to_dataframe(trades for _, trades, _ in pages)
+        self.assertEqual(len(frame), 1200)
+        self.assertTrue(frame['time'].is_monotonic_increasing)
+
+    def test_trade_history_pages_do_not_repeat_trades(self):
+        simulator = KrakenSimulator(trades_per_candle=20, seed=3).generate(candles=720, end=1_700_000_000)
+        client = KrakenAPIClient(simulator)
+        start = simulator.candles['XXBTZUSD'][0][0]
+        trade_ids = [row[6] for _, trades, _ in client.iter_trade_history('XXBTZUSD', start, count=97)
+                     for row in trades]
+        self.assertEqual(len(trade_ids), 14400)
+        self.assertEqual(len(set(trade_ids)), 14400)
+
+    def test_orders_fill_on_next_step(self):
+        txid = self.client.place_order('XXBTZUSD', 'buy', 0.1)['txid'][0]
+        self.simulator.step()
+        order = self.client.query_orders([txid])[txid]
+        self.assertEqual(order['status'], 'closed')
+        self.assertAlmostEqual(float(self.client.get_balance()['XXBT']), 1.1)
+        self.assertEqual(self.simulator.trades['XXBTZUSD'][-1][1], '0.10000000')
+
+    def test_latency_and_rate_limits(self):
+        simulator = KrakenSimulator(latency=0.01, rate_limits=KrakenRateGovernor(public_burst=3, public_rate=0.1))
+        client = KrakenAPIClient(simulator, retry_policy=RetryPolicy(max_attempts=1))
+        started = time.perf_counter()
+        for _ in range(3):
+            client.fetch_assets()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.03)
+        with self.assertRaises(KrakenAPIRateLimitError):
+            client.fetch_assets()
+        self.assertEqual(simulator.rejected['EAPI:Rate limit exceeded'], 1)
+        self.assertEqual(simulator.calls['Assets'], 4)
+
+
+class TestKrakenSimulatorServer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # krakenex (ms), the async client (us) and kraken_request (ns) share one key here, so
+        # their nonces are not comparable; nonce checking is covered on its own below
+        cls.server = KrakenSimulatorServer(KrakenSimulator().generate(candles=60), check_nonce=False).__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.__exit__(None, None, None)
+
+    def test_krakenex_public_and_private(self):
+        client = KrakenAPIClient(self.server.krakenex_api())
+        self.assertIn('XXBTZUSD', client.fetch_tickers(['XXBTZUSD', 'XETHZUSD']))
+        self.assertIn('ZUSD', client.get_balance())
+        self.assertIn('txid', client.place_order('XETHZUSD', 'buy', 0.5))
+
+    def test_rejects_bad_credentials(self):
+        api = self.server.krakenex_api()
+        api.secret = 'b3RoZXItc2VjcmV0'
+        with self.assertRaises(KrakenAPIAuthenticationError):
+            KrakenAPIClient(api).get_balance()
+
+    def test_kraken_request_signs_path(self):
+        data = {'nonce': str(time.time_ns())}
+        response = kraken_tools.kraken_request(f'{self.server.url}/0/private/Balance', data,
+                                               self.server.api_key, self.server.api_secret)
+        self.assertEqual(response.json()['error'], [])
+
+    def test_rejects_replayed_nonce(self):
+        with KrakenSimulatorServer(self.server.simulator) as server:
+            data = {'nonce': str(time.time_ns())}
+            url = f'{server.url}/0/private/Balance'
+            responses = [kraken_tools.kraken_request(url, dict(data), server.api_key, server.api_secret).json()
+                         for _ in range(2)]
+        self.assertEqual([response['error'] for response in responses], [[], ['EAPI:Invalid nonce']])
+
+    def test_get_kraken_api_uses_environment(self):
+        with mock.patch.dict(os.environ, self.server.environ()):
+            api = kraken_tools.get_kraken_api()
+        self.assertEqual(api.uri, self.server.url)
+        self.assertIn('ZUSD', KrakenAPIClient(api).get_balance())
+
+    def test_async_client_concurrency(self):
+        async def poll():
+            async with AsyncKrakenAPIClient(self.server.api_key, self.server.api_secret, base_url=self.server.url) as client:
+                return await asyncio.gather(*(client.fetch_ticker('XXBTZUSD') for _ in range(20)),
+                                            client.get_balance())
+        results = asyncio.run(poll())
+        self.assertEqual(len(results), 21)
+
+    def test_threaded_load(self):
+        client = KrakenAPIClient(self.server.krakenex_api())
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            tickers = list(pool.map(lambda _: client.fetch_ticker('XETHZUSD'), range(64)))
+        self.assertEqual(len(tickers), 64)
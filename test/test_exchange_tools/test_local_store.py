@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from exchange_tools.exchange_tool import KrakenAPIClient
+from exchange_tools.kraken_simulator import KrakenSimulator
+from exchange_tools.local_store import LocalMarketStore
+from exchange_tools.trade_frames import ohlc_to_dataframe, trades_to_dataframe
+
+DAY = 86400
+START = 1690000000 - 1690000000 % DAY
+
+
+def trades(times):
+    return [['100.0', '0.5', float(t), 'b', 'm', '', i] for i, t in enumerate(times)]
+
+
+class FakeOHLCClient:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def get_ohlc(self, pair, interval, since=None, until=None):
+        return {'XXBTZUSD': [row for row in self.rows if row[0] > since], 'last': self.rows[-1][0]}
+
+
+class TestLocalMarketStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = LocalMarketStore(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_append_partitions_by_day_and_reads_range(self):
+        times = [START + 10, START + 20, START + DAY + 5, START + 2 * DAY + 1]
+        self.store.append_trades('XXBTZUSD', trades_to_dataframe([trades(times)]))
+        self.assertEqual(len(self.store.days('trades', 'XXBTZUSD')), 3)
+        df = self.store.read_trades('XXBTZUSD', START + 15, START + 2 * DAY)
+        self.assertEqual(df['trade_id'].tolist(), [1, 2])
+        self.assertEqual(len(self.store.read_trades('XXBTZUSD')), 4)
+        self.assertEqual(df['buy_sell'].tolist(), ['b', 'b'])
+
+    def test_compact_merges_parts(self):
+        for t in [START + 3, START + 1, START + 2]:
+            self.store.append_trades('XXBTZUSD', trades_to_dataframe([trades([t])]))
+        day = self.store.days('trades', 'XXBTZUSD')[0]
+        self.store.compact('trades', 'XXBTZUSD', day)
+        self.assertEqual(len(self.store._part_paths('trades', 'XXBTZUSD', day)), 1)
+        self.assertTrue(self.store.read_trades('XXBTZUSD')['time'].is_monotonic_increasing)
+
+    def test_read_orders_uncompacted_parts_by_time(self):
+        for times in [[START + 30, START + DAY + 2], [START + 10, START + 40], [START + 20, START + DAY + 1]]:
+            self.store.append_trades('XXBTZUSD', trades_to_dataframe([trades(times)]))
+        df = self.store.read_trades('XXBTZUSD')
+        self.assertEqual(df['time'].tolist(), sorted(df['time']))
+        self.assertEqual(len(df), 6)
+        ranged = self.store.read_trades('XXBTZUSD', START + 15, START + DAY, columns=['price'])
+        self.assertEqual(list(ranged.columns), ['price'])
+        self.assertEqual(len(ranged), 3)
+
+    def test_day_without_parts_is_skipped(self):
+        self.store.append_trades('XXBTZUSD', trades_to_dataframe([trades([START + 10])]))
+        # an interrupted write leaves only a .tmp file behind
+        interrupted = os.path.join(self.tmp.name, 'trades', 'XXBTZUSD', '2099-01-01')
+        os.makedirs(interrupted)
+        open(os.path.join(interrupted, 'part-1.arrow.tmp'), 'wb').close()
+        self.assertEqual(len(self.store.days('trades', 'XXBTZUSD')), 1)
+        self.assertEqual(len(self.store.read_trades('XXBTZUSD')), 1)
+        self.assertEqual(self.store.latest_time('trades', 'XXBTZUSD').timestamp(), START + 10)
+
+    def test_backfill_compacts_finished_days(self):
+        simulator = KrakenSimulator(trades_per_candle=5).generate(candles=432, interval=600, end=START + 3 * DAY - 600)
+        client = KrakenAPIClient(simulator)
+        # 1000-trade pages straddle the day boundaries, so days 2 and 3 are written in two parts each
+        self.assertEqual(self.store.backfill_trades(client, 'XXBTZUSD', START), 2160)
+        days = self.store.days('trades', 'XXBTZUSD')
+        self.assertEqual(len(days), 3)
+        self.assertTrue(all(len(self.store._part_paths('trades', 'XXBTZUSD', day)) == 1 for day in days))
+        stored = self.store.read_trades('XXBTZUSD')
+        self.assertEqual(stored['trade_id'].tolist(), list(range(1, 2161)))
+
+    def test_sync_ohlc_skips_open_candle_and_stored_rows(self):
+        rows = [[START + i * 3600, '1', '2', '0.5', '1.5', '1.2', '10', 5] for i in range(5)]
+        client = FakeOHLCClient(rows)
+        self.assertEqual(self.store.sync_ohlc(client, 'XXBTZUSD', 60), 4)
+        client.rows = rows + [[START + 5 * 3600, '1', '2', '0.5', '1.5', '1.2', '10', 5]]
+        self.assertEqual(self.store.sync_ohlc(client, 'XXBTZUSD', 60), 1)
+        stored = self.store.read_ohlc('XXBTZUSD', 60)
+        self.assertEqual(len(stored), 5)
+        self.assertEqual(stored['close'].dtype, 'float64')
+
+    def test_read_missing_pair(self):
+        self.assertTrue(self.store.read_ohlc('NOPE', 60).empty)
+        self.assertEqual(len(ohlc_to_dataframe([])), 0)
@@ -1,10 +1,20 @@
+import os
 import unittest
+from unittest import mock
+from exchange_tools.kraken_simulator import KrakenSimulator, KrakenSimulatorServer
 from exchange_tools.main_script import main, prepare_time_range_parameters
 from common.date_utils import *
 from datetime import datetime as dt, timedelta
 
 
 class TestMainScript(unittest.TestCase):
+
+    def setUp(self):
+        server = KrakenSimulatorServer(KrakenSimulator().generate(), check_nonce=False).__enter__()
+        self.addCleanup(server.__exit__, None, None, None)
+        environ = mock.patch.dict(os.environ, server.environ())
+        environ.start()
+        self.addCleanup(environ.stop)
     
     def test_main(self):
         to_time = dt.now()
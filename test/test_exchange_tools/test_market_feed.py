@@ -0,0 +1,125 @@
+import time
+import unittest
+import zlib
+import numpy as np
+from common.exceptions import KrakenOrderBookChecksumError
+from exchange_tools.market_feed import KrakenMarketFeed
+from exchange_tools.order_book import OrderBook, book_checksum
+from exchange_tools.replay_server import KrakenReplayServer
+
+SYMBOL = 'BTC/USD'
+PRECISION = (1, 8)
+
+
+def levels(*rows):
+    return [{'price': price, 'qty': qty} for price, qty in rows]
+
+
+def book_message(kind, bids, asks, book=None):
+    '''a v2 book message whose checksum matches `book` after applying it'''
+    book = book or OrderBook(SYMBOL, 10, *PRECISION)
+    if kind == 'snapshot':
+        book.apply_snapshot(bids, asks)
+    else:
+        book.apply_update(bids, asks)
+    snapshot = book.snapshot()
+    checksum = book_checksum(snapshot.bids, snapshot.asks, *PRECISION)
+    data = {'symbol': SYMBOL, 'bids': bids, 'asks': asks, 'checksum': checksum, 'timestamp': '2025-01-01T00:00:00Z'}
+    return {'channel': 'book', 'type': kind, 'data': [data]}
+
+
+def recorded_session():
+    book = OrderBook(SYMBOL, 10, *PRECISION)
+    return [
+        book_message('snapshot', levels((100.0, 1.0), (99.5, 2.0)), levels((100.5, 1.5), (101.0, 3.0)), book),
+        book_message('update', levels((99.5, 0.0), (99.8, 4.0)), [], book),
+        {'channel': 'ticker', 'type': 'snapshot',
+         'data': [{'symbol': SYMBOL, 'bid': 100.0, 'ask': 100.5, 'last': 100.2}]},
+        {'channel': 'trade', 'type': 'update',
+         'data': [{'symbol': SYMBOL, 'side': 'buy', 'price': 100.5, 'qty': 0.1, 'trade_id': 1}]},
+    ]
+
+
+class TestOrderBook(unittest.TestCase):
+
+    def test_levels_are_sorted_best_first_and_truncated(self):
+        book = OrderBook(SYMBOL, depth=2)
+        book.apply_snapshot(levels((99.0, 1), (100.0, 2), (98.0, 3)), levels((102.0, 1), (101.0, 2), (103.0, 3)))
+        snapshot = book.snapshot()
+        np.testing.assert_array_equal(snapshot.bids, [[100.0, 2], [99.0, 1]])
+        np.testing.assert_array_equal(snapshot.asks, [[101.0, 2], [102.0, 1]])
+        self.assertEqual(snapshot.mid, 100.5)
+
+    def test_updates_insert_change_and_delete(self):
+        book = OrderBook(SYMBOL, depth=10)
+        book.apply_snapshot(levels((100.0, 1), (99.0, 1)), levels((101.0, 1)))
+        before = book.snapshot()
+        book.apply_update(levels((100.0, 0), (99.5, 2), (99.0, 5)), levels((100.8, 1)))
+        after = book.snapshot()
+        np.testing.assert_array_equal(after.bids, [[99.5, 2], [99.0, 5]])
+        np.testing.assert_array_equal(after.asks, [[100.8, 1], [101.0, 1]])
+        # published snapshots are never modified in place
+        np.testing.assert_array_equal(before.bids, [[100.0, 1], [99.0, 1]])
+        self.assertFalse(after.bids.flags.writeable)
+        self.assertEqual(after.sequence, before.sequence + 1)
+
+    def test_checksum_mismatch_raises(self):
+        book = OrderBook(SYMBOL, 10, *PRECISION)
+        message = book_message('snapshot', levels((100.0, 1.0)), levels((100.5, 1.0)))['data'][0]
+        book.apply_snapshot(message['bids'], message['asks'], message['checksum'])
+        with self.assertRaises(KrakenOrderBookChecksumError):
+            book.apply_update(levels((99.0, 1.0)), [], checksum=message['checksum'])
+
+    def test_checksum_format(self):
+        bids = np.array([[0.05005, 0.00000500]])
+        asks = np.array([[0.05015, 0.50000000]])
+        # '5005' + '500' and '5015' + '50000000'; leading zeros are stripped
+        expected = zlib.crc32(b'501550000000' + b'5005500')
+        self.assertEqual(book_checksum(bids, asks, 5, 8), expected)
+
+
+class TestKrakenMarketFeed(unittest.TestCase):
+
+    def test_replayed_session(self):
+        trades = []
+        with KrakenReplayServer(recorded_session()) as server:
+            feed = KrakenMarketFeed([SYMBOL], url=server.url, precisions={SYMBOL: PRECISION}, on_trade=trades.append)
+            with feed:
+                self.assertTrue(feed.wait_ready(5))
+                for _ in range(100):
+                    snapshot = feed.book(SYMBOL)
+                    if snapshot.sequence == 2 and trades:
+                        break
+                    time.sleep(0.01)
+        np.testing.assert_array_equal(snapshot.bids, [[100.0, 1.0], [99.8, 4.0]])
+        self.assertEqual(feed.ticker(SYMBOL).ask, 100.5)
+        self.assertEqual([trade['trade_id'] for trade in feed.trades(SYMBOL)], [1])
+        self.assertEqual(len(trades), 1)
+        self.assertEqual(feed.checksum_failures, 0)
+
+    def test_checksum_failure_resubscribes(self):
+        session = recorded_session()[:2]
+        bad = book_message('update', levels((99.0, 1.0)), [])
+        bad['data'][0]['checksum'] += 1
+        fresh = book_message('snapshot', levels((98.0, 1.0)), levels((100.5, 1.0)))
+        with KrakenReplayServer(session + [bad, fresh]) as server:
+            with KrakenMarketFeed([SYMBOL], channels=('book',), url=server.url,
+                                  precisions={SYMBOL: PRECISION}) as feed:
+                for _ in range(200):
+                    snapshot = feed.book(SYMBOL)
+                    if snapshot is not None and snapshot.best_bid == 98.0:
+                        break
+                    time.sleep(0.01)
+            methods = [(request['method'], request['params']['channel']) for request in server.requests]
+        self.assertEqual(feed.checksum_failures, 1)
+        self.assertEqual(snapshot.best_bid, 98.0)
+        self.assertEqual(methods[-2:], [('unsubscribe', 'book'), ('subscribe', 'book')])
+
+    def test_precisions_come_from_instrument_channel(self):
+        instrument = {'channel': 'instrument', 'type': 'snapshot',
+                      'data': {'assets': [], 'pairs': [{'symbol': SYMBOL, 'price_precision': 1, 'qty_precision': 8}]}}
+        with KrakenReplayServer([instrument] + recorded_session()[:2]) as server:
+            with KrakenMarketFeed([SYMBOL], channels=('book',), url=server.url) as feed:
+                self.assertTrue(feed.wait_ready(5))
+        self.assertEqual(feed.precisions[SYMBOL], PRECISION)
+        self.assertTrue(feed.books[SYMBOL].validates_checksum)
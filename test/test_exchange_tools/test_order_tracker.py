@@ -0,0 +1,110 @@
+import unittest
+from exchange_tools.exchange_tool import KrakenAPIClient
+from exchange_tools.order_tracker import OrderTracker
+
+
+class OrdersAPI:
+    '''fake private API: orders fill a quarter of their volume on every QueryOrders call'''
+
+    def __init__(self, count=0):
+        self.orders = {f'O{i:04d}': {'status': 'open', 'vol': '1.0', 'vol_exec': '0.0', 'cost': '0', 'fee': '0',
+                                     'price': '0', 'opentm': 1000.0, 'descr': {'pair': 'XBTUSD'}}
+                       for i in range(count)}
+        self.calls = []
+
+    def query_private(self, method, data=None):
+        self.calls.append((method, data))
+        if method == 'QueryOrders':
+            txids = data['txid'].split(',')
+            if any(txid not in self.orders for txid in txids):
+                return {'error': ['EOrder:Invalid order'], 'result': {}}
+            for txid in txids:
+                order = self.orders[txid]
+                if order['status'] != 'open':
+                    continue
+                vol_exec = float(order['vol_exec']) + 0.25
+                order['vol_exec'] = str(vol_exec)
+                order['cost'] = str(vol_exec * 100)
+                order['price'] = '100.0'
+                if vol_exec >= 1.0:
+                    order['status'] = 'closed'
+                    order['closetm'] = 1002.5
+            return {'error': [], 'result': {txid: dict(self.orders[txid]) for txid in txids}}
+        if method == 'OpenOrders':
+            open_orders = {txid: order for txid, order in self.orders.items() if order['status'] == 'open'}
+            return {'error': [], 'result': {'open': open_orders}}
+        if method == 'CancelOrderBatch':
+            if any(txid not in self.orders for txid in data['orders']):
+                return {'error': ['EOrder:Unknown order'], 'result': {}}
+            for txid in data['orders']:
+                self.orders[txid]['status'] = 'canceled'
+            return {'error': [], 'result': {'count': len(data['orders'])}}
+        raise AssertionError(method)
+
+
+class TestOrderTracker(unittest.TestCase):
+
+    def test_polling_is_batched(self):
+        api = OrdersAPI(120)
+        tracker = OrderTracker(KrakenAPIClient(api), capacity=4)
+        for txid in api.orders:
+            tracker.track(txid, 'XBTUSD', 1.0, submitted_at=1000.0)
+        tracker.poll()
+        query_calls = [data for method, data in api.calls if method == 'QueryOrders']
+        self.assertEqual(len(query_calls), 3)
+        self.assertTrue(all(len(data['txid'].split(',')) <= 50 for data in query_calls))
+        self.assertEqual(tracker.status('O0119').vol_exec, 0.25)
+
+    def test_events_and_wait(self):
+        api = OrdersAPI(3)
+        tracker = OrderTracker(KrakenAPIClient(api))
+        received = []
+        tracker.subscribe(received.append)
+        for txid in api.orders:
+            tracker.track(txid, 'XBTUSD', 1.0, submitted_at=1000.0)
+        events = tracker.wait(interval=0)
+        self.assertEqual(events, received)
+        self.assertEqual([event.kind for event in events if event.txid == 'O0000'],
+                         ['partial_fill', 'partial_fill', 'partial_fill', 'fill'])
+        fill = events[-1]
+        self.assertEqual((fill.avg_price, fill.latency), (100.0, 2.5))
+        self.assertEqual(tracker.live_txids(), [])
+        self.assertEqual(tracker.queries, 4)
+
+    def test_bulk_cancel(self):
+        api = OrdersAPI(120)
+        tracker = OrderTracker(KrakenAPIClient(api))
+        self.assertEqual(len(tracker.adopt_open_orders()), 120)
+        outcomes = tracker.cancel()
+        cancel_calls = [data for method, data in api.calls if method == 'CancelOrderBatch']
+        self.assertEqual([len(data['orders']) for data in cancel_calls], [50, 50, 20])
+        self.assertTrue(all(error is None for error in outcomes.values()))
+        self.assertEqual(tracker.live_txids(), [])
+        self.assertEqual(tracker.status('O0002').status, 'canceled')
+
+    def test_failed_cancel_batch_fails_only_its_orders(self):
+        api = OrdersAPI(3)
+        tracker = OrderTracker(KrakenAPIClient(api), batch_size=2)
+        tracker.adopt_open_orders()
+        tracker.track('MISSING')
+        outcomes = tracker.cancel()
+        self.assertEqual([txid for txid, error in outcomes.items() if error is None], ['O0000', 'O0001'])
+        self.assertIsNotNone(outcomes['MISSING'])
+        self.assertEqual(tracker.live_txids(), ['O0002', 'MISSING'])
+
+    def test_failed_query_batch_does_not_stop_poll(self):
+        api = OrdersAPI(3)
+        tracker = OrderTracker(KrakenAPIClient(api), batch_size=2)
+        for txid in ['O0000', 'MISSING', 'O0001', 'O0002']:
+            tracker.track(txid, 'XBTUSD', 1.0, submitted_at=1000.0)
+        events = tracker.poll()
+        self.assertEqual([event.txid for event in events], ['O0001', 'O0002'])
+        self.assertEqual(sorted(tracker.poll_errors), ['MISSING', 'O0000'])
+        self.assertEqual(tracker.status('O0000').vol_exec, 0.0)
+        self.assertEqual(tracker.status('O0002').vol_exec, 0.25)
+
+    def test_query_orders_rejects_oversized_batches(self):
+        with self.assertRaises(ValueError):
+            KrakenAPIClient(OrdersAPI()).query_orders([f'O{i}' for i in range(51)])
+        with self.assertRaises(ValueError):
+            KrakenAPIClient(OrdersAPI()).cancel_orders([f'O{i}' for i in range(51)])
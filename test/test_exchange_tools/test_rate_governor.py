@@ -0,0 +1,52 @@
+import unittest
+from common.exceptions import KrakenAPIRateLimitError
+from exchange_tools.exchange_tool import KrakenAPIClient
+from exchange_tools.rate_governor import KrakenRateGovernor, TokenBucket
+
+
+class RecordingAPI:
+    def __init__(self, error=None):
+        self.error = error or []
+        self.calls = []
+
+    def query_private(self, method, data=None):
+        self.calls.append(method)
+        return {'error': self.error, 'result': {'txid': ['O1']}}
+
+    def query_public(self, method, data=None):
+        self.calls.append(method)
+        return {'error': self.error, 'result': {}}
+
+
+class TestRateGovernor(unittest.TestCase):
+
+    def test_bucket_delays_instead_of_failing(self):
+        bucket = TokenBucket(capacity=2, refill_rate=10)
+        self.assertEqual(bucket.reserve(1), 0)
+        self.assertEqual(bucket.reserve(1), 0)
+        self.assertAlmostEqual(bucket.reserve(1), 0.1, places=2)
+        self.assertLess(bucket.level(), 0)
+
+    def test_max_wait_raises_rate_limit_error(self):
+        bucket = TokenBucket(capacity=1, refill_rate=1)
+        bucket.reserve(1)
+        with self.assertRaises(KrakenAPIRateLimitError):
+            bucket.reserve(1, max_wait=0.5)
+        self.assertAlmostEqual(bucket.level(), 0, places=1)
+
+    def test_costs_per_endpoint(self):
+        governor = KrakenRateGovernor('starter')
+        governor.reserve('Ledgers', private=True)
+        governor.reserve('Balance', private=True)
+        governor.reserve('AddOrder', private=True)
+        metrics = governor.metrics()
+        self.assertAlmostEqual(metrics['private_level'], 12, places=1)
+        self.assertAlmostEqual(metrics['orders_level'], 59, places=1)
+        self.assertAlmostEqual(metrics['public_level'], 15, places=1)
+
+    def test_client_meters_calls_and_drains_on_rate_limit(self):
+        governor = KrakenRateGovernor('pro')
+        client = KrakenAPIClient(RecordingAPI(error=['EAPI:Rate limit exceeded']), rate_governor=governor)
+        with self.assertRaises(Exception):
+            client.get_balance()
+        self.assertLessEqual(governor.private.level(), 0.1)
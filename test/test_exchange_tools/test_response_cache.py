@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+from exchange_tools.exchange_tool import KrakenAPIClient
+from exchange_tools.response_cache import ResponseCache
+
+
+class SlowPublicAPI:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = []
+
+    def query_public(self, method, data=None):
+        self.calls.append(method)
+        time.sleep(self.delay)
+        return {'error': [], 'result': {'method': method, 'data': data}}
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def test_repeated_assets_served_from_cache(self):
+        api = SlowPublicAPI()
+        client = KrakenAPIClient(api, cache=ResponseCache())
+        for _ in range(5):
+            client.fetch_assets()
+        self.assertEqual(api.calls, ['Assets'])
+        self.assertEqual(client.cache.stats()['hits'], 4)
+
+    def test_uncached_endpoint_passes_through(self):
+        api = SlowPublicAPI()
+        client = KrakenAPIClient(api, cache=ResponseCache())
+        client._query_public('Trades', {'pair': 'XXBTZUSD'})
+        client._query_public('Trades', {'pair': 'XXBTZUSD'})
+        self.assertEqual(api.calls, ['Trades', 'Trades'])
+
+    def test_ttl_expiry(self):
+        api = SlowPublicAPI()
+        cache = ResponseCache(ttls={'Ticker': 0.05})
+        fetch = lambda: api.query_public('Ticker', {'pair': 'XXBTZUSD'})
+        cache.get_or_fetch('Ticker', {'pair': 'XXBTZUSD'}, fetch)
+        time.sleep(0.06)
+        cache.get_or_fetch('Ticker', {'pair': 'XXBTZUSD'}, fetch)
+        self.assertEqual(len(api.calls), 2)
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(ttls={'Ticker': 60}, max_entries=2)
+        for pair in ['A', 'B', 'A', 'C']:
+            cache.get_or_fetch('Ticker', {'pair': pair}, lambda: {'error': [], 'result': pair})
+        self.assertEqual(cache.stats()['evictions'], 1)
+        misses = cache.misses
+        cache.get_or_fetch('Ticker', {'pair': 'A'}, lambda: {'error': [], 'result': 'A'})
+        self.assertEqual(cache.misses, misses)
+
+    def test_errors_not_cached(self):
+        cache = ResponseCache()
+        cache.get_or_fetch('Assets', None, lambda: {'error': ['EService:Unavailable']})
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_concurrent_identical_requests_single_flight(self):
+        api = SlowPublicAPI(delay=0.1)
+        client = KrakenAPIClient(api, cache=ResponseCache())
+        threads = [threading.Thread(target=client.fetch_assets) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(api.calls, ['Assets'])
+        self.assertEqual(client.cache.coalesced, 7)
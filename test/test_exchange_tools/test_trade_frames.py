@@ -0,0 +1,35 @@
+import unittest
+import pandas as pd
+from exchange_tools.trade_frames import trades_to_dataframe
+
+PAGE_1 = [
+    ['64000.10000', '0.01000000', 1690000000.1234, 'b', 'm', '', 1],
+    ['64001.00000', '0.50000000', 1690000001.5, 's', 'l', '', 2],
+]
+PAGE_2 = [
+    ['64002.00000', '1.25000000', 1690000002.0, 'b', 'l', '', 3],
+]
+
+
+class TestTradeFrames(unittest.TestCase):
+
+    def test_typed_columns(self):
+        df = trades_to_dataframe([PAGE_1, PAGE_2])
+        self.assertEqual(list(df.columns), ['price', 'volume', 'time', 'buy_sell', 'market_limit', 'misc', 'trade_id'])
+        self.assertEqual(df['price'].dtype, 'float64')
+        self.assertEqual(df['volume'].dtype, 'float64')
+        self.assertEqual(df['time'].dtype, 'datetime64[ns]')
+        self.assertIsInstance(df['buy_sell'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['trade_id'].tolist(), [1, 2, 3])
+        self.assertEqual(df['time'].iloc[0], pd.Timestamp('2023-07-22 04:26:40.123400'))
+        self.assertEqual(df['buy_sell'].tolist(), ['b', 's', 'b'])
+
+    def test_out_of_order_pages_are_sorted(self):
+        df = trades_to_dataframe([PAGE_2, PAGE_1])
+        self.assertTrue(df['time'].is_monotonic_increasing)
+        self.assertEqual(df['trade_id'].tolist(), [1, 2, 3])
+
+    def test_empty_and_legacy_rows(self):
+        self.assertEqual(len(trades_to_dataframe([])), 0)
+        df = trades_to_dataframe([[row[:6] for row in PAGE_1]])
+        self.assertEqual(df['trade_id'].tolist(), [-1, -1])
@@ -0,0 +1,80 @@
+import unittest
+from datetime import datetime
+from gcp_tools import bigquery_sinks
+from gcp_tools.bigquery_sinks import BigQueryStreamingSink, SQLiteSink, rows_to_dataframe
+
+
+class FakeField:
+    def __init__(self, name, field_type):
+        self.name = name
+        self.field_type = field_type
+
+
+class FakeBigQueryClient:
+    def __init__(self):
+        self.get_table_calls = 0
+        self.inserts = []
+
+    def get_table(self, table_id):
+        self.get_table_calls += 1
+        return table_id
+
+    def insert_rows(self, table, rows, row_ids=None):
+        self.inserts.append((list(rows), row_ids))
+        return [{'index': index, 'errors': [{'reason': 'invalid'}]} for index, row in enumerate(rows)
+                if row['close'] == 'bad']
+
+
+def ohlc_rows(count):
+    return [{'timestamp': datetime(2025, 1, 1, i % 24), 'pair': 'XBTUSD', 'close': '100.5'} for i in range(count)]
+
+
+class TestBigQuerySinks(unittest.TestCase):
+
+    def setUp(self):
+        bigquery_sinks._tables.clear()
+
+    def test_streaming_sink_micro_batches_by_rows(self):
+        client = FakeBigQueryClient()
+        sink = BigQueryStreamingSink(client, 'p.d.t', max_rows=4)
+        sink.write(ohlc_rows(10), row_ids=[str(i) for i in range(10)])
+        self.assertEqual([len(rows) for rows, _ in client.inserts], [4, 4])
+        sink.flush()
+        self.assertEqual([len(rows) for rows, _ in client.inserts], [4, 4, 2])
+        self.assertEqual(client.inserts[-1][1], ['8', '9'])
+
+    def test_streaming_errors_index_all_written_rows(self):
+        client = FakeBigQueryClient()
+        sink = BigQueryStreamingSink(client, 'p.d.t', max_rows=4)
+        rows = ohlc_rows(10)
+        rows[1]['close'] = rows[6]['close'] = 'bad'
+        errors = sink.write(rows) + sink.flush()
+        self.assertEqual([error['index'] for error in errors], [1, 6])
+
+    def test_streaming_sink_micro_batches_by_bytes(self):
+        client = FakeBigQueryClient()
+        sink = BigQueryStreamingSink(client, 'p.d.t', max_rows=1000, max_bytes=200)
+        sink.write(ohlc_rows(10))
+        self.assertGreater(len(client.inserts), 1)
+
+    def test_table_metadata_is_cached(self):
+        client = FakeBigQueryClient()
+        for _ in range(3):
+            sink = BigQueryStreamingSink(client, 'p.d.t')
+            sink.write(ohlc_rows(2))
+            sink.flush()
+        self.assertEqual(client.get_table_calls, 1)
+
+    def test_sqlite_sink_ignores_replayed_row_ids(self):
+        sink = SQLiteSink(':memory:')
+        sink.write(ohlc_rows(3), row_ids=['a', 'b', 'c'])
+        sink.write(ohlc_rows(3), row_ids=['a', 'b', 'd'])
+        count = sink.connection.execute('SELECT COUNT(*) FROM ohlc_data').fetchone()[0]
+        self.assertEqual(count, 4)
+        sink.close()
+
+    def test_rows_follow_schema_types(self):
+        schema = [FakeField('timestamp', 'TIMESTAMP'), FakeField('pair', 'STRING'), FakeField('close', 'FLOAT')]
+        df = rows_to_dataframe(ohlc_rows(2), schema)
+        self.assertEqual(df['close'].dtype, 'float64')
+        self.assertEqual(str(df['timestamp'].dtype), 'datetime64[ns, UTC]')
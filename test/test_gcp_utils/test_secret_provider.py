@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from gcp_tools import secret_provider
+from gcp_tools.gcp_utils import get_secret
+from gcp_tools.secret_provider import EnvSecretBackend, FileSecretBackend, SecretProvider, secret_id_from_name
+
+NAME = 'projects/123/secrets/KRAKEN_PUB_KEY_READONLY/versions/latest'
+
+
+class CountingBackend:
+    def __init__(self):
+        self.calls = 0
+        self.refreshed = threading.Event()
+
+    def fetch(self, name):
+        self.calls += 1
+        if self.calls > 1:
+            self.refreshed.set()
+        return f'value-{self.calls}'
+
+
+class TestSecretProvider(unittest.TestCase):
+
+    def test_memoizes_within_ttl(self):
+        backend = CountingBackend()
+        provider = SecretProvider(backend, ttl=60, refresh_ahead=0)
+        values = {provider.get(NAME) for _ in range(50)}
+        self.assertEqual(values, {'value-1'})
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(provider.hits, 49)
+
+    def test_expired_secret_is_fetched_again(self):
+        backend = CountingBackend()
+        provider = SecretProvider(backend, ttl=0.01, refresh_ahead=0)
+        provider.get(NAME)
+        time.sleep(0.02)
+        self.assertEqual(provider.get(NAME), 'value-2')
+
+    def test_refresh_ahead_serves_cached_value(self):
+        backend = CountingBackend()
+        provider = SecretProvider(backend, ttl=60, refresh_ahead=60)
+        provider.get(NAME)
+        self.assertEqual(provider.get(NAME), 'value-1')
+        self.assertTrue(backend.refreshed.wait(1))
+        time.sleep(0.01)
+        self.assertEqual(provider.get(NAME), 'value-2')
+
+    def test_local_backends(self):
+        self.assertEqual(secret_id_from_name(NAME), 'KRAKEN_PUB_KEY_READONLY')
+        os.environ['KRAKEN_PUB_KEY_READONLY'] = '{"k": "v"}'
+        try:
+            self.assertEqual(EnvSecretBackend().fetch(NAME), '{"k": "v"}')
+        finally:
+            del os.environ['KRAKEN_PUB_KEY_READONLY']
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'KRAKEN_PUB_KEY_READONLY'), 'w') as f:
+                f.write('secret\n')
+            self.assertEqual(FileSecretBackend(directory).fetch(NAME), 'secret')
+
+
+class TestGetSecret(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(setattr, secret_provider, '_provider', None)
+        secret_provider._provider = None
+
+    def test_default_secret_from_env_backend(self):
+        payload = json.dumps({'KRAKEN_PUB': 'public-key', 'KRAKEN_SEC': 'c2VjcmV0'})
+        with mock.patch.dict(os.environ, {'SECRET_BACKEND': 'env', 'KRAKEN_PUB_KEY_READONLY': payload}):
+            self.assertEqual(get_secret(), ('public-key', 'c2VjcmV0'))
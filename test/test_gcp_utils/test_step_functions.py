@@ -0,0 +1,169 @@
+import functools
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from common.checkpoint_store import CheckpointStore
+from gcp_tools import secret_provider
+
+
+def load_step_functions():
+    '''gcp_tools/step-functions.py (not importable by name because of the dash)'''
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                        'gcp_tools', 'step-functions.py')
+    spec = importlib.util.spec_from_file_location('step_functions', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+step_functions = load_step_functions()
+
+
+def candle(time_, close='100.0'):
+    return [time_, close, close, close, close, close, '1.5', 3]
+
+
+# the last candle of a Kraken OHLC response is still open
+CANDLES = [candle(60), candle(120), candle(180), candle(240)]
+
+
+class FakeRequest:
+    def __init__(self, payload):
+        self.payload = payload
+
+    def get_json(self, silent=False):
+        return self.payload
+
+
+class TestClosedCandles(unittest.TestCase):
+
+    def test_drops_open_candle(self):
+        self.assertEqual(step_functions.closed_candles_since(CANDLES, None), CANDLES[:-1])
+
+    def test_skips_candles_at_or_below_watermark(self):
+        self.assertEqual(step_functions.closed_candles_since(CANDLES, 120), [CANDLES[2]])
+        self.assertEqual(step_functions.closed_candles_since(CANDLES, 180), [])
+
+    def test_watermark_key(self):
+        self.assertEqual(step_functions.watermark_key('XBTUSD', 60), 'ohlc:XBTUSD:60')
+
+    def test_fetch_requests_since_watermark(self):
+        with mock.patch.object(step_functions, 'get_kraken_data', return_value=(CANDLES, 240)) as get:
+            report = step_functions.fetch_closed_candles('XBTUSD', 1, 60, 'project', 'key', None)
+        self.assertEqual(get.call_args.kwargs['since'], 60)
+        self.assertEqual(report['candles'], CANDLES[1:3])
+        self.assertEqual(report['rows'], 2)
+        self.assertIsNone(report['error'])
+
+    def test_fetch_reports_errors(self):
+        with mock.patch.object(step_functions, 'get_kraken_data', side_effect=Exception('EService:Unavailable')):
+            report = step_functions.fetch_closed_candles('XBTUSD', 1, None, 'project', 'key', None)
+        self.assertEqual(report['error'], 'EService:Unavailable')
+        self.assertEqual(report['candles'], [])
+
+
+class TestWatermarks(unittest.TestCase):
+
+    def setUp(self):
+        secret_provider._provider = None
+        self.addCleanup(setattr, secret_provider, '_provider', None)
+        env = mock.patch.dict(os.environ, {'SECRET_BACKEND': 'env', 'KRAKEN_PUB_KEY_READONLY': 'public-key'})
+        env.start()
+        self.addCleanup(env.stop)
+        kraken = mock.patch.object(step_functions, 'get_kraken_data', return_value=(CANDLES, 240))
+        self.get_kraken_data = kraken.start()
+        self.addCleanup(kraken.stop)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.watermarks = CheckpointStore(os.path.join(tmp.name, 'watermarks.json'))
+
+    def test_watermark_advances_after_insert(self):
+        inserts = []
+        step_functions.run_ingestion_job(['XBTUSD'], [1], 'project', self.watermarks,
+                                         insert=lambda rows, project_id, row_ids: inserts.append(row_ids) or [])
+        self.assertEqual(inserts, [['XBTUSD-1-60', 'XBTUSD-1-120', 'XBTUSD-1-180']])
+        self.assertEqual(self.watermarks.get('ohlc:XBTUSD:1'), 180)
+
+        # the next run asks for candles after the watermark and has nothing new to insert
+        inserts.clear()
+        step_functions.run_ingestion_job(['XBTUSD'], [1], 'project', self.watermarks,
+                                         insert=lambda rows, project_id, row_ids: inserts.append(row_ids) or [])
+        self.assertEqual(self.get_kraken_data.call_args.kwargs['since'], 180)
+        self.assertEqual(inserts, [])
+
+    def test_failed_insert_keeps_watermark(self):
+        self.watermarks.set('ohlc:XBTUSD:1', 60)
+        reports = step_functions.run_ingestion_job(['XBTUSD'], [1], 'project', self.watermarks,
+                                                   insert=lambda rows, project_id, row_ids: ['quota exceeded'])
+        self.assertIn('quota exceeded', reports[0]['error'])
+        self.assertEqual(self.watermarks.get('ohlc:XBTUSD:1'), 60)
+
+    def test_one_insert_per_run(self):
+        inserts = []
+        step_functions.run_ingestion_job(['XBTUSD', 'ETHUSD', 'SOLUSD'], [1, 60, 240], 'project', self.watermarks,
+                                         insert=lambda rows, project_id, row_ids: inserts.append(row_ids) or [])
+        self.assertEqual([len(row_ids) for row_ids in inserts], [27])
+
+    def test_failed_rows_hold_back_only_their_pair(self):
+        def insert(rows, project_id, row_ids):
+            return [{'index': index, 'errors': [{'reason': 'invalid'}]} for index, row in enumerate(rows)
+                    if row['pair'] == 'ETHUSD' and row['interval'] == 60]
+
+        reports = step_functions.run_ingestion_job(['XBTUSD', 'ETHUSD', 'SOLUSD'], [1, 60], 'project',
+                                                   self.watermarks, max_workers=3, insert=insert)
+        keys = [step_functions.watermark_key(pair, interval) for pair in ('XBTUSD', 'ETHUSD', 'SOLUSD') for interval in (1, 60)]
+        self.assertEqual(self.watermarks.get_many(keys),
+                         {key: 180 for key in keys if key != 'ohlc:ETHUSD:60'})
+        errors = {(report['pair'], report['interval']): report['error'] for report in reports}
+        self.assertEqual([job for job, error in errors.items() if error], [('ETHUSD', 60)])
+        self.assertIn('invalid', errors[('ETHUSD', 60)])
+
+    def test_failed_insert_without_row_index_fails_every_pair(self):
+        def insert(rows, project_id, row_ids):
+            raise Exception('load job quota exceeded')
+
+        reports = step_functions.run_ingestion_job(['XBTUSD', 'ETHUSD'], [1], 'project', self.watermarks, insert=insert)
+        self.assertTrue(all('quota exceeded' in report['error'] for report in reports))
+        self.assertEqual(self.watermarks.get_many(['ohlc:XBTUSD:1', 'ohlc:ETHUSD:1']), {})
+
+    def test_partial_failure_responds_207(self):
+        def insert(rows, project_id, row_ids):
+            return [{'index': index, 'errors': [{'reason': 'invalid'}]} for index, row in enumerate(rows)
+                    if row['pair'] == 'ETHUSD']
+
+        run = functools.partial(step_functions.run_ingestion_job, insert=insert)
+        with mock.patch.object(step_functions, 'run_ingestion_job', run):
+            body, status = step_functions.kraken_to_bigquery(FakeRequest({'pairs': ['XBTUSD', 'ETHUSD']}),
+                                                             watermarks=self.watermarks)
+        self.assertEqual(status, 207)
+        summary = json.loads(body)
+        self.assertEqual([job['error'] is None for job in summary['jobs']], [True, False])
+        self.assertEqual(self.watermarks.get_many(['ohlc:XBTUSD:60', 'ohlc:ETHUSD:60']), {'ohlc:XBTUSD:60': 180})
+
+    def test_sqlite_sink_run_responds_200(self):
+        with tempfile.TemporaryDirectory() as tmp, \
+                mock.patch.dict(os.environ, {'BIGQUERY_SINK': 'sqlite', 'SQLITE_SINK_PATH': os.path.join(tmp, 'ohlc.db')}):
+            body, status = step_functions.kraken_to_bigquery(FakeRequest({'pairs': ['XBTUSD'], 'intervals': [5]}),
+                                                             watermarks=self.watermarks)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)['rows'], 3)
+        self.assertEqual(self.watermarks.get('ohlc:XBTUSD:5'), 180)
+
+
+class TestJobConfig(unittest.TestCase):
+
+    def test_request_payload_wins(self):
+        with mock.patch.dict(os.environ, {'KRAKEN_PAIRS': 'SOLUSD', 'KRAKEN_INTERVALS': '5'}):
+            config = step_functions.parse_job_config(FakeRequest({'pairs': ['ETHUSD'], 'intervals': ['15'],
+                                                                  'max_workers': '2'}))
+        self.assertEqual(config, (['ETHUSD'], [15], 2))
+
+    def test_environment_then_defaults(self):
+        with mock.patch.dict(os.environ, {'KRAKEN_PAIRS': 'SOLUSD,ETHUSD', 'KRAKEN_INTERVALS': '5,60'}):
+            self.assertEqual(step_functions.parse_job_config(None), (['SOLUSD', 'ETHUSD'], [5, 60], 8))
+        with mock.patch.dict(os.environ, {'KRAKEN_PAIRS': '', 'KRAKEN_INTERVALS': ''}):
+            self.assertEqual(step_functions.parse_job_config(FakeRequest(None)),
+                             (step_functions.DEFAULT_PAIRS, step_functions.DEFAULT_INTERVALS, 8))